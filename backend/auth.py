@@ -7,7 +7,7 @@ import os
 import hmac
 import hashlib
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 security = HTTPBearer()
@@ -15,6 +15,9 @@ security = HTTPBearer()
 # Get webhook secret from environment variable
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "your-secret-key-change-this-in-production")
 
+# Reject webhooks without an X-Webhook-Signature header (HMAC of the raw body)
+WEBHOOK_REQUIRE_SIGNATURE = os.getenv("WEBHOOK_REQUIRE_SIGNATURE", "false").lower() in ("1", "true", "yes")
+
 
 async def verify_webhook_signature(
     credentials: HTTPAuthorizationCredentials = Security(security)
@@ -31,12 +34,70 @@ async def verify_webhook_signature(
     Raises:
         HTTPException: If authentication fails
     """
-    if credentials.credentials != WEBHOOK_SECRET:
+    _check_webhook_secret(credentials.credentials)
+    return True
+
+
+def _check_webhook_secret(token: str):
+    if not hmac.compare_digest(token.encode('utf-8'), WEBHOOK_SECRET.encode('utf-8')):
         raise HTTPException(
             status_code=401,
             detail="Invalid webhook secret"
         )
-    return True
+
+
+async def read_authenticated_webhook(request: Request) -> bytes:
+    """
+    Authenticate a webhook request and return its raw body
+
+    The Bearer token is checked before the body is read, and the optional
+    X-Webhook-Signature header ("sha256=<hex>", HMAC-SHA256 of the raw body
+    with the webhook secret) is checked before the body is decoded, so
+    unauthenticated requests are rejected without any JSON or model parsing.
+
+    Raises:
+        HTTPException: 403 without a Bearer token, 401 for a wrong token or
+            signature (or a missing one with WEBHOOK_REQUIRE_SIGNATURE)
+    """
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        raise HTTPException(status_code=403, detail="Not authenticated")
+    _check_webhook_secret(token)
+
+    signature = request.headers.get('x-webhook-signature')
+    if signature is None and WEBHOOK_REQUIRE_SIGNATURE:
+        raise HTTPException(status_code=401, detail="Missing webhook signature")
+
+    body = await request.body()
+    if signature is not None and not verify_body_signature(body, signature, WEBHOOK_SECRET):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    return body
+
+
+def generate_body_signature(body: bytes, secret: str) -> str:
+    """
+    Generate the X-Webhook-Signature header value for a raw request body
+
+    Args:
+        body: The exact bytes sent as the request body
+        secret: The shared secret key
+
+    Returns:
+        "sha256=" followed by the hexadecimal HMAC-SHA256
+    """
+    return "sha256=" + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+
+def verify_body_signature(body: bytes, signature: Optional[str], secret: str) -> bool:
+    """
+    Verify an X-Webhook-Signature header against the raw request body
+
+    Accepts the hex digest with or without the "sha256=" prefix.
+    """
+    if not signature:
+        return False
+    expected = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().removeprefix('sha256='))
 
 
 def generate_webhook_signature(payload: Dict[str, Any], secret: str) -> str:
@@ -1,12 +1,9 @@
 import sqlite3
-import os
-
-def get_db_path():
-    return os.path.join(os.path.dirname(__file__), 'demo.db')
+from db_pool import get_connection, release_connection
 
 def migrate_auth_schema():
     """Add authentication and creator tracking"""
-    conn = sqlite3.connect(get_db_path())
+    conn = get_connection()
     c = conn.cursor()
 
     # Add creator tracking to projects
@@ -26,8 +23,13 @@ def migrate_auth_schema():
             else:
                 raise
 
+    # Index for the creator half of the project access check
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_projects_created_by_email
+                 ON projects(created_by_email)''')
+    print("Created index on projects.created_by_email")
+
     conn.commit()
-    conn.close()
+    release_connection(conn)
     print("Auth schema migration completed successfully")
 
 if __name__ == "__main__":
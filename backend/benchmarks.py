@@ -0,0 +1,1405 @@
+"""
+Performance benchmarks for the cfh-project backend
+
+Every benchmark runs against a throwaway database in a temp directory, so it
+is safe to run next to a live demo.db.
+
+Usage:
+    python benchmarks.py stats-rps [--projects 20] [--requests 300]
+    python benchmarks.py stats-scale [--projects 10000] [--items 500000] [--legacy]
+    python benchmarks.py stats-pages [--projects 50000] [--batch-size 50]
+    python benchmarks.py campaign-stats [--projects 50000] [--batch-size 50]
+    python benchmarks.py search [--projects 50000] [--requests 50]
+    python benchmarks.py search-ranking [--items 5000]
+    python benchmarks.py checklist-batch [--items 40] [--requests 20]
+    python benchmarks.py template-apply [--projects 500] [--items 40]
+    python benchmarks.py template-list [--items 5000] [--requests 20]
+    python benchmarks.py session-cache [--requests 200] [--latency-ms 50]
+    python benchmarks.py session-clients [--requests 200] [--latency-ms 20]
+    python benchmarks.py webhook-batch [--items 5000] [--batch-size 500]
+    python benchmarks.py webhook-queue [--items 2000]
+    python benchmarks.py webhook-race [--workers 32] [--requests 20]
+    python benchmarks.py webhook-campaigns [--items 2000]
+    python benchmarks.py webhook-replay [--items 5000] [--batch-size 500]
+    python benchmarks.py webhook-auth [--requests 20000]
+    python benchmarks.py webhook-health [--projects 100000] [--requests 200]
+    python benchmarks.py mixed-load [--projects 20000] [--items 4000] [--workers 16] [--batch-size 500]
+    python benchmarks.py event-loop [--projects 20000] [--requests 16] [--workers 4]
+    python benchmarks.py startup [--projects 20000] [--requests 5] [--workers 8]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+ADMIN_HEADERS = {
+    "X-User-Info": json.dumps({
+        "email": "bench.admin@example.com",
+        "name": "Bench Admin",
+        "source_system": "laravel11",
+        "is_admin": True
+    })
+}
+
+
+def use_temp_database() -> str:
+    """Point DATABASE_URL at a fresh temp file; must run before importing main"""
+    tmp_dir = tempfile.mkdtemp(prefix="cfh-bench-")
+    os.environ["DATABASE_URL"] = os.path.join(tmp_dir, "bench.db")
+    return tmp_dir
+
+
+def load_client():
+    """Import the app (runs migrations on the temp database) and wrap it in a TestClient"""
+    from fastapi.testclient import TestClient
+    import main
+    return TestClient(main.app)
+
+
+def seed_projects(projects: int, items_per_project: int = 10, comments_per_project: int = 2,
+                  stakeholders_per_project: int = 1):
+    """Bulk-insert synthetic projects with checklist items, comments and stakeholders"""
+    from db_pool import db_connection
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT COALESCE(MAX(id), 0) FROM projects")
+        first_id = c.fetchone()[0] + 1
+        project_ids = range(first_id, first_id + projects)
+
+        c.executemany(
+            "INSERT INTO projects (id, name, description, status, created_by_email) VALUES (?, ?, ?, ?, ?)",
+            ((pid, f"Bench project {pid}", "Synthetic benchmark project", "active",
+              f"user{pid % 50}@example.com") for pid in project_ids)
+        )
+        c.executemany(
+            "INSERT INTO checklist_items (project_id, title, completed) VALUES (?, ?, ?)",
+            ((pid, f"Task {n}", n % 3 == 0) for pid in project_ids for n in range(items_per_project))
+        )
+        c.executemany(
+            "INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
+            ((pid, "Bench User", f"Comment {n}") for pid in project_ids for n in range(comments_per_project))
+        )
+        c.executemany(
+            "INSERT INTO stakeholders (project_id, name, email) VALUES (?, ?, ?)",
+            ((pid, f"Stakeholder {n}", f"stakeholder{n}.{pid % 20}@example.com")
+             for pid in project_ids for n in range(stakeholders_per_project))
+        )
+        conn.commit()
+
+
+def measure(client, path: str, requests: int, headers=None) -> dict:
+    """Issue sequential GET requests and return throughput and latency figures"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        response = client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    }
+
+
+def print_result(label: str, result: dict):
+    print(f"  {label:<28} {result['rps']:>9.1f} req/s   "
+          f"p50 {result['p50_ms']:>7.2f} ms   p99 {result['p99_ms']:>7.2f} ms")
+
+
+def bench_stats_rps(args):
+    """Requests per second on /api/projects/stats with and without connection pooling"""
+    from db_pool import configure_pool
+
+    projects = args.projects or 20
+    requests = args.requests or 300
+
+    client = load_client()
+    seed_projects(projects)
+    print(f"/api/projects/stats with {projects} projects, {requests} requests each")
+
+    configure_pool(max_size=0)
+    measure(client, "/api/projects/stats", 10, ADMIN_HEADERS)
+    before = measure(client, "/api/projects/stats", requests, ADMIN_HEADERS)
+    print_result("connect per request", before)
+
+    configure_pool()
+    measure(client, "/api/projects/stats", 10, ADMIN_HEADERS)
+    after = measure(client, "/api/projects/stats", requests, ADMIN_HEADERS)
+    print_result("pooled connections", after)
+
+    print(f"  speedup: {after['rps'] / before['rps']:.2f}x")
+
+
+def count_statements(fn, *args, **kwargs):
+    """Run fn on this thread's pooled connection and count the SQL statements it executes"""
+    from db_pool import db_connection
+
+    statements = []
+    with db_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            conn.set_trace_callback(None)
+    return result, len(statements)
+
+
+def legacy_project_stats():
+    """The pre-aggregation /api/projects/stats loop: 1 + 4N queries"""
+    from db_pool import db_connection
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id FROM projects ORDER BY created_at DESC')
+        for (project_id,) in c.fetchall():
+            c.execute('SELECT COUNT(*) FROM checklist_items WHERE project_id = ?', (project_id,))
+            c.execute('SELECT COUNT(*) FROM checklist_items WHERE project_id = ? AND completed = 1', (project_id,))
+            c.execute('SELECT COUNT(*) FROM comments WHERE project_id = ?', (project_id,))
+            c.execute('SELECT COUNT(*) FROM stakeholders WHERE project_id = ?', (project_id,))
+
+
+def bench_stats_scale(args):
+    """Regression benchmark: /api/projects/stats must not degrade faster than the data grows"""
+    from project_stats import get_project_stats
+
+    projects = args.projects or 10000
+    items = args.items or 500000
+    requests = args.requests or 5
+
+    client = load_client()
+    items_per_project = max(1, items // projects)
+    steps = [projects // 10, projects // 2, projects]
+    seeded = 0
+
+    print(f"/api/projects/stats scaling, {items_per_project} checklist items per project")
+    for step in steps:
+        seed_projects(step - seeded, items_per_project=items_per_project)
+        seeded = step
+
+        _, statements = count_statements(get_project_stats)
+        result = measure(client, "/api/projects/stats", requests, ADMIN_HEADERS)
+        per_1k = result["p50_ms"] / (step / 1000)
+        print(f"  {step:>7} projects {step * items_per_project:>9} items   "
+              f"{statements} statement(s)   p50 {result['p50_ms']:>8.1f} ms   "
+              f"{per_1k:>6.1f} ms per 1k projects")
+
+    if args.legacy:
+        started = time.perf_counter()
+        _, statements = count_statements(legacy_project_stats)
+        print(f"  legacy N+1 loop at {seeded} projects: {statements} statements, "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def bench_stats_pages(args):
+    """Keyset pages of /api/projects/stats vs. the full list, first page and deep pages"""
+    projects = args.projects or 50000
+    requests = args.requests or 20
+    page_size = args.batch_size or 50
+
+    client = load_client()
+    seed_projects(projects, items_per_project=5, comments_per_project=1)
+    print(f"/api/projects/stats with {projects} projects, pages of {page_size}")
+
+    # Walk to a deep page once to get its cursor
+    cursors = {}
+    cursor = None
+    for page in range(1, 201):
+        if page in (2, 10, 200):
+            cursors[page] = cursor
+        response = client.get("/api/projects/stats", params={"limit": page_size, **({"cursor": cursor} if cursor else {})},
+                              headers=ADMIN_HEADERS)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    full = measure(client, "/api/projects/stats", max(requests // 10, 2), ADMIN_HEADERS)
+    print_result("full list (no limit)", full)
+    first = measure(client, f"/api/projects/stats?limit={page_size}", requests, ADMIN_HEADERS)
+    print_result("first page", first)
+    for page, page_cursor in cursors.items():
+        if page_cursor:
+            print_result(f"page {page}", measure(
+                client, f"/api/projects/stats?limit={page_size}&cursor={page_cursor}", requests, ADMIN_HEADERS))
+    sparse = measure(client, f"/api/projects/stats?limit={page_size}&fields=id,name,progress", requests, ADMIN_HEADERS)
+    print_result("first page, 3 fields", sparse)
+    print(f"  first page vs. full list: {full['p50_ms'] / first['p50_ms']:.0f}x faster")
+
+
+def bench_campaign_stats(args):
+    """Campaign view: the global /api/projects/stats vs. /api/campaigns/{id}/stats, full and paged"""
+    from db_pool import db_connection
+    from project_query import ProjectListParams
+    from project_stats import get_campaign_stats
+
+    projects = args.projects or 50000
+    requests = args.requests or 20
+    page_size = args.batch_size or 50
+    deep_page = 10
+    # Up to 50 campaigns, as long as each still spans deep_page pages
+    campaigns = max(1, min(50, projects // (page_size * deep_page)))
+
+    client = load_client()
+    seed_projects(projects, items_per_project=5, comments_per_project=1)
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.executemany("INSERT INTO campaigns (id, name) VALUES (?, ?)",
+                      ((cid, f"Bench campaign {cid}") for cid in range(1, campaigns + 1)))
+        c.execute("UPDATE projects SET campaign_id = id % ? + 1", (campaigns,))
+        conn.commit()
+    print(f"{projects} projects in {campaigns} campaigns, pages of {page_size}")
+
+    # Walk towards deep_page; a small campaign may end earlier
+    page, cursor = 1, None
+    while page < deep_page:
+        response = client.get("/api/campaigns/1/stats", params={"limit": page_size, **({"cursor": cursor} if cursor else {})},
+                              headers=ADMIN_HEADERS)
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        page, cursor = page + 1, next_cursor
+
+    global_stats = measure(client, "/api/projects/stats", max(requests // 10, 2), ADMIN_HEADERS)
+    print_result("global stats (old view)", global_stats)
+    full = measure(client, "/api/campaigns/1/stats", requests, ADMIN_HEADERS)
+    print_result("campaign, all projects", full)
+    first = measure(client, f"/api/campaigns/1/stats?limit={page_size}", requests, ADMIN_HEADERS)
+    print_result("campaign, first page", first)
+    if cursor:
+        print_result(f"campaign, page {page}", measure(
+            client, f"/api/campaigns/1/stats?limit={page_size}&cursor={cursor}", requests, ADMIN_HEADERS))
+    else:
+        print("  campaign fits in one page: no deeper page to measure")
+
+    _, statements = count_statements(get_campaign_stats, 1, None, ProjectListParams(limit=page_size))
+    print(f"  {statements} statements per campaign page (plus the campaign row); "
+          f"first page vs. global stats: {global_stats['p50_ms'] / first['p50_ms']:.0f}x faster")
+
+
+SEARCH_VOCABULARY = [f"{stem}{suffix}" for stem in (
+    "design", "launch", "review", "budget", "market", "client", "report", "deploy", "audit", "brand",
+    "content", "sprint", "vendor", "asset", "survey", "contract", "invoice", "release", "pitch", "onboard"
+) for suffix in ("", "s", "ing", "er", "ed", "ion", "al", "ly", "ment", "ful")]
+
+# LIKE '%x%' over every searchable column: what ad hoc search costs without the index.
+# Ranking needs every match, so there is no LIMIT.
+SEARCH_LIKE_QUERY = '''
+    SELECT 'project', id FROM projects WHERE name LIKE ?1 OR description LIKE ?1
+    UNION ALL SELECT 'comment', id FROM comments WHERE content LIKE ?1
+    UNION ALL SELECT 'checklist_item', id FROM checklist_items WHERE title LIKE ?1
+    UNION ALL SELECT 'campaign', id FROM campaigns WHERE name LIKE ?1 OR description LIKE ?1
+'''
+
+
+def bench_search(args):
+    """/api/search over a million indexed rows vs. LIKE scans, plus the write cost of the index triggers"""
+    import random
+    import search_handler
+    from db_pool import db_connection
+    from search_database import TRIGGERS, rebuild_search_index
+
+    projects = args.projects or 50000
+    requests = args.requests or 50
+    items_per_project, comments_per_project = 15, 4
+    rng = random.Random(18)
+
+    # Zipf-distributed words: a few appear in most rows, most are rare
+    vocabulary = list(SEARCH_VOCABULARY)
+    rng.shuffle(vocabulary)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+    def words(count):
+        return " ".join(rng.choices(vocabulary, weights, k=count))
+
+    client = load_client()
+    with db_connection() as conn:
+        trigger_names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_search_%'")]
+        for name in trigger_names:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.commit()
+
+        started = time.perf_counter()
+        c = conn.cursor()
+        c.executemany("INSERT INTO projects (id, name, description, status, created_by_email) VALUES (?, ?, ?, ?, ?)",
+                      ((pid, words(3), words(12), "active", f"user{pid % 50}@example.com")
+                       for pid in range(10, 10 + projects)))
+        c.executemany("INSERT INTO checklist_items (project_id, title, completed) VALUES (?, ?, 0)",
+                      ((pid, words(4)) for pid in range(10, 10 + projects) for _ in range(items_per_project)))
+        c.executemany("INSERT INTO comments (project_id, user_name, content) VALUES (?, 'Bench User', ?)",
+                      ((pid, words(10)) for pid in range(10, 10 + projects) for _ in range(comments_per_project)))
+        conn.commit()
+        seeded = time.perf_counter() - started
+
+    import io
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        counts = rebuild_search_index()
+        indexed = time.perf_counter() - started
+    with db_connection() as conn:
+        for trigger_sql in TRIGGERS:
+            conn.execute(trigger_sql)
+        conn.commit()
+
+    print(f"{sum(counts.values())} indexed rows ({', '.join(f'{n} {kind}' for kind, n in counts.items())})")
+    print(f"  seeding without index {seeded:.1f}s, full index build {indexed:.1f}s")
+
+    # Write cost: the same comments inserted with and without the triggers
+    def insert_comments(count):
+        with db_connection() as conn:
+            rows = [(10 + n % projects, words(10)) for n in range(count)]
+            started = time.perf_counter()
+            for row in rows:
+                conn.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, 'Bench User', ?)", row)
+            conn.commit()
+            return (time.perf_counter() - started) / count * 1e6
+
+    with_index = insert_comments(5000)
+    with db_connection() as conn:
+        conn.execute("DROP TRIGGER trg_comments_search_insert")
+        conn.commit()
+        without_index = insert_comments(5000)
+        conn.execute(next(sql for sql in TRIGGERS if "trg_comments_search_insert" in sql))
+        conn.execute("DELETE FROM comments WHERE id > (SELECT MAX(id) - 5000 FROM comments)")
+        conn.commit()
+    print(f"  comment insert: {without_index:.0f} us without index, {with_index:.0f} us with index")
+
+    user_headers = {"X-User-Info": json.dumps({
+        "email": "user7@example.com", "name": "Bench User", "source_system": "laravel11", "is_admin": False})}
+    queries = [("rare word", vocabulary[-1]), ("common word", vocabulary[0]), ("prefix", vocabulary[5][:4]),
+               ("two words", f"{vocabulary[3]} {vocabulary[40]}")]
+    with db_connection() as conn:
+        total = sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("projects", "comments", "checklist_items"))
+    for label, text in queries:
+        with db_connection() as conn:
+            matches = conn.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH ?",
+                                   (search_handler.build_match_query(text),)).fetchone()[0]
+            started = time.perf_counter()
+            for _ in range(2):
+                conn.execute(SEARCH_LIKE_QUERY, (f"%{text.split()[0]}%",)).fetchall()
+            like_ms = (time.perf_counter() - started) / 2 * 1000
+        admin = measure(client, f"/api/search?q={text}", requests, ADMIN_HEADERS)
+        user = measure(client, f"/api/search?q={text}", requests, user_headers)
+        print(f"  {label:<11} {text!r:<24} {matches / total:>4.0%} of rows   LIKE {like_ms:>7.1f} ms   "
+              f"/api/search p50 {admin['p50_ms']:>6.2f} ms admin, {user['p50_ms']:>6.2f} ms user")
+
+
+def bench_search_ranking(args):
+    """Ranking check: the best match is found even when thousands of newer, weaker matches exist"""
+    from db_pool import db_connection
+
+    newer = args.items or 5000
+    client = load_client()
+    with db_connection() as conn:
+        c = conn.cursor()
+        # The oldest project has the word in its name; every newer one only in a comment
+        c.execute("INSERT INTO projects (name, description) VALUES ('Quokka rollout', 'Oldest project')")
+        oldest_id = c.lastrowid
+        c.executemany("INSERT INTO projects (id, name) VALUES (?, ?)",
+                      ((oldest_id + n, f"Bench project {n}") for n in range(1, newer + 1)))
+        c.executemany("INSERT INTO comments (project_id, content) VALUES (?, 'mentions the quokka once')",
+                      ((oldest_id + n,) for n in range(1, newer + 1)))
+        conn.commit()
+    print(f"1 old project named 'Quokka rollout', {newer} newer projects with the word in a comment")
+
+    started = time.perf_counter()
+    results = client.get("/api/search", params={"q": "quokka", "limit": 5}, headers=ADMIN_HEADERS).json()
+    elapsed = time.perf_counter() - started
+    best = results[0] if results else None
+    ok = best is not None and best["type"] == "project" and best["id"] == oldest_id
+    print(f"  best result in {elapsed * 1000:.1f} ms: {best['type']} {best['id']} {best['title']!r}" if best else "  no results")
+    print("  OK: the oldest, best match ranks first" if ok else f"  ✗ expected project {oldest_id} first")
+    if not ok:
+        raise SystemExit(1)
+
+
+def bench_checklist_batch(args):
+    """Ticking off a whole checklist: one PATCH per item vs. one POST /api/checklist/batch"""
+    from db_pool import db_connection
+
+    items = args.items or 40
+    rounds = args.requests or 20
+    client = load_client()
+    seed_projects(rounds * 2, items_per_project=items, comments_per_project=0)
+    wal_path = os.environ["DATABASE_URL"] + "-wal"
+    print(f"Checklists of {items} items, {rounds} checklists per variant")
+
+    with db_connection() as conn:
+        project_ids = [row[0] for row in conn.execute(
+            "SELECT DISTINCT project_id FROM checklist_items ORDER BY project_id DESC LIMIT ?", (rounds * 2,))]
+        item_ids = {pid: [row[0] for row in conn.execute(
+            "SELECT id FROM checklist_items WHERE project_id = ? ORDER BY id", (pid,))] for pid in project_ids}
+
+    def tick_one_by_one(ids):
+        for item_id in ids:
+            response = client.patch(f"/api/checklist/{item_id}", params={"completed": True})
+            if response.status_code != 200:
+                raise RuntimeError(f"PATCH returned {response.status_code}: {response.text[:200]}")
+
+    def tick_batch(ids):
+        response = client.post("/api/checklist/batch",
+                               json={"operations": [{"op": "update", "id": item_id, "completed": True} for item_id in ids]})
+        if response.status_code != 200:
+            raise RuntimeError(f"POST /api/checklist/batch returned {response.status_code}: {response.text[:200]}")
+
+    results = []
+    for label, tick, projects in (("PATCH per item", tick_one_by_one, project_ids[:rounds]),
+                                  ("one batch request", tick_batch, project_ids[rounds:])):
+        latencies = []
+        wal_bytes = 0
+        for pid in projects:
+            # Start each checklist from an empty WAL so its size is what this checklist wrote
+            with db_connection() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            started = time.perf_counter()
+            tick(item_ids[pid])
+            latencies.append(time.perf_counter() - started)
+            wal_bytes += os.path.getsize(wal_path)
+        latencies.sort()
+        results.append((label, latencies[len(latencies) // 2] * 1000, wal_bytes / len(projects)))
+
+    for label, p50_ms, wal_per_checklist in results:
+        print(f"  {label:<20} p50 {p50_ms:>8.2f} ms per checklist   WAL {wal_per_checklist / 1024:>7.1f} KiB per checklist")
+    print(f"  batch vs. per item: {results[0][1] / results[1][1]:.0f}x faster, "
+          f"{results[0][2] / max(results[1][2], 1):.0f}x less WAL")
+
+
+def legacy_apply_template(template_id: int, project_id: int):
+    """The pre-set-based apply_template_to_project: one INSERT per template item"""
+    from db_pool import db_connection
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id FROM checklist_templates WHERE id = ?', (template_id,))
+        c.execute('SELECT id FROM projects WHERE id = ?', (project_id,))
+        c.execute('SELECT title, order_index FROM template_items WHERE template_id = ? ORDER BY order_index, id',
+                  (template_id,))
+        for (title, _) in c.fetchall():
+            c.execute('INSERT INTO checklist_items (project_id, title, completed) VALUES (?, ?, ?)',
+                      (project_id, title, 0))
+        conn.commit()
+
+
+def bench_template_apply(args):
+    """Starting a campaign: a template applied project by project vs. one apply call for the campaign"""
+    import io
+    import contextlib
+    from db_pool import db_connection
+    from checklist_template_handler import create_template
+
+    projects = args.projects or 500
+    items = args.items or 40
+    client = load_client()
+    seed_projects(projects * 2, items_per_project=0, comments_per_project=0)
+    with db_connection() as conn:
+        project_ids = [row[0] for row in conn.execute("SELECT id FROM projects ORDER BY id DESC LIMIT ?", (projects * 2,))]
+        conn.execute("INSERT INTO campaigns (name) VALUES ('Bench launch')")
+        campaign_id = conn.execute("SELECT MAX(id) FROM campaigns").fetchone()[0]
+        conn.executemany("UPDATE projects SET campaign_id = ? WHERE id = ?",
+                         [(campaign_id, pid) for pid in project_ids[projects:]])
+        conn.commit()
+    print(f"Template of {items} items applied to a campaign of {projects} projects")
+
+    titles = [f"Template step {n}" for n in range(items)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        template = create_template("Bench template", None, titles)
+
+        started = time.perf_counter()
+        for pid in project_ids[:projects]:
+            legacy_apply_template(template["id"], pid)
+        per_project = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = client.post(f"/api/checklist-templates/{template['id']}/apply", json={"campaign_id": campaign_id})
+        one_call = time.perf_counter() - started
+    if response.status_code != 200 or response.json()["items_created"] != projects * items:
+        raise RuntimeError(f"apply returned {response.status_code}: {response.text[:200]}")
+
+    print(f"  per-item INSERTs, project by project  {per_project * 1000:>8.0f} ms   {projects} commits")
+    print(f"  POST .../apply with campaign_id       {one_call * 1000:>8.0f} ms   1 commit")
+    print(f"  {per_project / one_call:.0f}x faster")
+
+
+def legacy_template_list():
+    """The pre-grouping get_all_templates: 1 + N COUNT queries"""
+    from db_pool import db_connection
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id, name, description, created_at, updated_at FROM checklist_templates ORDER BY created_at DESC')
+        for row in c.fetchall():
+            c.execute('SELECT COUNT(*) FROM template_items WHERE template_id = ?', (row[0],))
+            c.fetchone()
+
+
+def bench_template_list(args):
+    """GET /api/checklist-templates with thousands of templates: N+1 counts vs. one grouped query"""
+    from db_pool import db_connection
+
+    templates = args.items or 5000
+    requests = args.requests or 20
+    items_per_template = 10
+    client = load_client()
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.executemany("INSERT INTO checklist_templates (id, name, description) VALUES (?, ?, ?)",
+                      ((tid, f"Template {tid}", "Synthetic benchmark template") for tid in range(1, templates + 1)))
+        c.executemany("INSERT INTO template_items (template_id, title, order_index) VALUES (?, ?, ?)",
+                      ((tid, f"Step {n}", n) for tid in range(1, templates + 1) for n in range(items_per_template)))
+        conn.commit()
+    print(f"{templates} templates of {items_per_template} items")
+
+    from checklist_template_handler import get_all_templates
+
+    for label, list_templates in (("N+1 COUNT queries (old handler)", legacy_template_list),
+                                  ("grouped query (handler)", get_all_templates),
+                                  ("grouped, include_items (handler)", lambda: get_all_templates(True))):
+        started = time.perf_counter()
+        for _ in range(requests):
+            list_templates()
+        print(f"  {label:<36} {(time.perf_counter() - started) / requests * 1000:>8.1f} ms")
+
+    started = time.perf_counter()
+    client.get("/api/checklist-templates")
+    for tid in range(1, min(templates, 200) + 1):
+        client.get(f"/api/checklist-templates/{tid}")
+    per_template_ms = (time.perf_counter() - started) * 1000
+    print(f"  {'list + GET per template (200 only)':<36} {per_template_ms:>8.1f} ms")
+
+    for label, path in (("grouped list", "/api/checklist-templates"),
+                        ("grouped list, include_items=true", "/api/checklist-templates?include_items=true")):
+        result = measure(client, path, requests)
+        print(f"  {label:<36} {result['p50_ms']:>8.1f} ms p50 through the API")
+
+
+class StubLaravelHandler(BaseHTTPRequestHandler):
+    """Minimal /api/session/validate: cookies starting with 'valid-' are authenticated"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+    latency = 0.0
+    calls = 0
+    connections = 0
+    calls_lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes; avoid the Nagle/delayed-ACK stall
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with StubLaravelHandler.calls_lock:
+            StubLaravelHandler.connections += 1
+
+    def do_GET(self):
+        with StubLaravelHandler.calls_lock:
+            StubLaravelHandler.calls += 1
+        time.sleep(self.latency)
+
+        cookie = self.headers.get("Cookie", "")
+        cookie_name, _, session = cookie.partition("=")
+        if self.path != "/api/session/validate" or not session.startswith("valid-"):
+            body, status = {"authenticated": False}, 401
+        else:
+            body, status = {
+                "authenticated": True,
+                "source_system": "laravel11" if cookie_name == "laravel11_session" else "laravel9",
+                "user": {"id": 1, "email": f"{session}@example.com", "name": "Stub User", "is_admin": False}
+            }, 200
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_laravel(latency_ms: float) -> ThreadingHTTPServer:
+    """Serve StubLaravelHandler on a free localhost port in a background thread"""
+    StubLaravelHandler.latency = latency_ms / 1000
+    StubLaravelHandler.calls = 0
+    StubLaravelHandler.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLaravelHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_session_cache(args):
+    """Cookie-authenticated requests against a stub Laravel, with and without the session cache"""
+    import asyncio
+
+    requests = args.requests or 200
+    latency_ms = args.latency_ms if args.latency_ms is not None else 50
+    server = start_stub_laravel(latency_ms)
+    os.environ["LARAVEL11_URL"] = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        client = load_client()
+        from session_cache import session_cache
+        from session_middleware import validate_session, LARAVEL11_URL
+
+        def run(label, cookie):
+            client.cookies.set("laravel11_session", cookie)
+            calls_before = StubLaravelHandler.calls
+            result = measure(client, "/api/auth/user", requests)
+            print_result(label, result)
+            print(f"  {'':<28} {StubLaravelHandler.calls - calls_before} call(s) to Laravel")
+            return result
+
+        print(f"GET /api/auth/user with a session cookie, stub Laravel latency {latency_ms:.0f} ms, "
+              f"{requests} requests each")
+
+        ttl, negative_ttl = session_cache.ttl, session_cache.negative_ttl
+        session_cache.ttl = session_cache.negative_ttl = 0
+        before = run("no cache", "valid-alice")
+
+        session_cache.ttl, session_cache.negative_ttl = ttl, negative_ttl
+        session_cache.invalidate()
+        after = run("session cache", "valid-alice")
+        run("session cache, bad cookie", "expired-cookie")
+        print(f"  speedup: {after['rps'] / before['rps']:.2f}x")
+
+        # Concurrent first requests for one cookie must share a single Laravel call
+        async def burst():
+            return await asyncio.gather(*(
+                validate_session(LARAVEL11_URL, "valid-bob", "laravel11_session") for _ in range(50)
+            ))
+
+        calls_before = StubLaravelHandler.calls
+        users = asyncio.run(burst())
+        print(f"  50 concurrent lookups of a new cookie: {StubLaravelHandler.calls - calls_before} "
+              f"call(s) to Laravel, {sum(1 for u in users if u)} authenticated")
+        print(f"  cache stats: {session_cache.stats()}")
+    finally:
+        server.shutdown()
+
+
+def bench_session_clients(args):
+    """Session validation over one-off vs. persistent keep-alive clients, one vs. both cookies"""
+    requests = args.requests or 200
+    latency_ms = args.latency_ms if args.latency_ms is not None else 20
+    server = start_stub_laravel(latency_ms)
+    os.environ["LARAVEL11_URL"] = f"http://127.0.0.1:{server.server_port}/v2"
+    os.environ["LARAVEL9_URL"] = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        client = load_client()
+        from session_cache import session_cache
+
+        # Every request must reach Laravel to see the transport cost
+        session_cache.ttl = session_cache.negative_ttl = 0
+
+        def run(label, cookies):
+            client.cookies.clear()
+            for name, value in cookies.items():
+                client.cookies.set(name, value)
+            calls_before = StubLaravelHandler.calls
+            connections_before = StubLaravelHandler.connections
+            result = measure(client, "/api/auth/user", requests)
+            print_result(label, result)
+            print(f"  {'':<28} {StubLaravelHandler.calls - calls_before} call(s), "
+                  f"{StubLaravelHandler.connections - connections_before} new connection(s) to Laravel")
+            return result
+
+        print(f"GET /api/auth/user with the session cache off, stub Laravel latency {latency_ms:.0f} ms, "
+              f"{requests} requests each")
+
+        one_cookie = {"laravel11_session": "valid-alice"}
+        both_cookies = {"laravel11_session": "valid-alice", "digital_operations_session": "valid-alice"}
+
+        before = run("client per request", one_cookie)
+        with client:  # runs the lifespan, which opens the persistent clients
+            after = run("persistent client", one_cookie)
+            run("persistent, both cookies", both_cookies)
+        print(f"  speedup: {after['rps'] / before['rps']:.2f}x")
+    finally:
+        server.shutdown()
+
+
+WEBHOOK_HEADERS = {"Authorization": f"Bearer {os.getenv('WEBHOOK_SECRET', 'your-secret-key-change-this-in-production')}"}
+
+
+def webhook_payload(n: int, source_system: str = "laravel11", name: str = None) -> dict:
+    """A valid /api/webhooks/project payload for synthetic source id n"""
+    return {
+        "source_system": source_system,
+        "source_id": str(n),
+        "source_reference": f"BENCH-{n}",
+        "event_type": "created",
+        "timestamp": "2025-12-16T10:00:00Z",
+        "project": {
+            "name": name or f"Webhook project {n}",
+            "description": "Synthetic webhook payload",
+            "status": "active",
+            "metadata": {"user_email": f"user{n % 50}@example.com", "user_name": "Bench User"}
+        },
+        "webhook_signature": "unused"
+    }
+
+
+def bench_webhook_batch(args):
+    """Webhook ingest rate: one request per payload vs. /api/webhooks/projects/batch"""
+    payloads = args.items or 5000
+    batch_size = args.batch_size or 500
+
+    client = load_client()
+    print(f"Webhook ingest of {payloads} payloads (batches of {batch_size})")
+
+    def single(offset):
+        started = time.perf_counter()
+        for n in range(offset, offset + payloads):
+            response = client.post("/api/webhooks/project", json=webhook_payload(n), headers=WEBHOOK_HEADERS)
+            if response.status_code != 200:
+                raise RuntimeError(f"single webhook returned {response.status_code}: {response.text[:200]}")
+        return payloads / (time.perf_counter() - started)
+
+    def batched(offset, ndjson=False):
+        started = time.perf_counter()
+        for start in range(offset, offset + payloads, batch_size):
+            items = [webhook_payload(n) for n in range(start, min(start + batch_size, offset + payloads))]
+            if ndjson:
+                response = client.post("/api/webhooks/projects/batch",
+                                       content="\n".join(json.dumps(item) for item in items),
+                                       headers={**WEBHOOK_HEADERS, "Content-Type": "application/x-ndjson"})
+            else:
+                response = client.post("/api/webhooks/projects/batch", json=items, headers=WEBHOOK_HEADERS)
+            if response.status_code != 200 or response.json()["failed"]:
+                raise RuntimeError(f"batch webhook returned {response.status_code}: {response.text[:200]}")
+        return payloads / (time.perf_counter() - started)
+
+    import io
+    import contextlib
+    # The handlers print a line per project; keep the output to the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        rates = [
+            ("one request per payload (create)", single(0)),
+            ("batch JSON array (create)", batched(payloads)),
+            ("batch JSON array (replay, skipped)", batched(payloads)),
+            ("batch NDJSON (create)", batched(payloads * 2, ndjson=True)),
+        ]
+    for label, rate in rates:
+        print(f"  {label:<34} {rate:>9.0f} payloads/s")
+    before, after = rates[0][1], rates[1][1]
+    print(f"  speedup: {after / before:.1f}x")
+
+
+def bench_webhook_replay(args):
+    """Replay storm: duplicate and stale events are skipped instead of rewriting every row"""
+    payloads = args.items or 5000
+    batch_size = args.batch_size or 500
+    client = load_client()
+    print(f"{payloads} webhook payloads through the batch endpoint (batches of {batch_size})")
+
+    def deliver(timestamp):
+        totals = {"created": 0, "updated": 0, "skipped": 0}
+        started = time.perf_counter()
+        for start in range(0, payloads, batch_size):
+            items = []
+            for n in range(start, min(start + batch_size, payloads)):
+                item = webhook_payload(n)
+                item["timestamp"] = timestamp
+                items.append(item)
+            response = client.post("/api/webhooks/projects/batch", json=items, headers=WEBHOOK_HEADERS)
+            if response.status_code != 200 or response.json()["failed"]:
+                raise RuntimeError(f"batch webhook returned {response.status_code}: {response.text[:200]}")
+            for action in totals:
+                totals[action] += response.json()[action]
+        return payloads / (time.perf_counter() - started), totals
+
+    import io
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        runs = [
+            ("initial delivery", deliver("2025-12-16T10:00:00Z")),
+            ("duplicate replay", deliver("2025-12-16T10:00:00Z")),
+            ("stale replay (older events)", deliver("2025-12-16T09:00:00Z")),
+            ("newer events", deliver("2025-12-16T11:00:00Z")),
+        ]
+    for label, (rate, totals) in runs:
+        counts = ", ".join(f"{count} {action}" for action, count in totals.items())
+        print(f"  {label:<28} {rate:>9.0f} payloads/s   {counts}")
+
+
+def bench_webhook_auth(args):
+    """Webhook authentication and parsing cost, per core: parse-then-authenticate vs. raw body first"""
+    import json_codec
+    from auth import (WEBHOOK_SECRET, generate_webhook_signature, generate_body_signature,
+                      verify_body_signature, verify_webhook_signature)
+    from fastapi import Depends
+    from models import WebhookPayload
+
+    requests = args.requests or 20000
+    body = json.dumps(webhook_payload(1)).encode("utf-8")
+    signature = generate_body_signature(body, WEBHOOK_SECRET)
+    print(f"{len(body)} byte payload, JSON library: {json_codec.JSON_LIBRARY}")
+
+    def per_core(fn, count=requests):
+        started = time.process_time()
+        for _ in range(count):
+            fn()
+        return count / (time.process_time() - started)
+
+    def parse_then_sign():
+        # What checking webhook_signature took: validate, then re-serialize to HMAC
+        payload = WebhookPayload.parse_obj(json.loads(body)).dict()
+        del payload["webhook_signature"]
+        generate_webhook_signature(payload, WEBHOOK_SECRET)
+
+    def sign_then_parse(loads):
+        def run():
+            verify_body_signature(body, signature, WEBHOOK_SECRET)
+            WebhookPayload.parse_obj(loads(body))
+        return run
+
+    decoders = [("json", json.loads)]
+    if json_codec.orjson is not None:
+        decoders.append(("orjson", json_codec.orjson.loads))
+
+    print("  In process (authentication + parsing only):")
+    print(f"    {'parse, validate, re-serialize + HMAC':<42} {per_core(parse_then_sign):>9.0f} requests/core/s")
+    for name, loads in decoders:
+        print(f"    {'HMAC of raw body, ' + name + ' + validate':<42} {per_core(sign_then_parse(loads)):>9.0f} requests/core/s")
+
+    # Through the ASGI app (middleware, routing, dependencies), called directly with no HTTP client
+    import asyncio
+    import io
+    import contextlib
+    from fastapi import FastAPI
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main
+
+    app = main.app
+    legacy = FastAPI()
+
+    @legacy.post("/api/webhooks/project")
+    async def legacy_webhook(payload: WebhookPayload, authenticated: bool = Depends(verify_webhook_signature)):
+        return {"status": "success"}
+
+    async def post(target, headers):
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                 "scheme": "http", "path": "/api/webhooks/project", "raw_path": b"/api/webhooks/project",
+                 "query_string": b"", "root_path": "", "client": ("127.0.0.1", 5000), "server": ("127.0.0.1", 8000),
+                 "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                 + [(key.lower().encode(), value.encode()) for key, value in headers.items()]}
+        status = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await target(scope, receive, send)
+        return status[0]
+
+    def flood(target, headers, count, expect):
+        async def run():
+            started = time.process_time()
+            for _ in range(count):
+                status = await post(target, headers)
+                if status != expect:
+                    raise RuntimeError(f"expected {expect}, got {status}")
+            return count / (time.process_time() - started)
+        return asyncio.run(run())
+
+    count = max(requests // 4, 100)
+    bad_token = {"Authorization": "Bearer wrong-secret"}
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = [
+            ("rejected token, body parsed first (old)", flood(legacy, bad_token, count, 401)),
+            ("rejected token, raw body first", flood(app, bad_token, count, 401)),
+            ("rejected X-Webhook-Signature", flood(app, {**WEBHOOK_HEADERS, "X-Webhook-Signature": "sha256=0"},
+                                                     count, 401)),
+        ]
+    print("  Through the ASGI app:")
+    for label, rate in rows:
+        print(f"    {label:<42} {rate:>9.0f} requests/core/s")
+
+
+def legacy_webhook_stats():
+    """The pre-counter get_webhook_stats: four queries over projects"""
+    from db_pool import db_connection
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM projects WHERE source_system IS NOT NULL")
+        total = c.fetchone()[0]
+        c.execute("SELECT source_system, COUNT(*) FROM projects WHERE source_system IS NOT NULL GROUP BY source_system")
+        by_source = dict(c.fetchall())
+        c.execute("SELECT COUNT(*) FROM projects WHERE webhook_received_at > datetime('now', '-1 day')")
+        recent = c.fetchone()[0]
+        c.execute("""SELECT source_system, source_reference, webhook_received_at FROM projects
+                     WHERE webhook_received_at IS NOT NULL ORDER BY webhook_received_at DESC LIMIT 1""")
+        last = c.fetchone()
+    return {"total_webhook_projects": total, "by_source_system": by_source, "last_24h_count": recent,
+            "last_webhook": last}
+
+
+def bench_webhook_health(args):
+    """/api/webhooks/health at scale: full-table queries vs. trigger-maintained counters"""
+    from datetime import datetime, timedelta
+    from db_pool import db_connection
+
+    projects = args.projects or 100000
+    requests = args.requests or 200
+    client = load_client()
+
+    now = datetime.now()
+    with db_connection() as conn:
+        conn.executemany(
+            """INSERT INTO projects (name, status, source_system, source_id, source_reference,
+                                     webhook_received_at, last_synced_at)
+               VALUES (?, 'active', ?, ?, ?, ?, ?)""",
+            ((f"Webhook project {n}", ("laravel11", "laravel9")[n % 2], str(n), f"BENCH-{n}",
+              (now - timedelta(minutes=n * 3 * 24 * 60 // projects)).isoformat(), now.isoformat())
+             for n in range(projects))
+        )
+        conn.commit()
+    print(f"/api/webhooks/health with {projects} webhook projects received over 3 days")
+
+    import main
+    current = main.get_webhook_stats
+    measure(client, "/api/webhooks/health", 5)
+    after = measure(client, "/api/webhooks/health", requests)
+
+    main.get_webhook_stats = legacy_webhook_stats
+    try:
+        measure(client, "/api/webhooks/health", 5)
+        before = measure(client, "/api/webhooks/health", max(requests // 10, 10))
+    finally:
+        main.get_webhook_stats = current
+
+    print_result("full-table queries (old)", before)
+    print_result("counters", after)
+    print(f"  speedup: {after['rps'] / before['rps']:.1f}x")
+
+
+def bench_webhook_queue(args):
+    """Webhook acceptance rate, synchronous vs. spooled (202), plus time to drain the spool"""
+    from webhook_queue import webhook_workers, get_queue_stats
+
+    payloads = args.items or 2000
+    client = load_client()
+    print(f"{payloads} single webhooks, synchronous vs. queued")
+
+    import io
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for n in range(payloads):
+            client.post("/api/webhooks/project", json=webhook_payload(n), headers=WEBHOOK_HEADERS)
+        sync_rate = payloads / (time.perf_counter() - started)
+
+        webhook_workers.enabled = True
+        with client:  # the lifespan starts the workers
+            started = time.perf_counter()
+            for n in range(payloads, payloads * 2):
+                response = client.post("/api/webhooks/project", json=webhook_payload(n), headers=WEBHOOK_HEADERS)
+                if response.status_code != 202:
+                    raise RuntimeError(f"queued webhook returned {response.status_code}: {response.text[:200]}")
+            accepted = time.perf_counter()
+            depth_at_end = get_queue_stats()["depth"]
+            while get_queue_stats()["depth"]:
+                time.sleep(0.01)
+            drained = time.perf_counter()
+
+            # Laravel retries of already spooled events
+            for n in range(payloads, payloads + 100):
+                client.post("/api/webhooks/project", json=webhook_payload(n), headers=WEBHOOK_HEADERS)
+            stats = get_queue_stats()
+
+    print(f"  {'synchronous (200)':<28} {sync_rate:>9.0f} webhooks/s")
+    print(f"  {'queued (202)':<28} {payloads / (accepted - started):>9.0f} webhooks/s accepted")
+    print(f"  {'':<28} depth {depth_at_end} after the last request, drained {(drained - accepted) * 1000:.0f} ms later")
+    print(f"  100 retries of spooled events: spool holds {stats['done']} rows "
+          f"({stats['done'] - payloads} duplicates), {stats['failed']} failed")
+
+
+def bench_webhook_race(args):
+    """Concurrency check: many workers deliver the same source_id (and campaign) at once"""
+    from concurrent.futures import ThreadPoolExecutor
+    from db_pool import db_connection
+    from webhook_handler import handle_webhook_project_grouped
+
+    workers = args.workers or 32
+    deliveries = args.requests or 20
+    load_client()
+    print(f"{workers} workers x {deliveries} deliveries of each source_id")
+
+    def deliver(round_number, worker):
+        payload = webhook_payload(round_number, name=f"Delivery {worker}")
+        payload["campaign"] = {"name": f"Race campaign {round_number}"}
+        return handle_webhook_project_grouped(payload)["action"]
+
+    import io
+    import contextlib
+    errors = []
+    actions = []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for round_number in range(deliveries):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(deliver, round_number, worker) for worker in range(workers)]
+            for future in futures:
+                try:
+                    actions.append(future.result())
+                except Exception as e:
+                    errors.append(str(e))
+    elapsed = time.perf_counter() - started
+
+    with db_connection() as conn:
+        projects = conn.execute("SELECT COUNT(*) FROM projects WHERE source_system = 'laravel11'").fetchone()[0]
+        campaigns = conn.execute("SELECT COUNT(*) FROM campaigns WHERE source_system = 'laravel11'").fetchone()[0]
+
+    created = actions.count("created")
+    ok = not errors and projects == deliveries and campaigns == deliveries and created == deliveries
+    print(f"  {len(actions)} deliveries in {elapsed:.2f}s, {len(errors)} errors")
+    print(f"  {projects} projects and {campaigns} campaigns for {deliveries} source ids, "
+          f"{created} reported created, {actions.count('updated')} updated")
+    for error in errors[:5]:
+        print(f"  ✗ {error}")
+    print("  OK: exactly one row per source id" if ok else "  ✗ duplicate rows or errors")
+    if not ok:
+        raise SystemExit(1)
+
+
+def bench_mixed_load(args):
+    """Dashboard polling during a webhook replay: shared pool vs. read-only pool and one (grouped) writer"""
+    import io
+    import contextlib
+    from concurrent.futures import ThreadPoolExecutor
+    from db_pool import configure_pool
+    from data_version import get_data_version
+    from project_query import ProjectListParams
+    from project_stats import get_project_stats
+    from webhook_handler import handle_webhook_project, handle_webhook_projects_batch, handle_webhook_project_grouped
+
+    projects = args.projects or 20000
+    deliveries = args.items or 4000
+    writers = args.workers or 16
+    batch_size = args.batch_size or 500
+    readers = 4
+    poll_interval = 0.005
+    sources = 2000
+
+    load_client()
+    seed_projects(projects, items_per_project=5, comments_per_project=1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        handle_webhook_projects_batch([webhook_payload(n) for n in range(sources)])
+    print(f"{projects} projects; {readers} readers poll a stats page every {poll_interval * 1000:.0f} ms "
+          f"during a replay of updates to {sources} webhook projects")
+
+    def poll_until(stop):
+        latencies = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            get_data_version()
+            get_project_stats(None, ProjectListParams(limit=50))
+            latencies.append(time.perf_counter() - started)
+            time.sleep(poll_interval)
+        return latencies
+
+    def replay(label, deliver, replay_round, payloads, per_call):
+        def send(call):
+            items = []
+            for n in range(call * per_call, (call + 1) * per_call):
+                item = webhook_payload(n % sources, name=f"Replay {replay_round}")
+                item["timestamp"] = f"2025-12-16T{10 + replay_round:02d}:{n // sources // 60:02d}:{n // sources % 60:02d}Z"
+                items.append(item)
+            return deliver(items)
+
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=readers) as reader_pool:
+            polls = [reader_pool.submit(poll_until, stop) for _ in range(readers)]
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=writers) as writer_pool:
+                list(writer_pool.map(send, range(payloads // per_call)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            latencies = sorted(latency for poll in polls for latency in poll.result())
+
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+        print(f"  {label:<34} {len(latencies):>5} reads  p50 {p50:>6.1f} ms  p99 {p99:>7.1f} ms  "
+              f"max {latencies[-1] * 1000:>7.1f} ms   {payloads / elapsed:>6.0f} webhooks/s")
+
+    print(f"Single deliveries, {writers} workers:")
+    configure_pool(split_reads=False)
+    replay("shared pool", lambda items: handle_webhook_project(items[0]), 1, deliveries, 1)
+    configure_pool()
+    replay("read pool + one writer", lambda items: handle_webhook_project(items[0]), 2, deliveries, 1)
+    replay("read pool + grouped writer", lambda items: handle_webhook_project_grouped(items[0]), 3, deliveries, 1)
+
+    print(f"Batch replay, {writers} workers x batches of {batch_size}:")
+    configure_pool(split_reads=False)
+    replay("shared pool", handle_webhook_projects_batch, 4, deliveries * 5, batch_size)
+    configure_pool()
+    replay("read pool + one writer", handle_webhook_projects_batch, 5, deliveries * 5, batch_size)
+
+
+def bench_event_loop(args):
+    """Event loop responsiveness during long stats queries: sqlite3 on the loop (as before) vs. run_read()"""
+    import asyncio
+    import httpx
+    import main
+    from data_version import get_data_version
+    from db_executor import run_read
+    from project_stats import get_project_stats
+
+    projects = args.projects or 20000
+    slow_requests = args.requests or 16
+    concurrency = args.workers or 4
+    ping_interval = 0.01
+
+    load_client()
+    seed_projects(projects, items_per_project=5, comments_per_project=1)
+
+    def count_stats():
+        get_data_version()
+        return len(get_project_stats(None, None)[0])
+
+    # The same unpaginated stats query; only its count is returned, so response encoding stays out of the picture
+    async def inline_stats():
+        return {"projects": count_stats()}
+
+    async def worker_stats():
+        return {"projects": await run_read(count_stats)}
+
+    main.app.add_api_route("/bench/inline-stats", inline_stats, methods=["GET"])
+    main.app.add_api_route("/bench/worker-stats", worker_stats, methods=["GET"])
+    print(f"{slow_requests} unpaginated stats queries over {projects} projects, {concurrency} at a time, "
+          f"while GET / is pinged every {ping_interval * 1000:.0f} ms")
+
+    async def run(path):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get(path)
+            done = asyncio.Event()
+            pings = []
+
+            async def ping():
+                # Latency counts from when the ping was due, so a blocked loop shows up even mid-sleep
+                due = time.perf_counter()
+                while not done.is_set():
+                    await client.get("/")
+                    pings.append(time.perf_counter() - due)
+                    due = time.perf_counter() + ping_interval
+                    await asyncio.sleep(ping_interval)
+
+            async def slow(count):
+                for _ in range(count):
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+
+            pinger = asyncio.create_task(ping())
+            started = time.perf_counter()
+            per_worker = [slow_requests // concurrency + (n < slow_requests % concurrency) for n in range(concurrency)]
+            await asyncio.gather(*(slow(count) for count in per_worker))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await pinger
+            return elapsed, sorted(pings)
+
+    for label, path in (("inline on the event loop", "/bench/inline-stats"), ("run_read()", "/bench/worker-stats")):
+        elapsed, pings = asyncio.run(run(path))
+        p50 = pings[len(pings) // 2] * 1000
+        p99 = pings[min(len(pings) - 1, int(len(pings) * 0.99))] * 1000
+        print(f"  {label:<26} {slow_requests / elapsed:>5.2f} queries/s  {len(pings):>4} pings  "
+              f"p50 {p50:>7.1f} ms  p99 {p99:>7.1f} ms  max {pings[-1] * 1000:>7.1f} ms")
+
+
+def bench_webhook_campaigns(args):
+    """Webhooks that reference a few campaigns: statements and throughput with and without the campaign cache"""
+    import sqlite3
+    from campaign_cache import campaign_cache
+    from campaign_handler import update_campaign, delete_campaign
+    from webhook_handler import handle_webhook_project
+
+    payloads = args.items or 2000
+    campaigns = 5
+    load_client()
+    print(f"{payloads} webhooks spread over {campaigns} campaigns")
+
+    def payload(n):
+        item = webhook_payload(n)
+        item["campaign"] = {"name": f"Replay campaign {n % campaigns}"}
+        return item
+
+    import io
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        handle_webhook_project(payload(0))
+        max_entries = campaign_cache.max_entries
+
+        results = []
+        for label, cache_size, offset in (("no campaign cache", 0, 1), ("campaign cache", max_entries, payloads)):
+            campaign_cache.max_entries = cache_size
+            campaign_cache.clear()
+            for n in range(offset, offset + campaigns):
+                handle_webhook_project(payload(n))
+            _, statements = count_statements(handle_webhook_project, payload(offset + campaigns))
+
+            started = time.perf_counter()
+            for n in range(offset + campaigns + 1, offset + payloads):
+                handle_webhook_project(payload(n))
+            results.append((label, statements, (payloads - campaigns - 1) / (time.perf_counter() - started)))
+
+        # Invalidation: a renamed or deleted campaign must be resolved again
+        campaign_id = campaign_cache.get("laravel11", "Replay campaign 1")
+        update_campaign(campaign_id, {"description": "changed"})
+        after_update = campaign_cache.get("laravel11", "Replay campaign 1")
+        delete_campaign(campaign_id)
+        handle_webhook_project(payload(1))
+        recreated = campaign_cache.get("laravel11", "Replay campaign 1")
+
+        # A delete by another worker never touches this process's cache
+        other_worker = sqlite3.connect(os.environ["DATABASE_URL"])
+        other_worker.execute('DELETE FROM campaigns WHERE id = ?', (recreated,))
+        other_worker.commit()
+        other_worker.close()
+        handle_webhook_project(payload(1))
+        recreated_elsewhere = campaign_cache.get("laravel11", "Replay campaign 1")
+
+    for label, statements, rate in results:
+        print(f"  {label:<20} {statements} statements per webhook   {rate:>7.0f} webhooks/s")
+    print(f"  after update_campaign: {'still cached' if after_update else 'evicted'}; "
+          f"after delete_campaign the next webhook created campaign {recreated} (was {campaign_id})")
+    print(f"  after a delete by another worker the next webhook created campaign {recreated_elsewhere} "
+          f"(was {recreated})")
+
+
+def bench_startup(args):
+    """Worker start: every migration on every start (as before) vs. schema_version, and workers racing on a new database"""
+    import sqlite3
+    import subprocess
+    from schema_migrations import MIGRATIONS
+
+    projects = args.projects or 20000
+    workers = args.workers or 8
+    runs = args.requests or 5
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    tmp_dir = os.path.dirname(os.environ["DATABASE_URL"])
+
+    load_client()
+    seed_projects(projects)
+    print(f"Database with {projects} projects, {len(MIGRATIONS)} migrations; each start is a new process")
+
+    def start_worker(db_path, code, setup="pass"):
+        timed = f"{setup}; import time; started = time.perf_counter(); {code}; print(time.perf_counter() - started)"
+        return subprocess.Popen([sys.executable, "-c", timed], cwd=backend_dir,
+                                env={**os.environ, "DATABASE_URL": db_path},
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    def median_start(code, setup="pass"):
+        """Median seconds of code in a new interpreter (after setup), and the lines it printed"""
+        timings = []
+        for _ in range(runs):
+            output, _ = start_worker(os.environ["DATABASE_URL"], code, setup).communicate()
+            lines = output.splitlines()
+            timings.append(float(lines[-1]))
+        return sorted(timings)[runs // 2], len(lines) - 1
+
+    import_migrations = "from schema_migrations import MIGRATIONS, run_migrations"
+    legacy, legacy_lines = median_start("[migrate() for _, _, migrate in MIGRATIONS]", import_migrations)
+    versioned, versioned_lines = median_start("run_migrations()", import_migrations)
+    print(f"  migration step            every migration {legacy * 1000:>7.1f} ms ({legacy_lines} lines printed)   "
+          f"schema_version {versioned * 1000:>6.1f} ms ({versioned_lines} lines)")
+
+    up_to_date, _ = median_start("import main")
+    output, _ = start_worker(os.path.join(tmp_dir, "startup-new.db"), "import main").communicate()
+    print(f"  import main               new database {float(output.splitlines()[-1]) * 1000:>7.1f} ms   "
+          f"up to date {up_to_date * 1000:>7.1f} ms")
+
+    # Several workers starting at once on a new database: one migrates, the others wait and skip
+    race_db = os.path.join(tmp_dir, "startup-race.db")
+    started = time.perf_counter()
+    processes = [start_worker(race_db, "import main") for _ in range(workers)]
+    outputs = [process.communicate()[0] for process in processes]
+    elapsed = time.perf_counter() - started
+    migrating = sum(1 for output in outputs if "Applying schema migration" in output)
+    failed = sum(1 for process in processes if process.returncode != 0)
+
+    conn = sqlite3.connect(race_db)
+    try:
+        recorded = conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+        demo_projects = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+    finally:
+        conn.close()
+    ok = not failed and migrating == 1 and recorded == len(MIGRATIONS) and demo_projects == 3
+    print(f"  {workers} workers on a new database in {elapsed:.2f}s: {migrating} migrated, {failed} failed, "
+          f"{recorded} versions recorded, {demo_projects} demo projects")
+    print("  OK: migrated exactly once" if ok else "  ✗ migrations ran more than once or failed")
+    if not ok:
+        raise SystemExit(1)
+
+
+BENCHMARKS = {
+    "stats-rps": bench_stats_rps,
+    "stats-scale": bench_stats_scale,
+    "stats-pages": bench_stats_pages,
+    "campaign-stats": bench_campaign_stats,
+    "search": bench_search,
+    "search-ranking": bench_search_ranking,
+    "checklist-batch": bench_checklist_batch,
+    "template-apply": bench_template_apply,
+    "template-list": bench_template_list,
+    "session-cache": bench_session_cache,
+    "session-clients": bench_session_clients,
+    "webhook-batch": bench_webhook_batch,
+    "webhook-queue": bench_webhook_queue,
+    "webhook-race": bench_webhook_race,
+    "webhook-campaigns": bench_webhook_campaigns,
+    "webhook-replay": bench_webhook_replay,
+    "webhook-auth": bench_webhook_auth,
+    "webhook-health": bench_webhook_health,
+    "mixed-load": bench_mixed_load,
+    "event-loop": bench_event_loop,
+    "startup": bench_startup,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--projects", type=int, help="Number of synthetic projects")
+    parser.add_argument("--items", type=int, help="Number of checklist items")
+    parser.add_argument("--requests", type=int, help="Requests per measurement")
+    parser.add_argument("--workers", type=int, help="Concurrent workers")
+    parser.add_argument("--batch-size", type=int, help="Payloads per batch request")
+    parser.add_argument("--latency-ms", type=float, help="Simulated latency of the stub Laravel server")
+    parser.add_argument("--legacy", action="store_true", help="Also time the legacy implementation (slow)")
+    parser.add_argument("--keep-db", action="store_true", help="Keep the temp database afterwards")
+    args = parser.parse_args(argv)
+
+    tmp_dir = use_temp_database()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        BENCHMARKS[args.benchmark](args)
+    finally:
+        if args.keep_db:
+            print(f"Database kept at {os.environ['DATABASE_URL']}")
+        else:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
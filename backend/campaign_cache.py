@@ -0,0 +1,87 @@
+"""
+In-process cache of webhook campaign ids
+
+Webhooks carrying a campaign block resolve it to a campaign id by
+(source_system, campaign name). Bulk replays hit the same few campaigns over
+and over, so resolved ids are kept in a bounded LRU map and repeated webhooks
+skip the campaign upsert entirely.
+
+Entries are only added after the transaction that created or found the
+campaign has committed. update_campaign and delete_campaign invalidate them
+locally. Changes made by other workers are caught through campaign_version
+(see data_version.py): each webhook reads it and sync() drops every entry
+when it has moved, and an entry is only stored under the version it was
+resolved at. The TTL is a backstop.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+CAMPAIGN_CACHE_MAX_ENTRIES = int(os.getenv("CAMPAIGN_CACHE_MAX_ENTRIES", "1000"))
+CAMPAIGN_CACHE_TTL_SECONDS = float(os.getenv("CAMPAIGN_CACHE_TTL_SECONDS", "300"))
+
+
+class CampaignCache:
+    """Thread-safe LRU map from (source_system, campaign name) to campaign id"""
+
+    def __init__(self, max_entries: int = CAMPAIGN_CACHE_MAX_ENTRIES, ttl: float = CAMPAIGN_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, source_system: str, name: str) -> Optional[int]:
+        key = (source_system, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def sync(self, version: int):
+        """Drop every entry if campaigns changed since the cache last saw the version"""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+
+    def put(self, source_system: str, name: str, campaign_id: int, version: int):
+        """Cache an id resolved at version; ignored if the cache has moved past it"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[(source_system, name)] = (time.monotonic() + self.ttl, campaign_id)
+            self._entries.move_to_end((source_system, name))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_campaign(self, campaign_id: int):
+        """Drop every entry pointing at a campaign"""
+        with self._lock:
+            for key in [key for key, (_, cached_id) in self._entries.items() if cached_id == campaign_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+
+campaign_cache = CampaignCache()
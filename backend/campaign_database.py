@@ -2,18 +2,12 @@
 Campaign database migration for cfh-project
 """
 import sqlite3
-import os
-
-
-def get_db_path() -> str:
-    """Get the database file path"""
-    return os.path.join(os.path.dirname(__file__), 'demo.db')
+from db_pool import get_connection, release_connection
 
 
 def migrate_campaigns():
     """Create campaigns table and add campaign_id to projects table"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     print("Starting campaign migration...")
@@ -45,10 +39,11 @@ def migrate_campaigns():
         else:
             print(f"  ✗ Error adding campaign_id column: {e}")
 
-    # Create index on campaign_id for faster lookups
+    # Index for campaign lookups that also serves a campaign's projects newest first
     try:
-        c.execute('CREATE INDEX IF NOT EXISTS idx_projects_campaign ON projects(campaign_id)')
-        print("  [OK] Created index on projects.campaign_id")
+        c.execute('CREATE INDEX IF NOT EXISTS idx_projects_campaign_created_at ON projects(campaign_id, created_at)')
+        c.execute('DROP INDEX IF EXISTS idx_projects_campaign')
+        print("  [OK] Created index on projects(campaign_id, created_at)")
     except sqlite3.OperationalError as e:
         print(f"  - Index already exists or error: {e}")
 
@@ -60,16 +55,39 @@ def migrate_campaigns():
     except sqlite3.OperationalError as e:
         print(f"  - Index already exists or error: {e}")
 
+    # Webhook campaigns (no source_id) are keyed by name per source system.
+    # Merge duplicates left by the old find-then-insert path before enforcing it.
+    c.execute('''SELECT source_system, source_reference, MIN(id)
+                 FROM campaigns
+                 WHERE source_id IS NULL AND source_system IS NOT NULL AND source_reference IS NOT NULL
+                 GROUP BY source_system, source_reference
+                 HAVING COUNT(*) > 1''')
+    duplicates = c.fetchall()
+    for source_system, source_reference, keep_id in duplicates:
+        c.execute('''UPDATE projects SET campaign_id = ?
+                     WHERE campaign_id IN (SELECT id FROM campaigns
+                                           WHERE source_system = ? AND source_reference = ?
+                                             AND source_id IS NULL AND id != ?)''',
+                  (keep_id, source_system, source_reference, keep_id))
+        c.execute('''DELETE FROM campaigns
+                     WHERE source_system = ? AND source_reference = ? AND source_id IS NULL AND id != ?''',
+                  (source_system, source_reference, keep_id))
+    if duplicates:
+        print(f"  [OK] Merged {len(duplicates)} duplicated webhook campaigns")
+
+    c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_campaigns_source_reference
+                 ON campaigns(source_system, source_reference) WHERE source_id IS NULL''')
+    print("  [OK] Created unique index on campaigns(source_system, source_reference)")
+
     conn.commit()
-    conn.close()
+    release_connection(conn)
 
     print("Campaign migration completed successfully!")
 
 
 def create_demo_campaign():
     """Create a demo campaign with sample data"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     # Check if demo campaign already exists
@@ -91,7 +109,7 @@ def create_demo_campaign():
     else:
         print("  - Demo campaign already exists")
 
-    conn.close()
+    release_connection(conn)
 
 
 if __name__ == "__main__":
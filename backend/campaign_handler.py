@@ -3,31 +3,25 @@ Campaign handler for CRUD operations
 """
 from fastapi import HTTPException
 from typing import Dict, Any, List, Optional
-import sqlite3
 from datetime import datetime
 import json
-import os
-
-
-def get_db_path() -> str:
-    """Get the database file path"""
-    return os.path.join(os.path.dirname(__file__), 'demo.db')
+from db_pool import get_connection, release_connection, get_read_connection, release_read_connection
+from event_bus import publish_change
+from campaign_cache import campaign_cache
 
 
 def get_all_campaigns() -> List[Dict[str, Any]]:
     """Get all campaigns with project counts"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_read_connection()
     c = conn.cursor()
 
     try:
         c.execute('''SELECT c.id, c.name, c.description, c.status, c.source_system,
                             c.source_id, c.source_reference, c.metadata, c.created_at, c.updated_at,
-                            COUNT(p.id) as project_count,
-                            SUM(CASE WHEN p.status = 'completed' THEN 1 ELSE 0 END) as completed_projects
+                            COALESCE(cc.project_count, 0) as project_count,
+                            COALESCE(cc.completed_projects, 0) as completed_projects
                      FROM campaigns c
-                     LEFT JOIN projects p ON c.id = p.campaign_id
-                     GROUP BY c.id
+                     LEFT JOIN campaign_counters cc ON cc.campaign_id = c.id
                      ORDER BY c.created_at DESC''')
 
         campaigns = []
@@ -49,13 +43,12 @@ def get_all_campaigns() -> List[Dict[str, Any]]:
 
         return campaigns
     finally:
-        conn.close()
+        release_read_connection(conn)
 
 
 def get_campaign_by_id(campaign_id: int, include_projects: bool = False) -> Dict[str, Any]:
     """Get a specific campaign by ID"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_read_connection()
     c = conn.cursor()
 
     try:
@@ -101,13 +94,12 @@ def get_campaign_by_id(campaign_id: int, include_projects: bool = False) -> Dict
 
         return campaign
     finally:
-        conn.close()
+        release_read_connection(conn)
 
 
 def create_campaign(data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new campaign"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     try:
@@ -127,6 +119,7 @@ def create_campaign(data: Dict[str, Any]) -> Dict[str, Any]:
         conn.commit()
 
         print(f"[OK] Created campaign {campaign_id}: {data['name']}")
+        publish_change('campaign', 'created', campaign_id, campaign_id=campaign_id)
 
         return {
             'id': campaign_id,
@@ -141,13 +134,12 @@ def create_campaign(data: Dict[str, Any]) -> Dict[str, Any]:
         conn.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
-        conn.close()
+        release_connection(conn)
 
 
 def update_campaign(campaign_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
     """Update an existing campaign"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     try:
@@ -184,7 +176,9 @@ def update_campaign(campaign_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         c.execute(query, params)
         conn.commit()
 
+        campaign_cache.invalidate_campaign(campaign_id)
         print(f"[OK] Updated campaign {campaign_id}")
+        publish_change('campaign', 'updated', campaign_id, campaign_id=campaign_id)
 
         return get_campaign_by_id(campaign_id)
     except HTTPException:
@@ -193,13 +187,12 @@ def update_campaign(campaign_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         conn.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
-        conn.close()
+        release_connection(conn)
 
 
 def delete_campaign(campaign_id: int) -> Dict[str, str]:
     """Delete a campaign (and optionally unlink projects)"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     try:
@@ -215,7 +208,9 @@ def delete_campaign(campaign_id: int) -> Dict[str, str]:
         c.execute('DELETE FROM campaigns WHERE id = ?', (campaign_id,))
         conn.commit()
 
+        campaign_cache.invalidate_campaign(campaign_id)
         print(f"[OK] Deleted campaign {campaign_id}")
+        publish_change('campaign', 'deleted', campaign_id, campaign_id=campaign_id)
 
         return {"message": f"Campaign {campaign_id} deleted successfully"}
     except HTTPException:
@@ -224,7 +219,7 @@ def delete_campaign(campaign_id: int) -> Dict[str, str]:
         conn.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
-        conn.close()
+        release_connection(conn)
 
 
 def find_or_create_campaign(source_system: str, source_id: str, campaign_data: Dict[str, Any]) -> int:
@@ -232,8 +227,7 @@ def find_or_create_campaign(source_system: str, source_id: str, campaign_data: D
     Find existing campaign by source system/ID or create new one
     Returns campaign_id
     """
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     try:
@@ -265,10 +259,11 @@ def find_or_create_campaign(source_system: str, source_id: str, campaign_data: D
         conn.commit()
 
         print(f"[OK] Created campaign {campaign_id} from webhook: {campaign_data['name']}")
+        publish_change('campaign', 'created', campaign_id, campaign_id=campaign_id)
         return campaign_id
 
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     finally:
-        conn.close()
+        release_connection(conn)
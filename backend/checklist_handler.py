@@ -0,0 +1,170 @@
+import os
+from typing import List, Dict, Any, Optional, Tuple
+from db_pool import db_connection, read_connection
+from event_bus import publish_change
+
+# Largest accepted POST /api/checklist/batch
+CHECKLIST_BATCH_MAX_OPERATIONS = int(os.getenv("CHECKLIST_BATCH_MAX_OPERATIONS", "500"))
+
+# Update statements by the fields an operation sets, so triggers on the other column stay quiet
+UPDATE_SQL = {
+    ('completed',): 'UPDATE checklist_items SET completed = ? WHERE id = ?',
+    ('title',): 'UPDATE checklist_items SET title = ? WHERE id = ?',
+    ('completed', 'title'): 'UPDATE checklist_items SET completed = ?, title = ? WHERE id = ?',
+}
+
+def _placeholders(values) -> str:
+    return ', '.join('?' for _ in values)
+
+def _item_dict(row) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "project_id": row[1],
+        "title": row[2],
+        "completed": bool(row[3]),
+        "created_at": row[4]
+    }
+
+def get_project_checklist(project_id: int) -> List[Dict[str, Any]]:
+    """Get the checklist items of a project"""
+    with read_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id, project_id, title, completed, created_at FROM checklist_items WHERE project_id = ?', (project_id,))
+        return [_item_dict(row) for row in c.fetchall()]
+
+def create_checklist_item(project_id: int, title: str, completed: bool = False) -> int:
+    """Add an item to a project's checklist; returns its id"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('INSERT INTO checklist_items (project_id, title, completed) VALUES (?, ?, ?)',
+                  (project_id, title, int(completed)))
+        item_id = c.lastrowid
+        conn.commit()
+    publish_change('checklist', 'created', item_id, project_id=project_id)
+    return item_id
+
+def set_checklist_item_completed(item_id: int, completed: bool) -> Optional[int]:
+    """Tick or untick an item; returns its project id, or None when the item does not exist"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('UPDATE checklist_items SET completed = ? WHERE id = ? RETURNING project_id',
+                  (int(completed), item_id))
+        row = c.fetchone()
+        conn.commit()
+    if row:
+        publish_change('checklist', 'updated', item_id, project_id=row[0])
+    return row[0] if row else None
+
+def validate_checklist_operations(cursor, operations: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[int, int]]:
+    """
+    Check a batch against the database before anything is written
+
+    Every referenced item and project must exist, and an item may appear in
+    only one operation.
+
+    Returns:
+        (errors, project id per referenced item); errors use FastAPI's 422 format
+    """
+    errors = []
+
+    item_ids = [op['id'] for op in operations if op['op'] != 'create']
+    project_ids = sorted({op['project_id'] for op in operations if op['op'] == 'create'})
+
+    item_projects: Dict[int, int] = {}
+    if item_ids:
+        cursor.execute(f'SELECT id, project_id FROM checklist_items WHERE id IN ({_placeholders(item_ids)})',
+                       item_ids)
+        item_projects = dict(cursor.fetchall())
+    existing_projects = set()
+    if project_ids:
+        cursor.execute(f'SELECT id FROM projects WHERE id IN ({_placeholders(project_ids)})', project_ids)
+        existing_projects = {row[0] for row in cursor.fetchall()}
+
+    seen = set()
+    for index, op in enumerate(operations):
+        loc = ("body", "operations", index)
+        if op['op'] == 'create':
+            if op['project_id'] not in existing_projects:
+                errors.append({"type": "value_error", "loc": (*loc, "project_id"),
+                               "msg": f"Project {op['project_id']} not found", "input": op['project_id']})
+            continue
+        if op['id'] not in item_projects:
+            errors.append({"type": "value_error", "loc": (*loc, "id"),
+                           "msg": f"Checklist item {op['id']} not found", "input": op['id']})
+        elif op['id'] in seen:
+            errors.append({"type": "value_error", "loc": (*loc, "id"),
+                           "msg": f"Checklist item {op['id']} appears in more than one operation", "input": op['id']})
+        seen.add(op['id'])
+
+    return errors, item_projects
+
+def apply_checklist_operations(operations: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Validate and apply create/update/delete operations on checklist items in one transaction
+
+    Updates and deletes of the same kind are sent with one executemany each;
+    creates are inserted one by one to get their ids back. Nothing is written
+    when any operation is invalid.
+
+    Args:
+        operations: ChecklistOperation dicts
+
+    Returns:
+        (errors, results): results hold one entry per operation, in request order,
+        with the resulting row (or just the id for deletes)
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+
+        # Take the write lock first, so no other writer changes what was validated
+        c.execute('BEGIN IMMEDIATE')
+        errors, item_projects = validate_checklist_operations(c, operations)
+        if errors:
+            conn.rollback()
+            return errors, []
+
+        creates = [op for op in operations if op['op'] == 'create']
+        deletes = [op for op in operations if op['op'] == 'delete']
+        updates: Dict[Tuple[str, ...], List[Tuple]] = {}
+        for op in operations:
+            if op['op'] == 'update':
+                fields = tuple(field for field in ('completed', 'title') if op[field] is not None)
+                values = tuple(int(op[field]) if field == 'completed' else op[field] for field in fields)
+                updates.setdefault(fields, []).append(values + (op['id'],))
+
+        if deletes:
+            c.executemany('DELETE FROM checklist_items WHERE id = ?', [(op['id'],) for op in deletes])
+        for fields, rows in updates.items():
+            c.executemany(UPDATE_SQL[fields], rows)
+
+        # One statement per row: executemany() drops RETURNING rows
+        created_ids = []
+        for op in creates:
+            c.execute('INSERT INTO checklist_items (project_id, title, completed) VALUES (?, ?, ?) RETURNING id',
+                      (op['project_id'], op['title'], int(op['completed'] or False)))
+            created_ids.append(c.fetchone()[0])
+
+        changed_ids = created_ids + [op['id'] for op in operations if op['op'] == 'update']
+        rows = {}
+        if changed_ids:
+            c.execute(f'''SELECT id, project_id, title, completed, created_at FROM checklist_items
+                          WHERE id IN ({_placeholders(changed_ids)})''', changed_ids)
+            rows = {row[0]: _item_dict(row) for row in c.fetchall()}
+
+        conn.commit()
+
+    results = []
+    new_ids = iter(created_ids)
+    for index, op in enumerate(operations):
+        if op['op'] == 'create':
+            results.append({"index": index, "op": "create", "item": rows[next(new_ids)]})
+        elif op['op'] == 'update':
+            results.append({"index": index, "op": "update", "item": rows[op['id']]})
+        else:
+            results.append({"index": index, "op": "delete", "item": {"id": op['id'], "project_id": item_projects[op['id']]}})
+
+    # One event per project instead of one per item
+    for project_id in sorted({result['item']['project_id'] for result in results} - {None}):
+        publish_change('checklist', 'updated', None, project_id=project_id)
+
+    return [], results
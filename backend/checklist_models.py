@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field, root_validator, validator
+from typing import List, Optional
+
+CHECKLIST_OPERATIONS = ('create', 'update', 'delete')
+
+class ChecklistOperation(BaseModel):
+    """
+    One operation of a checklist batch
+
+    - create: project_id and title required, completed optional
+    - update: id plus title and/or completed
+    - delete: id only
+    """
+    op: str = Field(..., description="create, update or delete")
+    id: Optional[int] = Field(None, description="Checklist item id (update, delete)")
+    project_id: Optional[int] = Field(None, description="Project of the new item (create)")
+    title: Optional[str] = Field(None, min_length=1, max_length=500)
+    completed: Optional[bool] = None
+
+    @validator('op')
+    def validate_op(cls, v):
+        if v not in CHECKLIST_OPERATIONS:
+            raise ValueError(f"Operation must be one of: {', '.join(CHECKLIST_OPERATIONS)}")
+        return v
+
+    @root_validator(skip_on_failure=True)
+    def validate_fields(cls, values):
+        op = values.get('op')
+        if op == 'create':
+            if values.get('project_id') is None or values.get('title') is None:
+                raise ValueError("create requires project_id and title")
+            if values.get('id') is not None:
+                raise ValueError("create does not take an id")
+        elif op == 'update':
+            if values.get('id') is None:
+                raise ValueError("update requires an id")
+            if values.get('title') is None and values.get('completed') is None:
+                raise ValueError("update requires title or completed")
+            if values.get('project_id') is not None:
+                raise ValueError("update cannot move an item to another project")
+        elif op == 'delete':
+            if values.get('id') is None:
+                raise ValueError("delete requires an id")
+        return values
+
+class ChecklistBatch(BaseModel):
+    operations: List[ChecklistOperation] = Field(..., min_length=1)
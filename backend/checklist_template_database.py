@@ -1,8 +1,8 @@
-import sqlite3
+from db_pool import get_connection, release_connection
 
 def migrate_checklist_templates():
     """Create checklist templates and template items tables"""
-    conn = sqlite3.connect('demo.db')
+    conn = get_connection()
     c = conn.cursor()
 
     print("Starting checklist templates migration...")
@@ -26,13 +26,15 @@ def migrate_checklist_templates():
                   FOREIGN KEY (template_id) REFERENCES checklist_templates(id) ON DELETE CASCADE)''')
     print("  [OK] Created template_items table")
 
-    # Create index on template_id
-    c.execute('''CREATE INDEX IF NOT EXISTS idx_template_items_template_id
-                 ON template_items(template_id)''')
-    print("  [OK] Created index on template_items.template_id")
+    # Index on (template_id, order_index): items come back in checklist order without a sort.
+    # It replaces the former template_id-only index, which is its prefix.
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_template_items_order
+                 ON template_items(template_id, order_index)''')
+    c.execute('DROP INDEX IF EXISTS idx_template_items_template_id')
+    print("  [OK] Created index on template_items(template_id, order_index)")
 
     conn.commit()
-    conn.close()
+    release_connection(conn)
 
     print("Checklist templates migration completed successfully!")
 
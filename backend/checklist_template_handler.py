@@ -1,61 +1,63 @@
-import sqlite3
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-
-def get_all_templates() -> List[Dict[str, Any]]:
-    """Get all checklist templates with their item counts"""
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-
-    c.execute('SELECT id, name, description, created_at, updated_at FROM checklist_templates ORDER BY created_at DESC')
-    templates = []
-
-    for row in c.fetchall():
-        template_id = row[0]
-
-        # Count template items
-        c.execute('SELECT COUNT(*) FROM template_items WHERE template_id = ?', (template_id,))
-        item_count = c.fetchone()[0]
-
-        templates.append({
+from db_pool import db_connection, read_connection
+from event_bus import publish_change
+
+def get_all_templates(include_items: bool = False) -> List[Dict[str, Any]]:
+    """
+    Get all checklist templates with their item counts
+
+    Args:
+        include_items: Also return every template's items (one extra query for all templates)
+    """
+    with read_connection() as conn:
+        c = conn.cursor()
+
+        c.execute('''SELECT t.id, t.name, t.description, t.created_at, t.updated_at, COALESCE(ti.item_count, 0)
+                     FROM checklist_templates t
+                     LEFT JOIN (SELECT template_id, COUNT(*) AS item_count
+                                FROM template_items
+                                GROUP BY template_id) ti ON ti.template_id = t.id
+                     ORDER BY t.created_at DESC''')
+        templates = [{
             "id": row[0],
             "name": row[1],
             "description": row[2],
             "created_at": row[3],
             "updated_at": row[4],
-            "item_count": item_count
-        })
+            "item_count": row[5]
+        } for row in c.fetchall()]
+
+        if include_items:
+            items_by_template: Dict[int, List[Dict[str, Any]]] = {template["id"]: [] for template in templates}
+            c.execute('SELECT id, template_id, title, order_index, created_at FROM template_items ORDER BY template_id, order_index, id')
+            for item_row in c.fetchall():
+                items_by_template.setdefault(item_row[1], []).append({
+                    "id": item_row[0],
+                    "template_id": item_row[1],
+                    "title": item_row[2],
+                    "order_index": item_row[3],
+                    "created_at": item_row[4]
+                })
+            for template in templates:
+                template["items"] = items_by_template[template["id"]]
 
-    conn.close()
     return templates
 
-def get_template_by_id(template_id: int) -> Optional[Dict[str, Any]]:
-    """Get a specific template with all its items"""
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-
-    # Get template
-    c.execute('SELECT id, name, description, created_at, updated_at FROM checklist_templates WHERE id = ?', (template_id,))
-    row = c.fetchone()
-
-    if not row:
-        conn.close()
-        return None
-
-    # Get template items
-    c.execute('SELECT id, template_id, title, order_index, created_at FROM template_items WHERE template_id = ? ORDER BY order_index, id', (template_id,))
-    items = []
-    for item_row in c.fetchall():
-        items.append({
-            "id": item_row[0],
-            "template_id": item_row[1],
-            "title": item_row[2],
-            "order_index": item_row[3],
-            "created_at": item_row[4]
-        })
-
-    conn.close()
-
+def _template_items(cursor, template_id: int) -> List[Dict[str, Any]]:
+    """Items of a template, in checklist order"""
+    cursor.execute('SELECT id, template_id, title, order_index, created_at FROM template_items WHERE template_id = ? ORDER BY order_index, id', (template_id,))
+    return [{
+        "id": item_row[0],
+        "template_id": item_row[1],
+        "title": item_row[2],
+        "order_index": item_row[3],
+        "created_at": item_row[4]
+    } for item_row in cursor.fetchall()]
+
+def _template_dict(cursor, row) -> Dict[str, Any]:
+    """Template row plus its items, read on the caller's connection"""
+    items = _template_items(cursor, row[0])
     return {
         "id": row[0],
         "name": row[1],
@@ -66,139 +68,172 @@ def get_template_by_id(template_id: int) -> Optional[Dict[str, Any]]:
         "item_count": len(items)
     }
 
-def create_template(name: str, description: Optional[str], items: List[str]) -> Dict[str, Any]:
-    """Create a new checklist template with items"""
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
+def _insert_template_items(cursor, template_id: int, items: List[str]):
+    cursor.executemany('INSERT INTO template_items (template_id, title, order_index) VALUES (?, ?, ?)',
+                       [(template_id, item_title, index) for index, item_title in enumerate(items)])
 
-    # Create template
-    c.execute('INSERT INTO checklist_templates (name, description) VALUES (?, ?)', (name, description))
-    template_id = c.lastrowid
+def get_template_by_id(template_id: int) -> Optional[Dict[str, Any]]:
+    """Get a specific template with all its items"""
+    with read_connection() as conn:
+        c = conn.cursor()
 
-    # Create template items
-    for index, item_title in enumerate(items):
-        c.execute('INSERT INTO template_items (template_id, title, order_index) VALUES (?, ?, ?)',
-                  (template_id, item_title, index))
+        c.execute('SELECT id, name, description, created_at, updated_at FROM checklist_templates WHERE id = ?', (template_id,))
+        row = c.fetchone()
 
-    conn.commit()
+        if not row:
+            return None
 
-    # Get the created template with items
-    result = get_template_by_id(template_id)
-    conn.close()
+        return _template_dict(c, row)
 
-    print(f"[OK] Created checklist template {template_id}: {name}")
-    return result
+def create_template(name: str, description: Optional[str], items: List[str]) -> Dict[str, Any]:
+    """Create a new checklist template with items"""
+    with db_connection() as conn:
+        c = conn.cursor()
 
-def update_template(template_id: int, name: Optional[str], description: Optional[str], items: Optional[List[str]]) -> Optional[Dict[str, Any]]:
-    """Update a checklist template"""
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-
-    # Check if template exists
-    c.execute('SELECT id FROM checklist_templates WHERE id = ?', (template_id,))
-    if not c.fetchone():
-        conn.close()
-        return None
-
-    # Update template fields
-    if name is not None or description is not None:
-        updates = []
-        params = []
-
-        if name is not None:
-            updates.append("name = ?")
-            params.append(name)
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-
-        updates.append("updated_at = ?")
-        params.append(datetime.utcnow().isoformat())
-
-        params.append(template_id)
-
-        c.execute(f'UPDATE checklist_templates SET {", ".join(updates)} WHERE id = ?', params)
-
-    # Update items if provided
-    if items is not None:
-        # Delete old items
-        c.execute('DELETE FROM template_items WHERE template_id = ?', (template_id,))
+        c.execute('INSERT INTO checklist_templates (name, description) VALUES (?, ?) RETURNING id, name, description, created_at, updated_at',
+                  (name, description))
+        row = c.fetchone()
+        _insert_template_items(c, row[0], items)
+        result = _template_dict(c, row)
 
-        # Insert new items
-        for index, item_title in enumerate(items):
-            c.execute('INSERT INTO template_items (template_id, title, order_index) VALUES (?, ?, ?)',
-                      (template_id, item_title, index))
+        conn.commit()
 
-    conn.commit()
+    print(f"[OK] Created checklist template {row[0]}: {name}")
+    return result
 
-    # Get the updated template
-    result = get_template_by_id(template_id)
-    conn.close()
+def update_template(template_id: int, name: Optional[str], description: Optional[str], items: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    """Update a checklist template; None leaves a field (or the item list) unchanged"""
+    with db_connection() as conn:
+        c = conn.cursor()
+
+        # updated_at only moves when the name or description is changed, not for new items alone
+        c.execute('''UPDATE checklist_templates
+                     SET name = COALESCE(?, name), description = COALESCE(?, description),
+                         updated_at = CASE WHEN ? IS NULL AND ? IS NULL THEN updated_at ELSE ? END
+                     WHERE id = ?
+                     RETURNING id, name, description, created_at, updated_at''',
+                  (name, description, name, description, datetime.utcnow().isoformat(), template_id))
+        row = c.fetchone()
+        if not row:
+            return None
+
+        if items is not None:
+            c.execute('DELETE FROM template_items WHERE template_id = ?', (template_id,))
+            _insert_template_items(c, template_id, items)
+
+        result = _template_dict(c, row)
+        conn.commit()
 
     print(f"[OK] Updated checklist template {template_id}")
     return result
 
 def delete_template(template_id: int) -> bool:
     """Delete a checklist template and its items"""
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
+    with db_connection() as conn:
+        c = conn.cursor()
 
-    # Check if template exists
-    c.execute('SELECT id FROM checklist_templates WHERE id = ?', (template_id,))
-    if not c.fetchone():
-        conn.close()
-        return False
+        # Check if template exists
+        c.execute('SELECT id FROM checklist_templates WHERE id = ?', (template_id,))
+        if not c.fetchone():
+            return False
 
-    # Delete template items (should cascade, but let's be explicit)
-    c.execute('DELETE FROM template_items WHERE template_id = ?', (template_id,))
+        # Delete template items (should cascade, but let's be explicit)
+        c.execute('DELETE FROM template_items WHERE template_id = ?', (template_id,))
 
-    # Delete template
-    c.execute('DELETE FROM checklist_templates WHERE id = ?', (template_id,))
+        # Delete template
+        c.execute('DELETE FROM checklist_templates WHERE id = ?', (template_id,))
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
     print(f"[OK] Deleted checklist template {template_id}")
     return True
 
 def apply_template_to_project(template_id: int, project_id: int) -> List[Dict[str, Any]]:
     """Apply a checklist template to a project by creating checklist items"""
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-
-    # Check if template exists
-    c.execute('SELECT id FROM checklist_templates WHERE id = ?', (template_id,))
-    if not c.fetchone():
-        conn.close()
-        return []
-
-    # Check if project exists
-    c.execute('SELECT id FROM projects WHERE id = ?', (project_id,))
-    if not c.fetchone():
-        conn.close()
-        return []
-
-    # Get template items
-    c.execute('SELECT title, order_index FROM template_items WHERE template_id = ? ORDER BY order_index, id', (template_id,))
-    template_items = c.fetchall()
-
-    # Create checklist items from template
-    created_items = []
-    for item in template_items:
-        title = item[0]
-        c.execute('INSERT INTO checklist_items (project_id, title, completed) VALUES (?, ?, ?)',
-                  (project_id, title, 0))
-        item_id = c.lastrowid
-
-        created_items.append({
-            "id": item_id,
-            "project_id": project_id,
-            "title": title,
-            "completed": False
-        })
-
-    conn.commit()
-    conn.close()
+    with db_connection() as conn:
+        c = conn.cursor()
+
+        # Check if template exists
+        c.execute('SELECT id FROM checklist_templates WHERE id = ?', (template_id,))
+        if not c.fetchone():
+            return []
+
+        # Check if project exists
+        c.execute('SELECT id FROM projects WHERE id = ?', (project_id,))
+        if not c.fetchone():
+            return []
+
+        # Rows are inserted in SELECT order, so ids follow the template order
+        c.execute('''INSERT INTO checklist_items (project_id, title, completed)
+                     SELECT ?, title, 0 FROM template_items
+                     WHERE template_id = ?
+                     ORDER BY order_index, id
+                     RETURNING id, project_id, title, completed''', (project_id, template_id))
+        created_items = sorted(({
+            "id": row[0],
+            "project_id": row[1],
+            "title": row[2],
+            "completed": bool(row[3])
+        } for row in c.fetchall()), key=lambda item: item["id"])
+
+        conn.commit()
 
     print(f"[OK] Applied template {template_id} to project {project_id} ({len(created_items)} items)")
+    if created_items:
+        publish_change('checklist', 'created', None, project_id=project_id)
     return created_items
+
+def apply_template_to_projects(template_id: int, project_ids: Optional[List[int]] = None,
+                               campaign_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Apply a checklist template to many projects with one INSERT ... SELECT
+
+    Args:
+        template_id: Template to copy
+        project_ids: Projects to apply it to
+        campaign_id: Apply it to every project of this campaign instead
+
+    Returns:
+        project_ids, items_created and missing_project_ids (nothing is written when
+        some are missing), or None when the template or campaign does not exist
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+
+        # Take the write lock first, so the target projects cannot change before the insert
+        # (an early return leaves the transaction to the pool's rollback)
+        c.execute('BEGIN IMMEDIATE')
+        c.execute('SELECT id FROM checklist_templates WHERE id = ?', (template_id,))
+        if not c.fetchone():
+            return None
+
+        if campaign_id is not None:
+            c.execute('SELECT id FROM campaigns WHERE id = ?', (campaign_id,))
+            if not c.fetchone():
+                return None
+            target_sql, target_params = 'p.campaign_id = ?', [campaign_id]
+        else:
+            wanted = sorted(set(project_ids or []))
+            target_sql, target_params = f'p.id IN ({", ".join("?" for _ in wanted)})', wanted
+
+        c.execute(f'SELECT p.id FROM projects p WHERE {target_sql} ORDER BY p.id', target_params)
+        targets = [row[0] for row in c.fetchall()]
+        if campaign_id is None:
+            missing = sorted(set(wanted) - set(targets))
+            if missing:
+                return {"project_ids": [], "items_created": 0, "missing_project_ids": missing}
+
+        c.execute(f'''INSERT INTO checklist_items (project_id, title, completed)
+                      SELECT p.id, ti.title, 0
+                      FROM projects p
+                      JOIN template_items ti ON ti.template_id = ?
+                      WHERE {target_sql}
+                      ORDER BY p.id, ti.order_index, ti.id''', [template_id] + target_params)
+        items_created = c.rowcount
+        conn.commit()
+
+    print(f"[OK] Applied template {template_id} to {len(targets)} projects ({items_created} items)")
+    if items_created:
+        # One event for the whole batch; the dashboard reloads the open project if it is listed
+        publish_change('checklist', 'created', None, project_ids=targets, campaign_id=campaign_id)
+    return {"project_ids": targets, "items_created": items_created, "missing_project_ids": []}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, root_validator
 from typing import List, Optional
 
 class TemplateItem(BaseModel):
@@ -28,3 +28,14 @@ class ChecklistTemplateUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     items: Optional[List[str]] = None  # List of item titles
+
+class TemplateApplyRequest(BaseModel):
+    """Targets of POST /api/checklist-templates/{id}/apply: a list of projects or a campaign"""
+    project_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    campaign_id: Optional[int] = None
+
+    @root_validator(skip_on_failure=True)
+    def validate_target(cls, values):
+        if (values.get('project_ids') is None) == (values.get('campaign_id') is None):
+            raise ValueError("Give either project_ids or campaign_id")
+        return values
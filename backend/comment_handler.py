@@ -0,0 +1,35 @@
+"""
+Comment handler for project comments
+"""
+from typing import Dict, Any, List
+from db_pool import db_connection, read_connection
+from event_bus import publish_change
+
+
+def get_project_comments(project_id: int) -> List[Dict[str, Any]]:
+    """Get the comments of a project, newest first"""
+    with read_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT id, project_id, user_name, content, created_at FROM comments WHERE project_id = ? ORDER BY created_at DESC', (project_id,))
+        comments = []
+        for row in c.fetchall():
+            comments.append({
+                "id": row[0],
+                "project_id": row[1],
+                "user_name": row[2],
+                "content": row[3],
+                "created_at": row[4]
+            })
+    return comments
+
+
+def create_comment(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Add a comment to a project; returns data with the new id"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)',
+                  (data['project_id'], data['user_name'], data['content']))
+        comment_id = c.lastrowid
+        conn.commit()
+    publish_change('comment', 'created', comment_id, project_id=data['project_id'])
+    return {**data, "id": comment_id}
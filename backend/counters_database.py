@@ -0,0 +1,291 @@
+"""
+Materialized per-project and per-campaign counters for cfh-project
+
+project_counters holds task, completed task, comment and stakeholder counts per
+project; campaign_counters holds project and completed project counts per
+campaign. SQLite triggers on the child tables keep both up to date, so the
+dashboard reads them in O(projects) instead of scanning the child tables.
+
+Usage:
+    python counters_database.py            # create tables/triggers (and backfill)
+    python counters_database.py verify     # report drift without changing anything
+    python counters_database.py rebuild    # recompute every counter from scratch
+"""
+import argparse
+from typing import Dict, Any, List
+from db_pool import get_connection, release_connection
+
+
+PROJECT_COUNTER_COLUMNS = ('total_tasks', 'completed_tasks', 'comment_count', 'stakeholder_count')
+CAMPAIGN_COUNTER_COLUMNS = ('project_count', 'completed_projects')
+
+# Counters recomputed from the source tables, used by rebuild and verify
+EXPECTED_PROJECT_COUNTERS = '''
+    SELECT p.id,
+           COALESCE(ci.total_tasks, 0),
+           COALESCE(ci.completed_tasks, 0),
+           COALESCE(cm.comment_count, 0),
+           COALESCE(sh.stakeholder_count, 0)
+    FROM projects p
+    LEFT JOIN (SELECT project_id, COUNT(*) AS total_tasks, SUM(completed = 1) AS completed_tasks
+               FROM checklist_items GROUP BY project_id) ci ON ci.project_id = p.id
+    LEFT JOIN (SELECT project_id, COUNT(*) AS comment_count
+               FROM comments GROUP BY project_id) cm ON cm.project_id = p.id
+    LEFT JOIN (SELECT project_id, COUNT(*) AS stakeholder_count
+               FROM stakeholders GROUP BY project_id) sh ON sh.project_id = p.id
+'''
+
+EXPECTED_CAMPAIGN_COUNTERS = '''
+    SELECT c.id,
+           COUNT(p.id),
+           COALESCE(SUM(p.status = 'completed'), 0)
+    FROM campaigns c
+    LEFT JOIN projects p ON p.campaign_id = c.id
+    GROUP BY c.id
+'''
+
+
+def _counted_child_triggers(table: str, counter: str) -> List[str]:
+    """Insert/delete/move triggers for a child table counted by project_id"""
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_counters_insert
+            AFTER INSERT ON {table}
+            WHEN NEW.project_id IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO project_counters (project_id) VALUES (NEW.project_id);
+                UPDATE project_counters SET {counter} = {counter} + 1
+                WHERE project_id = NEW.project_id;
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_counters_delete
+            AFTER DELETE ON {table}
+            WHEN OLD.project_id IS NOT NULL
+            BEGIN
+                UPDATE project_counters SET {counter} = {counter} - 1
+                WHERE project_id = OLD.project_id;
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_counters_move
+            AFTER UPDATE OF project_id ON {table}
+            WHEN OLD.project_id IS NOT NEW.project_id
+            BEGIN
+                UPDATE project_counters SET {counter} = {counter} - 1
+                WHERE project_id = OLD.project_id;
+                INSERT OR IGNORE INTO project_counters (project_id)
+                SELECT NEW.project_id WHERE NEW.project_id IS NOT NULL;
+                UPDATE project_counters SET {counter} = {counter} + 1
+                WHERE project_id = NEW.project_id;
+            END''',
+    ]
+
+
+TRIGGERS = [
+    # Checklist items: total and completed tasks
+    '''CREATE TRIGGER IF NOT EXISTS trg_checklist_items_counters_insert
+       AFTER INSERT ON checklist_items
+       WHEN NEW.project_id IS NOT NULL
+       BEGIN
+           INSERT OR IGNORE INTO project_counters (project_id) VALUES (NEW.project_id);
+           UPDATE project_counters
+           SET total_tasks = total_tasks + 1,
+               completed_tasks = completed_tasks + (NEW.completed IS 1)
+           WHERE project_id = NEW.project_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_checklist_items_counters_delete
+       AFTER DELETE ON checklist_items
+       WHEN OLD.project_id IS NOT NULL
+       BEGIN
+           UPDATE project_counters
+           SET total_tasks = total_tasks - 1,
+               completed_tasks = completed_tasks - (OLD.completed IS 1)
+           WHERE project_id = OLD.project_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_checklist_items_counters_complete
+       AFTER UPDATE OF completed ON checklist_items
+       WHEN OLD.project_id IS NEW.project_id AND (OLD.completed IS 1) IS NOT (NEW.completed IS 1)
+       BEGIN
+           UPDATE project_counters
+           SET completed_tasks = completed_tasks + (NEW.completed IS 1) - (OLD.completed IS 1)
+           WHERE project_id = NEW.project_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_checklist_items_counters_move
+       AFTER UPDATE OF project_id ON checklist_items
+       WHEN OLD.project_id IS NOT NEW.project_id
+       BEGIN
+           UPDATE project_counters
+           SET total_tasks = total_tasks - 1,
+               completed_tasks = completed_tasks - (OLD.completed IS 1)
+           WHERE project_id = OLD.project_id;
+           INSERT OR IGNORE INTO project_counters (project_id)
+           SELECT NEW.project_id WHERE NEW.project_id IS NOT NULL;
+           UPDATE project_counters
+           SET total_tasks = total_tasks + 1,
+               completed_tasks = completed_tasks + (NEW.completed IS 1)
+           WHERE project_id = NEW.project_id;
+       END''',
+
+    # Comments and stakeholders: plain row counts
+    *_counted_child_triggers('comments', 'comment_count'),
+    *_counted_child_triggers('stakeholders', 'stakeholder_count'),
+
+    # Projects: drop their counters, maintain campaign counters
+    '''CREATE TRIGGER IF NOT EXISTS trg_projects_counters_delete
+       AFTER DELETE ON projects
+       BEGIN
+           DELETE FROM project_counters WHERE project_id = OLD.id;
+           UPDATE campaign_counters
+           SET project_count = project_count - 1,
+               completed_projects = completed_projects - (OLD.status IS 'completed')
+           WHERE campaign_id = OLD.campaign_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_projects_campaign_counters_insert
+       AFTER INSERT ON projects
+       WHEN NEW.campaign_id IS NOT NULL
+       BEGIN
+           INSERT OR IGNORE INTO campaign_counters (campaign_id) VALUES (NEW.campaign_id);
+           UPDATE campaign_counters
+           SET project_count = project_count + 1,
+               completed_projects = completed_projects + (NEW.status IS 'completed')
+           WHERE campaign_id = NEW.campaign_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_projects_campaign_counters_update
+       AFTER UPDATE OF campaign_id, status ON projects
+       WHEN OLD.campaign_id IS NOT NEW.campaign_id OR OLD.status IS NOT NEW.status
+       BEGIN
+           UPDATE campaign_counters
+           SET project_count = project_count - 1,
+               completed_projects = completed_projects - (OLD.status IS 'completed')
+           WHERE campaign_id = OLD.campaign_id;
+           INSERT OR IGNORE INTO campaign_counters (campaign_id)
+           SELECT NEW.campaign_id WHERE NEW.campaign_id IS NOT NULL;
+           UPDATE campaign_counters
+           SET project_count = project_count + 1,
+               completed_projects = completed_projects + (NEW.status IS 'completed')
+           WHERE campaign_id = NEW.campaign_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_campaigns_counters_delete
+       AFTER DELETE ON campaigns
+       BEGIN
+           DELETE FROM campaign_counters WHERE campaign_id = OLD.id;
+       END''',
+]
+
+
+def migrate_project_counters():
+    """Create counter tables and triggers, backfilling them on first run"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    print("Starting project counters migration...")
+
+    c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'project_counters'")
+    needs_backfill = c.fetchone() is None
+
+    c.execute('''CREATE TABLE IF NOT EXISTS project_counters
+                 (project_id INTEGER PRIMARY KEY,
+                  total_tasks INTEGER NOT NULL DEFAULT 0,
+                  completed_tasks INTEGER NOT NULL DEFAULT 0,
+                  comment_count INTEGER NOT NULL DEFAULT 0,
+                  stakeholder_count INTEGER NOT NULL DEFAULT 0)''')
+    print("  [OK] Created project_counters table")
+
+    c.execute('''CREATE TABLE IF NOT EXISTS campaign_counters
+                 (campaign_id INTEGER PRIMARY KEY,
+                  project_count INTEGER NOT NULL DEFAULT 0,
+                  completed_projects INTEGER NOT NULL DEFAULT 0)''')
+    print("  [OK] Created campaign_counters table")
+
+    for trigger_sql in TRIGGERS:
+        c.execute(trigger_sql)
+    print(f"  [OK] Created {len(TRIGGERS)} counter triggers")
+
+    conn.commit()
+    release_connection(conn)
+
+    if needs_backfill:
+        rebuild_counters()
+
+    print("Project counters migration completed successfully!")
+
+
+def rebuild_counters() -> Dict[str, int]:
+    """
+    Recompute every counter from the source tables in one transaction
+
+    Returns:
+        Number of project and campaign counter rows written
+    """
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        c.execute('DELETE FROM project_counters')
+        c.execute(f'''INSERT INTO project_counters (project_id, {", ".join(PROJECT_COUNTER_COLUMNS)})
+                      {EXPECTED_PROJECT_COUNTERS}''')
+        projects = c.rowcount
+
+        c.execute('DELETE FROM campaign_counters')
+        c.execute(f'''INSERT INTO campaign_counters (campaign_id, {", ".join(CAMPAIGN_COUNTER_COLUMNS)})
+                      {EXPECTED_CAMPAIGN_COUNTERS}''')
+        campaigns = c.rowcount
+
+        conn.commit()
+    finally:
+        release_connection(conn)
+
+    print(f"  [OK] Rebuilt counters for {projects} projects and {campaigns} campaigns")
+    return {"projects": projects, "campaigns": campaigns}
+
+
+def verify_counters() -> List[Dict[str, Any]]:
+    """
+    Compare the materialized counters against a fresh count
+
+    Returns:
+        One entry per drifted project or campaign with expected and actual values
+    """
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        drift = []
+        checks = [
+            ('project', EXPECTED_PROJECT_COUNTERS, 'project_counters', 'project_id', PROJECT_COUNTER_COLUMNS),
+            ('campaign', EXPECTED_CAMPAIGN_COUNTERS, 'campaign_counters', 'campaign_id', CAMPAIGN_COUNTER_COLUMNS),
+        ]
+        for kind, expected_sql, table, key, columns in checks:
+            c.execute(f'SELECT {key}, {", ".join(columns)} FROM {table}')
+            actual = {row[0]: row[1:] for row in c.fetchall()}
+
+            c.execute(expected_sql)
+            for row in c.fetchall():
+                expected = row[1:]
+                current = actual.get(row[0], (0,) * len(columns))
+                if tuple(current) != tuple(expected):
+                    drift.append({
+                        "kind": kind,
+                        "id": row[0],
+                        "expected": dict(zip(columns, expected)),
+                        "actual": dict(zip(columns, current))
+                    })
+
+        return drift
+    finally:
+        release_connection(conn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Project/campaign counter maintenance")
+    parser.add_argument("command", nargs="?", default="migrate", choices=["migrate", "verify", "rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate_project_counters()
+    elif args.command == "rebuild":
+        rebuild_counters()
+    else:
+        drift = verify_counters()
+        for entry in drift:
+            print(f"  ✗ {entry['kind']} {entry['id']}: expected {entry['expected']}, found {entry['actual']}")
+        if drift:
+            print(f"Found {len(drift)} drifted counter rows; run 'python counters_database.py rebuild'")
+            raise SystemExit(1)
+        print("All counters are consistent")
@@ -0,0 +1,180 @@
+"""
+Global data version and ETag helpers for polled list endpoints
+
+A single-row data_version table is bumped by triggers on every write to the
+tables behind /api/projects/stats and /api/campaigns. The version is cheap to
+read (one primary key lookup), so those endpoints can answer If-None-Match
+with 304 Not Modified before doing any real work.
+
+Every writable connection of this process also counts the bumps its own
+writes cause (a TEMP trigger calling back into Python). The event broadcaster
+compares that with how far the version moved, to tell writes made by other
+processes apart from its own.
+
+A separate campaign_version only moves when a campaign is deleted or its
+name or source system changes. Every worker checks it
+before trusting its in-process campaign_cache, so a campaign deleted through
+another worker is not handed out from a stale cache entry.
+"""
+import hashlib
+import sqlite3
+import threading
+from fastapi import Request, Response
+from db_pool import get_connection, release_connection, read_connection, register_writer_setup
+
+
+# Tables whose writes change the polled dashboard data
+TRACKED_TABLES = ['projects', 'checklist_items', 'comments', 'stakeholders', 'campaigns']
+
+
+def migrate_data_version():
+    """Create the data_version table and the triggers that bump it"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    print("Starting data version migration...")
+
+    c.execute('''CREATE TABLE IF NOT EXISTS data_version
+                 (id INTEGER PRIMARY KEY CHECK (id = 1),
+                  version INTEGER NOT NULL DEFAULT 0)''')
+    c.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+    print("  [OK] Created data_version table")
+
+    for table in TRACKED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_data_version_{event.lower()}
+                          AFTER {event} ON {table}
+                          BEGIN
+                              UPDATE data_version SET version = version + 1 WHERE id = 1;
+                          END''')
+    print(f"  [OK] Created data version triggers on {', '.join(TRACKED_TABLES)}")
+
+    conn.commit()
+    track_local_writes(conn)
+    release_connection(conn)
+
+    print("Data version migration completed successfully!")
+
+
+def migrate_campaign_version():
+    """Create the campaign_version table and the triggers that bump it"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    print("Starting campaign version migration...")
+
+    c.execute('''CREATE TABLE IF NOT EXISTS campaign_version
+                 (id INTEGER PRIMARY KEY CHECK (id = 1),
+                  version INTEGER NOT NULL DEFAULT 0)''')
+    c.execute('INSERT OR IGNORE INTO campaign_version (id, version) VALUES (1, 0)')
+    print("  [OK] Created campaign_version table")
+
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_campaigns_campaign_version_delete
+                 AFTER DELETE ON campaigns
+                 BEGIN
+                     UPDATE campaign_version SET version = version + 1 WHERE id = 1;
+                 END''')
+    # Not on source_reference: the webhook campaign upsert rewrites it on every conflict
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_campaigns_campaign_version_update
+                 AFTER UPDATE OF name, source_system ON campaigns
+                 WHEN OLD.name IS NOT NEW.name OR OLD.source_system IS NOT NEW.source_system
+                 BEGIN
+                     UPDATE campaign_version SET version = version + 1 WHERE id = 1;
+                 END''')
+    print("  [OK] Created campaign version triggers on campaigns")
+
+    conn.commit()
+    release_connection(conn)
+
+    print("Campaign version migration completed successfully!")
+
+
+def get_campaign_version(cursor) -> int:
+    """Current campaign version, read on the caller's connection"""
+    row = cursor.execute('SELECT version FROM campaign_version WHERE id = 1').fetchone()
+    return row[0] if row else 0
+
+
+# Bumps of data_version made through this process's connections
+_local_bumps = 0
+_local_bumps_lock = threading.Lock()
+
+
+def _note_local_bump():
+    global _local_bumps
+    with _local_bumps_lock:
+        _local_bumps += 1
+
+
+def track_local_writes(conn: sqlite3.Connection):
+    """Count the data_version bumps made through conn (no-op before the migration)"""
+    conn.create_function('note_local_data_version_bump', 0, _note_local_bump)
+    found = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'data_version'").fetchone()
+    if found:
+        conn.execute('''CREATE TEMP TRIGGER IF NOT EXISTS trg_data_version_local_bump
+                        AFTER UPDATE ON main.data_version
+                        BEGIN
+                            SELECT note_local_data_version_bump();
+                        END''')
+
+
+register_writer_setup(track_local_writes)
+
+
+def get_local_data_version_bumps() -> int:
+    """
+    Number of data_version bumps made by this process so far
+
+    Counted when the trigger fires, so it runs ahead of the committed version
+    while a local transaction is open, and keeps bumps that were rolled back.
+    """
+    return _local_bumps
+
+
+def get_data_version() -> int:
+    """Current global data version"""
+    with read_connection() as conn:
+        row = conn.execute('SELECT version FROM data_version WHERE id = 1').fetchone()
+    return row[0] if row else 0
+
+
+def make_etag(version: int, *scope) -> str:
+    """
+    Build a weak ETag for a data version
+
+    Args:
+        version: Value from get_data_version()
+        scope: Anything else the response depends on (endpoint, user, query)
+    """
+    digest = hashlib.sha1('|'.join(str(part) for part in scope).encode('utf-8')).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag (weak comparison)"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+
+    wanted = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the ETag"""
+    return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+
+def set_etag_headers(response: Response, etag: str):
+    """Attach the ETag to a full response; no-cache makes browsers revalidate every poll"""
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'X-User-Info, Cookie'
@@ -1,20 +1,115 @@
 """
-Database migration utilities for cfh-project webhook integration
+Base schema and webhook integration migration for cfh-project
 """
 import sqlite3
 from typing import Optional
-import os
-
-
-def get_db_path() -> str:
-    """Get the database file path"""
-    return os.path.join(os.path.dirname(__file__), 'demo.db')
+from db_pool import db_connection, get_connection, release_connection
+
+
+def init_db():
+    """Create the base projects, checklist_items and comments tables and insert the demo data"""
+    with db_connection() as conn:
+        c = conn.cursor()
+
+        # Projects table
+        c.execute('''CREATE TABLE IF NOT EXISTS projects
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      name TEXT NOT NULL,
+                      description TEXT,
+                      status TEXT DEFAULT 'active',
+                      created_at TEXT DEFAULT CURRENT_TIMESTAMP)''')
+
+        # Checklist items table
+        c.execute('''CREATE TABLE IF NOT EXISTS checklist_items
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      project_id INTEGER,
+                      title TEXT NOT NULL,
+                      completed INTEGER DEFAULT 0,
+                      created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                      FOREIGN KEY (project_id) REFERENCES projects (id))''')
+
+        # Comments table
+        c.execute('''CREATE TABLE IF NOT EXISTS comments
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      project_id INTEGER,
+                      user_name TEXT DEFAULT 'Demo User',
+                      content TEXT NOT NULL,
+                      created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                      FOREIGN KEY (project_id) REFERENCES projects (id))''')
+
+        # Indexes for per-project lookups and the newest-first project listings
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_checklist_items_project
+                     ON checklist_items(project_id, completed)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_comments_project
+                     ON comments(project_id, created_at)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_projects_created_at
+                     ON projects(created_at)''')
+
+        # Insert demo data if empty
+        c.execute('SELECT COUNT(*) FROM projects')
+        if c.fetchone()[0] == 0:
+            # Project 1: Construction
+            c.execute("INSERT INTO projects (name, description, status) VALUES (?, ?, ?)",
+                      ("Construction Project Alpha", "Building renovation and modernization", "active"))
+            project_id = c.lastrowid
+            checklist_items = [
+                "Site survey and assessment",
+                "Obtain building permits",
+                "Foundation work",
+                "Structural framework",
+                "Electrical installation",
+                "Plumbing systems",
+                "Final inspection"
+            ]
+            for item in checklist_items:
+                c.execute("INSERT INTO checklist_items (project_id, title) VALUES (?, ?)",
+                          (project_id, item))
+            c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
+                      (project_id, "John Manager", "Project kickoff meeting scheduled for Monday"))
+            c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
+                      (project_id, "Sarah Engineer", "Permits have been submitted to the city"))
+
+            # Project 2: Software Development
+            c.execute("INSERT INTO projects (name, description, status) VALUES (?, ?, ?)",
+                      ("Mobile App Development", "E-commerce mobile application for iOS and Android", "active"))
+            project_id2 = c.lastrowid
+            checklist_items2 = [
+                "Requirements gathering",
+                "UI/UX design mockups",
+                "Backend API development",
+                "Frontend development",
+                "Testing and QA",
+                "App store submission"
+            ]
+            for item in checklist_items2:
+                c.execute("INSERT INTO checklist_items (project_id, title) VALUES (?, ?)",
+                          (project_id2, item))
+            c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
+                      (project_id2, "Alice Developer", "Sprint planning completed for iteration 1"))
+
+            # Project 3: Marketing Campaign
+            c.execute("INSERT INTO projects (name, description, status) VALUES (?, ?, ?)",
+                      ("Q1 Marketing Campaign", "Social media and digital marketing initiative", "active"))
+            project_id3 = c.lastrowid
+            checklist_items3 = [
+                "Market research",
+                "Content strategy development",
+                "Design assets creation",
+                "Campaign launch",
+                "Performance monitoring"
+            ]
+            for item in checklist_items3:
+                c.execute("INSERT INTO checklist_items (project_id, title) VALUES (?, ?)",
+                          (project_id3, item))
+            c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
+                      (project_id3, "Bob Marketing", "Target audience analysis complete"))
+
+        conn.commit()
 
 
 def migrate_projects_table():
     """Add webhook integration fields to projects table"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     print("Starting migration: Adding webhook integration fields to projects table...")
@@ -26,7 +121,10 @@ def migrate_projects_table():
         ("source_reference", "TEXT"),
         ("metadata", "TEXT"),
         ("webhook_received_at", "TEXT"),
-        ("last_synced_at", "TEXT")
+        ("last_synced_at", "TEXT"),
+        # Last applied webhook event (normalized UTC timestamp) and a hash of its payload
+        ("last_event_at", "TEXT"),
+        ("content_hash", "TEXT")
     ]
 
     for column_name, column_type in columns_to_add:
@@ -50,16 +148,26 @@ def migrate_projects_table():
         else:
             print(f"  ✗ Error creating index: {e}")
 
+    # Keyset pagination of the project listings needs a created_at on every row
+    c.execute('''UPDATE projects SET created_at = COALESCE(webhook_received_at, CURRENT_TIMESTAMP)
+                 WHERE created_at IS NULL''')
+    if c.rowcount:
+        print(f"  [OK] Backfilled created_at on {c.rowcount} projects")
+
+    # Index for the recent-activity queries in get_webhook_stats
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_projects_webhook_received_at
+                 ON projects(webhook_received_at)''')
+    print("  [OK] Created index: idx_projects_webhook_received_at")
+
     conn.commit()
-    conn.close()
+    release_connection(conn)
 
     print("Migration completed successfully!")
 
 
 def rollback_migration():
     """Remove webhook integration fields from projects table"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     print("Starting rollback: Removing webhook integration fields...")
@@ -73,7 +181,7 @@ def rollback_migration():
         print(f"  ✗ Error dropping index: {e}")
 
     conn.commit()
-    conn.close()
+    release_connection(conn)
 
     print("Rollback completed!")
     print("Note: Columns cannot be dropped in SQLite. To fully rollback, delete and recreate the database.")
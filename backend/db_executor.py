@@ -0,0 +1,71 @@
+"""
+Database access for code running on the asyncio event loop
+
+sqlite3 calls block the thread that makes them. Endpoints (and the event
+broadcaster) run on the event loop, so they hand their database work to one of
+two bounded thread pools and await the result; a long query then occupies a
+worker thread while the loop keeps serving every other request.
+
+- run_read(): DB_READ_WORKERS threads, by default one per read connection
+  (DB_POOL_SIZE), so a read never holds a thread while it waits for a connection.
+- run_write(): DB_WRITE_WORKERS threads for everything that takes the writer.
+  Writes queue for the single writer connection in their own threads, so a
+  burst of webhooks cannot take the threads the dashboard's reads need.
+
+The callables are the synchronous handler functions; they get their
+connections from db_pool as before.
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from db_pool import DEFAULT_POOL_SIZE
+
+
+READ_WORKERS = int(os.getenv("DB_READ_WORKERS", str(DEFAULT_POOL_SIZE)))
+WRITE_WORKERS = int(os.getenv("DB_WRITE_WORKERS", "16"))
+
+T = TypeVar('T')
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(kind: str) -> ThreadPoolExecutor:
+    """The read or write executor, started on first use"""
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                workers = READ_WORKERS if kind == 'read' else WRITE_WORKERS
+                executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix=f'db-{kind}')
+                _executors[kind] = executor
+    return executor
+
+
+async def _run(kind: str, fn: Callable[..., T], args, kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(kind), functools.partial(fn, *args, **kwargs))
+
+
+async def run_read(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run fn(*args, **kwargs) on a read worker; fn should only use read connections"""
+    return await _run('read', fn, args, kwargs)
+
+
+async def run_write(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run fn(*args, **kwargs) on a write worker"""
+    return await _run('write', fn, args, kwargs)
+
+
+def shutdown_db_executors(wait: bool = True):
+    """Stop the worker threads; the next run_read()/run_write() starts new ones"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
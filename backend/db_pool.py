@@ -0,0 +1,294 @@
+"""
+Shared SQLite connection pools for cfh-project
+
+Every handler module gets its connections from here instead of calling
+sqlite3.connect() per request. Connections are opened lazily, configured once
+(WAL journal, synchronous=NORMAL, busy timeout, page cache) and handed back to
+the pool when the request is done.
+
+Reads and writes use separate pools:
+
+- read_connection(): one of DB_POOL_SIZE read-only connections (mode=ro,
+  query_only). In WAL mode readers never wait for the write lock.
+- db_connection() / get_connection(): the single writer connection. Writers
+  queue for it in the process instead of contending for SQLite's lock (and
+  sleeping in the busy handler) while holding a connection readers need.
+
+A thread that holds the writer gets the writer for its reads as well, so it
+sees its own uncommitted changes.
+"""
+import sqlite3
+import threading
+import os
+import urllib.parse
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+from typing import Callable, Iterator, List, Optional
+
+
+DEFAULT_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DEFAULT_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+CACHE_SIZE_KIB = int(os.getenv("DB_CACHE_SIZE_KIB", "16384"))
+
+
+# Called with every newly opened writable connection (see register_writer_setup)
+_writer_setups: List[Callable[[sqlite3.Connection], None]] = []
+
+
+def register_writer_setup(setup: Callable[[sqlite3.Connection], None]):
+    """Run setup(conn) on every writable connection opened from now on"""
+    _writer_setups.append(setup)
+
+
+def get_db_path() -> str:
+    """Get the database file path (DATABASE_URL, relative to the backend directory)"""
+    db_path = os.getenv("DATABASE_URL", "demo.db")
+    if os.path.isabs(db_path):
+        return db_path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), db_path)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable SQLite connections
+
+    A thread holds at most one connection at a time: nested checkouts from the
+    same thread (e.g. update_campaign -> get_campaign_by_id) reuse it. With
+    max_size=0 pooling is disabled and every checkout opens a fresh connection,
+    which is the pre-pool behaviour and is used as the benchmark baseline.
+    read_only pools open their connections with mode=ro and query_only.
+    """
+
+    def __init__(self, db_path: str, max_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_POOL_TIMEOUT, read_only: bool = False):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.read_only = read_only
+        self._idle: LifoQueue = LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size) if max_size > 0 else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        if self.read_only:
+            # The journal mode is a property of the file, set by the writer
+            conn = sqlite3.connect(f'file:{urllib.parse.quote(self.db_path)}?mode=ro', uri=True,
+                                   timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+            conn.execute('PRAGMA query_only=ON')
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for setup in _writer_setups:
+                setup(conn)
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        conn.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KIB}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._slots is None:
+            return self._open()
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(
+                f"Timed out waiting for a database connection ({self.max_size} in use)"
+            )
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+
+        try:
+            conn = self._open()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        # Uncommitted work is discarded, exactly as conn.close() used to do
+        if conn.in_transaction:
+            conn.rollback()
+
+        if self._slots is None:
+            conn.close()
+            return
+
+        self._idle.put(conn)
+        self._slots.release()
+
+    def held(self) -> Optional[sqlite3.Connection]:
+        """The connection this thread has checked out, if any"""
+        return getattr(self._local, 'conn', None)
+
+    def checkout(self) -> sqlite3.Connection:
+        """
+        Check out a connection; must be paired with checkin()
+
+        Nested checkouts from the same thread return the connection the
+        thread already holds, so helpers can call each other freely.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def checkin(self, conn: sqlite3.Connection):
+        """Return a connection obtained from checkout()"""
+        if getattr(self._local, 'conn', None) is not conn:
+            raise RuntimeError("Connection was not checked out by this thread")
+
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+
+        self._local.conn = None
+        self._release(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a connection for the duration of the with-block"""
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+_pool: Optional[ConnectionPool] = None
+_read_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _create_pools(db_path: str, max_size: int, split_reads: bool = True):
+    global _pool, _read_pool
+    if not split_reads:
+        _pool = ConnectionPool(db_path, max_size)
+        _read_pool = _pool
+        return
+    _pool = ConnectionPool(db_path, min(max_size, 1))
+    _read_pool = ConnectionPool(db_path, max_size, read_only=True)
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide writer pool, creating the pools on first use"""
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _create_pools(get_db_path(), DEFAULT_POOL_SIZE)
+    return _pool
+
+
+def get_read_pool() -> ConnectionPool:
+    """Get the process-wide read-only pool, creating the pools on first use"""
+    if _read_pool is None:
+        get_pool()
+    return _read_pool
+
+
+def configure_pool(db_path: Optional[str] = None, max_size: Optional[int] = None,
+                   split_reads: bool = True) -> ConnectionPool:
+    """
+    Replace the process-wide pools (used by benchmarks and maintenance scripts)
+
+    Args:
+        db_path: Database file, defaults to get_db_path()
+        max_size: Number of read connections, 0 disables pooling
+        split_reads: False restores the single shared read/write pool of
+            max_size connections (benchmark baseline)
+
+    Returns:
+        The new writer pool
+    """
+    with _pool_lock:
+        for pool in {id(p): p for p in (_pool, _read_pool) if p is not None}.values():
+            pool.close()
+        _create_pools(
+            db_path or get_db_path(),
+            DEFAULT_POOL_SIZE if max_size is None else max_size,
+            split_reads
+        )
+    return _pool
+
+
+def get_connection() -> sqlite3.Connection:
+    """Check out the writer connection; hand it back with release_connection()"""
+    return get_pool().checkout()
+
+
+def release_connection(conn: sqlite3.Connection):
+    """Return a connection obtained from get_connection() to the pool"""
+    get_pool().checkin(conn)
+
+
+def db_connection():
+    """
+    Check out the writer connection
+
+    Usage:
+        with db_connection() as conn:
+            c = conn.cursor()
+            ...
+            conn.commit()
+    """
+    return get_pool().connection()
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """
+    Check out a read-only connection; hand it back with release_read_connection()
+
+    Inside a write (this thread holds the writer) the writer itself is returned.
+    """
+    writer = get_pool()
+    if writer.held() is not None:
+        return writer.checkout()
+    return get_read_pool().checkout()
+
+
+def release_read_connection(conn: sqlite3.Connection):
+    """Return a connection obtained from get_read_connection()"""
+    writer = get_pool()
+    if writer.held() is conn:
+        writer.checkin(conn)
+    else:
+        get_read_pool().checkin(conn)
+
+
+@contextmanager
+def read_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Check out a read-only connection for the duration of the with-block
+
+    Usage:
+        with read_connection() as conn:
+            rows = conn.execute(...).fetchall()
+    """
+    conn = get_read_connection()
+    try:
+        yield conn
+    finally:
+        release_read_connection(conn)
@@ -0,0 +1,187 @@
+"""
+In-process change feed for Server-Sent Events
+
+Write paths call publish_change() after they commit; every connected
+/api/events stream receives a small JSON notification (entity, action, ids)
+and the browser reloads only what changed.
+
+The broadcaster runs on the asyncio event loop. Each subscriber is just a
+bounded asyncio.Queue, so thousands of idle streams cost almost nothing. A
+subscriber whose queue fills up (a slow or stalled client) is dropped instead
+of slowing everyone else down; EventSource reconnects it and the frontend
+reloads on reconnect.
+
+Writes made by other uvicorn workers are not seen in-process, so while anyone
+is subscribed the broadcaster also polls the global data version and emits a
+generic data.changed event when it moves further than this process's own
+writes account for.
+"""
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+DATA_VERSION_POLL_SECONDS = float(os.getenv("EVENTS_DATA_VERSION_POLL_SECONDS", "2"))
+
+
+class Subscriber:
+    """One connected event stream"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class EventBroadcaster:
+    """Fan-out of change events to all subscribers, with per-subscriber backpressure"""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sequence = 0
+        self._dropped_total = 0
+        self._watcher: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Register a new subscriber; must be called on the event loop"""
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+
+        if self._watcher is None or self._watcher.done():
+            self._watcher = self._loop.create_task(self._watch_data_version())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber; must be called on the event loop"""
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    def publish(self, event: Dict[str, Any]):
+        """
+        Queue an event for every subscriber
+
+        Safe to call from any thread: handlers run on the database worker
+        threads, so delivery is handed over to the event loop.
+        """
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._deliver(event)
+        else:
+            loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Dict[str, Any]):
+        self._sequence += 1
+        message = {"id": self._sequence, **event}
+
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber):
+        """Disconnect a subscriber that cannot keep up"""
+        self._dropped_total += 1
+        subscriber.dropped = True
+        self._subscribers.discard(subscriber)
+
+        # Discard its backlog and wake its stream so it ends right away
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    async def _watch_data_version(self):
+        """
+        Emit data.changed for writes committed by other processes
+
+        The version moves with every write; the bumps made by this process's
+        own writes (already announced by publish_change) are subtracted, and
+        whatever is left came from elsewhere. A local transaction still open
+        at the poll makes this undercount for one interval, so such a change
+        is announced one poll later instead of being lost.
+        """
+        from data_version import get_data_version, get_local_data_version_bumps
+        from db_executor import run_read
+
+        async def remote_writes() -> int:
+            local = get_local_data_version_bumps()
+            return await run_read(get_data_version) - local
+
+        last_remote = await remote_writes()
+        while True:
+            await asyncio.sleep(DATA_VERSION_POLL_SECONDS)
+            remote = await remote_writes()
+            if remote > last_remote:
+                self._deliver({"type": "data.changed", "entity": None, "action": "changed"})
+            last_remote = remote
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "events_published": self._sequence,
+            "subscribers_dropped": self._dropped_total
+        }
+
+
+broadcaster = EventBroadcaster()
+
+
+def publish_change(entity: str, action: str, entity_id: Optional[int] = None, **ids: Any):
+    """
+    Announce a committed change to all /api/events subscribers
+
+    Args:
+        entity: project, campaign, checklist, comment or stakeholder
+        action: created, updated or deleted
+        entity_id: Id of the changed row
+        ids: Related ids the frontend needs to decide what to reload (project_id, project_ids, campaign_id)
+    """
+    event = {"type": f"{entity}.{action}", "entity": entity, "action": action, "entity_id": entity_id}
+    event.update(ids)
+    broadcaster.publish(event)
+
+
+async def event_stream(is_disconnected) -> AsyncIterator[str]:
+    """
+    Server-Sent Events body for one client
+
+    Args:
+        is_disconnected: Coroutine function telling whether the client went away
+    """
+    subscriber = broadcaster.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+
+            if message is None:
+                # Dropped for falling behind; the client reconnects and reloads
+                break
+            yield f"id: {message['id']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        broadcaster.unsubscribe(subscriber)
@@ -0,0 +1,285 @@
+"""
+Index advisor for cfh-project
+
+Runs EXPLAIN QUERY PLAN on every SQL statement issued by the handler modules
+and flags full table scans, so a new endpoint cannot regress silently.
+
+Statements are collected from the source: string literals and module-level
+constants passed to execute()/executemany(). SQL that is assembled at runtime
+is explained through the query builders registered in DYNAMIC_QUERIES, or
+reported as skipped.
+
+The plans are taken against a throwaway database that has been through all
+migrations, so the schema (and its indexes) matches production.
+
+Usage:
+    python index_advisor.py             # exit code 1 when unexpected scans are found
+    python index_advisor.py --verbose   # also print every query plan
+"""
+import argparse
+import ast
+import os
+import re
+import shutil
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules whose SQL serves API requests
+HANDLER_MODULES = [
+    'main.py',
+    'project_handler.py',
+    'comment_handler.py',
+    'project_access.py',
+    'project_stats.py',
+    'campaign_handler.py',
+    'webhook_handler.py',
+    'webhook_queue.py',
+    'checklist_template_handler.py',
+    'stakeholder_handler.py',
+    'search_handler.py',
+    'checklist_handler.py',
+]
+
+# Full scans that are the point of the query (listing endpoints), as (function, table)
+EXPECTED_SCANS = {
+    ('get_projects', 'projects'),
+    ('get_project_stats', 'projects'),
+    ('get_all_campaigns', 'campaigns'),
+    ('get_all_templates', 'checklist_templates'),
+    # One row per source system
+    ('get_webhook_stats', 'webhook_source_counters'),
+}
+
+
+def _sample_user():
+    from auth_models import User
+    return User(id=1, email='advisor@example.com', name='Advisor',
+                source_system='laravel11', is_admin=False)
+
+
+def _project_stats_for_user() -> str:
+    from project_stats import build_project_stats_query
+    return build_project_stats_query(_sample_user())[0]
+
+
+def _project_stats_for_admin() -> str:
+    from project_stats import build_project_stats_query
+    return build_project_stats_query(None)[0]
+
+
+def _project_stats_page() -> str:
+    from project_query import ProjectListParams
+    from project_stats import build_project_stats_query
+    return build_project_stats_query(None, ProjectListParams(limit=50, cursor=('2025-01-01 00:00:00', 1)))[0]
+
+
+def _campaign_stats_page() -> str:
+    from project_query import ProjectListParams
+    from project_stats import build_project_stats_query
+    return build_project_stats_query(_sample_user(), ProjectListParams(limit=50, campaign_id=1,
+                                                                       cursor=('2025-01-01 00:00:00', 1)))[0]
+
+
+def _campaign_rollup_for_user() -> str:
+    from project_access import project_access_clause
+    from project_stats import CAMPAIGN_ROLLUP_QUERY
+    return CAMPAIGN_ROLLUP_QUERY.format(access=project_access_clause(_sample_user(), 'p')[0])
+
+
+def _search_for_user() -> str:
+    from search_handler import build_search_query
+    return build_search_query(_sample_user(), ['project', 'comment'])[0]
+
+
+def _webhook_project_lookup() -> str:
+    from webhook_handler import build_project_lookup_query
+    return build_project_lookup_query(3)
+
+
+# Runtime-built SQL, as (module, function, builder returning the SQL)
+DYNAMIC_QUERIES: List[Tuple[str, str, Callable[[], str]]] = [
+    ('project_stats.py', 'get_project_stats', _project_stats_for_user),
+    ('project_stats.py', 'get_project_stats', _project_stats_for_admin),
+    ('project_stats.py', 'get_project_stats', _project_stats_page),
+    ('project_stats.py', 'get_campaign_stats', _campaign_stats_page),
+    ('project_stats.py', 'get_campaign_stats', _campaign_rollup_for_user),
+    ('webhook_handler.py', '_lookup_projects', _webhook_project_lookup),
+    ('search_handler.py', 'search', _search_for_user),
+]
+
+
+class Statement:
+    """One SQL statement and where it was found"""
+
+    def __init__(self, module: str, function: str, line: int, sql: Optional[str]):
+        self.module = module
+        self.function = function
+        self.line = line
+        self.sql = sql
+
+    @property
+    def location(self) -> str:
+        return f"{self.module}:{self.line} {self.function}()"
+
+
+def _string_value(node: ast.AST, constants: Dict[str, str]) -> Optional[str]:
+    """Value of a string literal, a known constant, or a concatenation of those"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left = _string_value(node.left, constants)
+        right = _string_value(node.right, constants)
+        if left is not None and right is not None:
+            return left + right
+    return None
+
+
+def _module_constants(tree: ast.Module) -> Dict[str, str]:
+    """Module-level NAME = '...' string assignments (and concatenations of them)"""
+    constants = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)):
+            value = _string_value(node.value, constants)
+            if value is not None:
+                constants[node.targets[0].id] = value
+    return constants
+
+
+def collect_statements(module: str) -> List[Statement]:
+    """Find every execute()/executemany() call in a module"""
+    with open(os.path.join(BACKEND_DIR, module), encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=module)
+    constants = _module_constants(tree)
+
+    statements = []
+    for function in ast.walk(tree):
+        if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for node in ast.walk(function):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr in ('execute', 'executemany') and node.args):
+                continue
+            sql = _string_value(node.args[0], constants)
+            statements.append(Statement(module, function.name, node.lineno, sql))
+
+    # Nested functions are visited twice by ast.walk; keep the innermost owner
+    unique = {}
+    for statement in statements:
+        unique[(statement.module, statement.line)] = statement
+    return sorted(unique.values(), key=lambda s: s.line)
+
+
+def _table_aliases(sql: str) -> Dict[str, str]:
+    """Map aliases used in FROM/JOIN clauses back to table names"""
+    aliases = {}
+    for table, alias in re.findall(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias and alias.upper() not in ('WHERE', 'ON', 'LEFT', 'JOIN', 'GROUP', 'ORDER',
+                                           'INNER', 'LIMIT', 'SET', 'USING', 'WHEN'):
+            aliases[alias] = table
+    return aliases
+
+
+def explain(conn, sql: str) -> Tuple[List[str], List[str]]:
+    """
+    Run EXPLAIN QUERY PLAN and pick out full table scans
+
+    Returns:
+        (plan detail lines, names of fully scanned tables)
+    """
+    params = [None] * sql.count('?')
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    details = [row[3] for row in rows]
+
+    subqueries = set()
+    for detail in details:
+        match = re.match(r'(?:MATERIALIZE|CO-ROUTINE) (\w+)', detail)
+        if match:
+            subqueries.add(match.group(1))
+
+    aliases = _table_aliases(sql)
+    scanned = []
+    for detail in details:
+        match = re.match(r'SCAN (\w+)(.*)$', detail)
+        if not match or 'INDEX' in match.group(2) or 'CONSTANT ROW' in detail:
+            continue
+        if match.group(1) in subqueries:
+            continue
+        scanned.append(aliases.get(match.group(1), match.group(1)))
+    return details, scanned
+
+
+def run_advisor(verbose: bool = False) -> int:
+    """
+    Explain every handler statement against a fully migrated temp database
+
+    Returns:
+        Number of unexpected full table scans
+    """
+    import io
+    import contextlib
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main  # noqa: F401 - runs all migrations on the temp database
+    from db_pool import db_connection
+
+    statements = []
+    for module in HANDLER_MODULES:
+        statements.extend(collect_statements(module))
+    for module, function, builder in DYNAMIC_QUERIES:
+        statements.append(Statement(module, function, 0, builder()))
+
+    problems = 0
+    skipped = 0
+    with db_connection() as conn:
+        for statement in statements:
+            if statement.sql is None:
+                skipped += 1
+                if verbose:
+                    print(f"  - {statement.location}: dynamic SQL, skipped")
+                continue
+
+            try:
+                details, scanned = explain(conn, statement.sql)
+            except Exception as e:
+                print(f"  ✗ {statement.location}: cannot explain: {e}")
+                problems += 1
+                continue
+
+            unexpected = [t for t in scanned if (statement.function, t) not in EXPECTED_SCANS]
+            if unexpected:
+                problems += len(unexpected)
+                print(f"  ✗ {statement.location}: full table scan of {', '.join(unexpected)}")
+            elif verbose:
+                print(f"  [OK] {statement.location}")
+
+            if verbose or unexpected:
+                for detail in details:
+                    print(f"        {detail}")
+
+    print(f"Checked {len(statements) - skipped} statements ({skipped} dynamic skipped), "
+          f"{problems} unexpected full table scan(s)")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flag full table scans in handler SQL")
+    parser.add_argument("--verbose", action="store_true", help="Print every query plan")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="cfh-advisor-")
+    os.environ["DATABASE_URL"] = os.path.join(tmp_dir, "advisor.db")
+    sys.path.insert(0, BACKEND_DIR)
+    try:
+        problems = run_advisor(args.verbose)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    raise SystemExit(1 if problems else 0)
@@ -0,0 +1,22 @@
+"""
+JSON decoding for webhook bodies
+
+Uses orjson when it is installed (optional, see requirements.txt), the standard library
+otherwise. Both raise a ValueError subclass (json.JSONDecodeError) on bad input.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    JSON_LIBRARY = "orjson"
+except ImportError:
+    orjson = None
+    JSON_LIBRARY = "json"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document from bytes or text"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,22 +1,35 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional
 from datetime import datetime
-import sqlite3
+from contextlib import asynccontextmanager
 import json
 
+# Worker threads for the async endpoints
+from db_executor import run_read, run_write, shutdown_db_executors
+
 # Import authentication modules
 from auth_models import User
-from session_middleware import get_current_user, require_auth
-from project_access import filter_projects_by_access, can_access_project
-from auth_database import migrate_auth_schema
+from session_middleware import get_current_user, require_auth, open_laravel_clients, close_laravel_clients
+from session_cache import session_cache
+from project_access import can_access_project
+from project_stats import get_project_stats, get_campaign_stats, campaign_rollup, PROJECT_STATS_FIELDS
+from project_query import ProjectListParams, project_list_params, campaign_project_list_params, select_fields
+from project_handler import get_projects, create_project, update_project, delete_project
+from comment_handler import get_project_comments, create_comment
 
 # Import webhook integration modules
 from models import WebhookPayload, WebhookResponse
-from auth import verify_webhook_signature
-from webhook_handler import handle_webhook_project, get_webhook_stats
-from database import migrate_projects_table
+from auth import verify_webhook_signature, read_authenticated_webhook
+import json_codec
+from campaign_cache import campaign_cache
+from webhook_handler import (
+    handle_webhook_project_grouped, handle_webhook_projects_batch, parse_webhook_batch,
+    get_webhook_stats, WEBHOOK_BATCH_MAX_ITEMS
+)
 
 # Import campaign modules
 from campaign_models import Campaign, CampaignCreate, CampaignUpdate, CampaignWithProjects
@@ -24,18 +37,23 @@ from campaign_handler import (
     get_all_campaigns, get_campaign_by_id, create_campaign,
     update_campaign, delete_campaign
 )
-from campaign_database import migrate_campaigns
+
+# Import bulk checklist modules
+from checklist_models import ChecklistBatch
+from checklist_handler import (
+    get_project_checklist, create_checklist_item, set_checklist_item_completed,
+    apply_checklist_operations, CHECKLIST_BATCH_MAX_OPERATIONS
+)
 
 # Import checklist template modules
 from checklist_template_models import (
     ChecklistTemplate, ChecklistTemplateWithItems,
-    ChecklistTemplateCreate, ChecklistTemplateUpdate
+    ChecklistTemplateCreate, ChecklistTemplateUpdate, TemplateApplyRequest
 )
 from checklist_template_handler import (
     get_all_templates, get_template_by_id, create_template,
-    update_template, delete_template, apply_template_to_project
+    update_template, delete_template, apply_template_to_project, apply_template_to_projects
 )
-from checklist_template_database import migrate_checklist_templates
 
 # Import stakeholder modules
 from stakeholder_models import Stakeholder, StakeholderCreate, StakeholderUpdate
@@ -43,9 +61,38 @@ from stakeholder_handler import (
     get_project_stakeholders, get_stakeholder_by_id, create_stakeholder,
     update_stakeholder, delete_stakeholder, get_stakeholder_count
 )
-from stakeholder_database import migrate_stakeholders
 
-app = FastAPI(title="Project Management Demo")
+# Full-text search
+from search_database import KIND_NAMES
+from search_handler import search, SEARCH_MAX_LIMIT
+
+# Asynchronous webhook queue
+from webhook_queue import webhook_workers, enqueue_webhook, get_receipt, get_queue_stats
+
+# Change feed for Server-Sent Events
+from fastapi.responses import StreamingResponse
+from event_bus import event_stream
+
+# Change tracking for conditional GETs
+from data_version import get_data_version, make_etag, etag_matches, not_modified, set_etag_headers
+
+# Versioned schema migrations
+from schema_migrations import run_migrations
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the Laravel session validation clients and start the webhook queue workers; stop them and the database workers on shutdown"""
+    await open_laravel_clients()
+    if webhook_workers.enabled:
+        webhook_workers.start()
+    try:
+        yield
+    finally:
+        webhook_workers.stop()
+        shutdown_db_executors()
+        await close_laravel_clients()
+
+app = FastAPI(title="Project Management Demo", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -60,128 +107,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the dashboard follow paginated listings
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Database initialization
-def init_db():
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-
-    # Projects table
-    c.execute('''CREATE TABLE IF NOT EXISTS projects
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  name TEXT NOT NULL,
-                  description TEXT,
-                  status TEXT DEFAULT 'active',
-                  created_at TEXT DEFAULT CURRENT_TIMESTAMP)''')
-
-    # Checklist items table
-    c.execute('''CREATE TABLE IF NOT EXISTS checklist_items
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  project_id INTEGER,
-                  title TEXT NOT NULL,
-                  completed INTEGER DEFAULT 0,
-                  created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY (project_id) REFERENCES projects (id))''')
-
-    # Comments table
-    c.execute('''CREATE TABLE IF NOT EXISTS comments
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  project_id INTEGER,
-                  user_name TEXT DEFAULT 'Demo User',
-                  content TEXT NOT NULL,
-                  created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                  FOREIGN KEY (project_id) REFERENCES projects (id))''')
-
-    # Insert demo data if empty
-    c.execute('SELECT COUNT(*) FROM projects')
-    if c.fetchone()[0] == 0:
-        # Project 1: Construction
-        c.execute("INSERT INTO projects (name, description, status) VALUES (?, ?, ?)",
-                  ("Construction Project Alpha", "Building renovation and modernization", "active"))
-        project_id = c.lastrowid
-        checklist_items = [
-            "Site survey and assessment",
-            "Obtain building permits",
-            "Foundation work",
-            "Structural framework",
-            "Electrical installation",
-            "Plumbing systems",
-            "Final inspection"
-        ]
-        for item in checklist_items:
-            c.execute("INSERT INTO checklist_items (project_id, title) VALUES (?, ?)",
-                      (project_id, item))
-        c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
-                  (project_id, "John Manager", "Project kickoff meeting scheduled for Monday"))
-        c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
-                  (project_id, "Sarah Engineer", "Permits have been submitted to the city"))
-
-        # Project 2: Software Development
-        c.execute("INSERT INTO projects (name, description, status) VALUES (?, ?, ?)",
-                  ("Mobile App Development", "E-commerce mobile application for iOS and Android", "active"))
-        project_id2 = c.lastrowid
-        checklist_items2 = [
-            "Requirements gathering",
-            "UI/UX design mockups",
-            "Backend API development",
-            "Frontend development",
-            "Testing and QA",
-            "App store submission"
-        ]
-        for item in checklist_items2:
-            c.execute("INSERT INTO checklist_items (project_id, title) VALUES (?, ?)",
-                      (project_id2, item))
-        c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
-                  (project_id2, "Alice Developer", "Sprint planning completed for iteration 1"))
-
-        # Project 3: Marketing Campaign
-        c.execute("INSERT INTO projects (name, description, status) VALUES (?, ?, ?)",
-                  ("Q1 Marketing Campaign", "Social media and digital marketing initiative", "active"))
-        project_id3 = c.lastrowid
-        checklist_items3 = [
-            "Market research",
-            "Content strategy development",
-            "Design assets creation",
-            "Campaign launch",
-            "Performance monitoring"
-        ]
-        for item in checklist_items3:
-            c.execute("INSERT INTO checklist_items (project_id, title) VALUES (?, ?)",
-                      (project_id3, item))
-        c.execute("INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)",
-                  (project_id3, "Bob Marketing", "Target audience analysis complete"))
-
-    conn.commit()
-    conn.close()
-
-# Initialize database on startup
-init_db()
-
-# Run webhook integration migration
-print("Running webhook integration migration...")
-migrate_projects_table()
-print("Migration complete!")
-
-# Run campaign migration
-print("Running campaign migration...")
-migrate_campaigns()
-print("Campaign migration complete!")
-
-# Run checklist templates migration
-print("Running checklist templates migration...")
-migrate_checklist_templates()
-print("Checklist templates migration complete!")
-
-# Run stakeholders migration
-print("Running stakeholders migration...")
-migrate_stakeholders()
-print("Stakeholders migration complete!")
-
-# Run authentication schema migration
-print("Running authentication schema migration...")
-migrate_auth_schema()
-print("Authentication schema migration complete!")
+# Bring the schema up to date (a no-op on an up-to-date database)
+run_migrations()
 
 # Pydantic models
 class Project(BaseModel):
@@ -192,6 +123,9 @@ class Project(BaseModel):
     campaign_id: Optional[int] = None
     created_at: Optional[str] = None
 
+# Keys of a GET /api/projects entry, for sparse field selection
+PROJECT_FIELDS = ('id', 'name', 'description', 'status', 'campaign_id', 'created_at')
+
 class ChecklistItem(BaseModel):
     id: Optional[int] = None
     project_id: int
@@ -218,254 +152,285 @@ async def get_user_info(user: Optional[User] = Depends(get_current_user)):
         return {"authenticated": False}
     return {"authenticated": True, "user": user.dict()}
 
-@app.get("/api/projects", response_model=List[Project])
-def get_projects():
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('SELECT id, name, description, status, created_at FROM projects')
-    projects = []
-    for row in c.fetchall():
-        projects.append({
-            "id": row[0],
-            "name": row[1],
-            "description": row[2],
-            "status": row[3],
-            "created_at": row[4]
-        })
-    conn.close()
-    return projects
+@app.get("/api/auth/session-cache")
+def get_session_cache_stats():
+    """Hit/miss counters of the Laravel session validation cache"""
+    return session_cache.stats()
+
+@app.get("/api/projects")
+async def list_projects(response: Response, params: ProjectListParams = Depends(project_list_params)):
+    """
+    List projects, newest first
+
+    Supports filters, keyset pagination (limit, then cursor from the
+    X-Next-Cursor response header) and sparse fields; see project_query.py.
+    """
+    projects, next_cursor = await run_read(get_projects, params)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return select_fields(projects, params.fields, PROJECT_FIELDS)
 
 @app.post("/api/projects", response_model=Project)
-def create_project(project: Project, user: User = Depends(require_auth)):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('''INSERT INTO projects
-                 (name, description, status, campaign_id, created_by_email, created_by_name, created_by_source)
-                 VALUES (?, ?, ?, ?, ?, ?, ?)''',
-              (project.name, project.description, project.status, project.campaign_id,
-               user.email, user.name, user.source_system))
-    project.id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return project
+async def create_new_project(project: Project, user: User = Depends(require_auth)):
+    result = await run_write(create_project, project.dict(), user)
+    return result
 
 @app.put("/api/projects/{project_id}", response_model=Project)
-def update_project(project_id: int, project: Project):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('''UPDATE projects
-                 SET name = ?, description = ?, status = ?, campaign_id = ?
-                 WHERE id = ?''',
-              (project.name, project.description, project.status, project.campaign_id, project_id))
-    conn.commit()
-
-    # Fetch updated project
-    c.execute('SELECT id, name, description, status, campaign_id, created_at FROM projects WHERE id = ?', (project_id,))
-    row = c.fetchone()
-    conn.close()
-
-    if not row:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    return Project(
-        id=row[0],
-        name=row[1],
-        description=row[2],
-        status=row[3],
-        campaign_id=row[4],
-        created_at=row[5]
-    )
+async def update_existing_project(project_id: int, project: Project):
+    result = await run_write(update_project, project_id, project.dict())
+    return result
 
 @app.delete("/api/projects/{project_id}")
-def delete_project(project_id: int):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-
-    # Check if project exists
-    c.execute('SELECT id FROM projects WHERE id = ?', (project_id,))
-    if not c.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    # Delete related records first (foreign key constraints)
-    c.execute('DELETE FROM checklist_items WHERE project_id = ?', (project_id,))
-    c.execute('DELETE FROM comments WHERE project_id = ?', (project_id,))
+async def delete_existing_project(project_id: int):
+    result = await run_write(delete_project, project_id)
+    return result
 
-    # Delete the project
-    c.execute('DELETE FROM projects WHERE id = ?', (project_id,))
-    conn.commit()
-    conn.close()
+@app.get("/api/projects/stats")
+async def get_projects_stats(request: Request, response: Response,
+                             user: Optional[User] = Depends(get_current_user),
+                             params: ProjectListParams = Depends(project_list_params)):
+    # Answer unchanged polls with 304 before touching the project tables
+    etag = make_etag(await run_read(get_data_version), 'projects/stats',
+                     user.email if user else None, user.is_admin if user else None,
+                     request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+
+    # No user logged in, return empty list
+    if not user:
+        return []
+
+    # Access filtering, filters and paging happen inside the stats query
+    projects, next_cursor = await run_read(get_project_stats, user, params)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return select_fields(projects, params.fields, PROJECT_STATS_FIELDS)
+
+@app.get("/api/search")
+async def search_everything(q: str = Query(..., min_length=1, max_length=200, description="Words to find"),
+                            limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT),
+                            types: Optional[str] = Query(None, description="Comma-separated: project, comment, "
+                                                                           "checklist_item, campaign"),
+                            user: Optional[User] = Depends(get_current_user)):
+    """
+    Full-text search over projects, comments, checklist items and campaigns
 
-    return {"status": "deleted", "id": project_id}
+    Every word must match and the last one may be a prefix. Results are ranked
+    best first and limited to projects the user can access.
+    """
+    kinds = [kind.strip() for kind in types.split(',') if kind.strip()] if types else None
+    unknown = [kind for kind in kinds or [] if kind not in KIND_NAMES.values()]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown type(s): {', '.join(unknown)}")
 
-@app.get("/api/projects/stats")
-async def get_projects_stats(user: Optional[User] = Depends(get_current_user)):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('SELECT id, name, description, status, campaign_id, created_at FROM projects ORDER BY created_at DESC')
-    projects = []
-    for row in c.fetchall():
-        project_id = row[0]
-
-        # Get checklist stats
-        c.execute('SELECT COUNT(*) FROM checklist_items WHERE project_id = ?', (project_id,))
-        total_tasks = c.fetchone()[0]
-
-        c.execute('SELECT COUNT(*) FROM checklist_items WHERE project_id = ? AND completed = 1', (project_id,))
-        completed_tasks = c.fetchone()[0]
-
-        # Get comment count
-        c.execute('SELECT COUNT(*) FROM comments WHERE project_id = ?', (project_id,))
-        comment_count = c.fetchone()[0]
-
-        # Get stakeholder count
-        c.execute('SELECT COUNT(*) FROM stakeholders WHERE project_id = ?', (project_id,))
-        stakeholder_count = c.fetchone()[0]
-
-        progress = round((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
-
-        projects.append({
-            "id": row[0],
-            "name": row[1],
-            "description": row[2],
-            "status": row[3],
-            "campaign_id": row[4],
-            "created_at": row[5],
-            "total_tasks": total_tasks,
-            "completed_tasks": completed_tasks,
-            "progress": progress,
-            "comment_count": comment_count,
-            "stakeholder_count": stakeholder_count
-        })
-    conn.close()
-
-    # Filter projects based on user access
-    if user:
-        projects = filter_projects_by_access(user, projects)
-    else:
-        # No user logged in, return empty list
-        projects = []
+    # No user logged in, nothing to search
+    if not user:
+        return []
 
-    return projects
+    return await run_read(search, q, user, limit, kinds)
 
 @app.get("/api/projects/{project_id}/checklist", response_model=List[ChecklistItem])
-def get_checklist(project_id: int):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('SELECT id, project_id, title, completed, created_at FROM checklist_items WHERE project_id = ?', (project_id,))
-    items = []
-    for row in c.fetchall():
-        items.append({
-            "id": row[0],
-            "project_id": row[1],
-            "title": row[2],
-            "completed": bool(row[3]),
-            "created_at": row[4]
-        })
-    conn.close()
+async def get_checklist(project_id: int):
+    items = await run_read(get_project_checklist, project_id)
     return items
 
 @app.post("/api/checklist", response_model=ChecklistItem)
-def create_checklist_item(item: ChecklistItem):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('INSERT INTO checklist_items (project_id, title, completed) VALUES (?, ?, ?)',
-              (item.project_id, item.title, int(item.completed)))
-    item.id = c.lastrowid
-    conn.commit()
-    conn.close()
+async def add_checklist_item(item: ChecklistItem):
+    item.id = await run_write(create_checklist_item, item.project_id, item.title, item.completed)
     return item
 
 @app.patch("/api/checklist/{item_id}")
-def update_checklist_item(item_id: int, completed: bool):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('UPDATE checklist_items SET completed = ? WHERE id = ?', (int(completed), item_id))
-    conn.commit()
-    conn.close()
+async def update_checklist_item(item_id: int, completed: bool):
+    await run_write(set_checklist_item_completed, item_id, completed)
     return {"status": "updated"}
 
+@app.post("/api/checklist/batch")
+async def apply_checklist_batch(batch: ChecklistBatch):
+    """
+    Create, update and delete many checklist items in one request
+
+    The operations are validated together and applied in one transaction: if
+    any of them is invalid (unknown item or project, same item twice) nothing
+    is written and the errors are returned as a 422.
+
+    Returns:
+        Counts plus one result per operation, in request order, with the resulting row
+    """
+    if len(batch.operations) > CHECKLIST_BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.operations)} operations (max {CHECKLIST_BATCH_MAX_OPERATIONS})"
+        )
+
+    errors, results = await run_write(apply_checklist_operations, [op.dict() for op in batch.operations])
+    if errors:
+        raise RequestValidationError(errors)
+
+    return {
+        "status": "success",
+        "created": sum(1 for r in results if r['op'] == 'create'),
+        "updated": sum(1 for r in results if r['op'] == 'update'),
+        "deleted": sum(1 for r in results if r['op'] == 'delete'),
+        "results": results
+    }
+
 @app.get("/api/projects/{project_id}/comments", response_model=List[Comment])
-def get_comments(project_id: int):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('SELECT id, project_id, user_name, content, created_at FROM comments WHERE project_id = ? ORDER BY created_at DESC', (project_id,))
-    comments = []
-    for row in c.fetchall():
-        comments.append({
-            "id": row[0],
-            "project_id": row[1],
-            "user_name": row[2],
-            "content": row[3],
-            "created_at": row[4]
-        })
-    conn.close()
+async def get_comments(project_id: int):
+    comments = await run_read(get_project_comments, project_id)
     return comments
 
 @app.post("/api/comments", response_model=Comment)
-def create_comment(comment: Comment):
-    conn = sqlite3.connect('demo.db')
-    c = conn.cursor()
-    c.execute('INSERT INTO comments (project_id, user_name, content) VALUES (?, ?, ?)',
-              (comment.project_id, comment.user_name, comment.content))
-    comment.id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return comment
+async def add_comment(comment: Comment):
+    result = await run_write(create_comment, comment.dict())
+    return result
 
 # Campaign endpoints
 @app.get("/api/campaigns", response_model=List[CampaignWithProjects])
-def list_campaigns():
+async def list_campaigns(request: Request, response: Response):
     """Get all campaigns with project counts"""
-    campaigns = get_all_campaigns()
+    etag = make_etag(await run_read(get_data_version), 'campaigns')
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+
+    campaigns = await run_read(get_all_campaigns)
     return campaigns
 
 @app.get("/api/campaigns/{campaign_id}", response_model=CampaignWithProjects)
-def get_campaign(campaign_id: int, include_projects: bool = True):
+async def get_campaign(campaign_id: int, include_projects: bool = True):
     """Get a specific campaign with optional project list"""
-    campaign = get_campaign_by_id(campaign_id, include_projects=include_projects)
+    campaign = await run_read(get_campaign_by_id, campaign_id, include_projects=include_projects)
     return campaign
 
+@app.get("/api/campaigns/{campaign_id}/stats")
+async def get_campaign_stats_endpoint(campaign_id: int, request: Request, response: Response,
+                                      user: Optional[User] = Depends(get_current_user),
+                                      params: ProjectListParams = Depends(campaign_project_list_params)):
+    """
+    Campaign totals and per-project counters of one campaign
+
+    The project list takes the /api/projects/stats filters, fields and keyset
+    pagination (X-Next-Cursor); the rollup always covers the whole campaign.
+    """
+    # 404 for a missing or deleted campaign, even when the client's ETag still matches
+    campaign = await run_read(get_campaign_by_id, campaign_id)
+
+    etag = make_etag(await run_read(get_data_version), f'campaigns/{campaign_id}/stats',
+                     user.email if user else None, user.is_admin if user else None,
+                     request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+
+    # No user logged in: no projects to count
+    if not user:
+        rollup, projects, next_cursor = campaign_rollup([]), [], None
+    else:
+        rollup, projects, next_cursor = await run_read(get_campaign_stats, campaign_id, user, params)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return {
+        "campaign": campaign,
+        "rollup": rollup,
+        "projects": select_fields(projects, params.fields, PROJECT_STATS_FIELDS)
+    }
+
 @app.post("/api/campaigns", response_model=Campaign)
-def create_new_campaign(campaign: CampaignCreate):
+async def create_new_campaign(campaign: CampaignCreate):
     """Create a new campaign"""
-    result = create_campaign(campaign.dict())
+    result = await run_write(create_campaign, campaign.dict())
     return result
 
 @app.put("/api/campaigns/{campaign_id}", response_model=Campaign)
-def update_existing_campaign(campaign_id: int, campaign: CampaignUpdate):
+async def update_existing_campaign(campaign_id: int, campaign: CampaignUpdate):
     """Update an existing campaign"""
-    result = update_campaign(campaign_id, campaign.dict(exclude_unset=True))
+    result = await run_write(update_campaign, campaign_id, campaign.dict(exclude_unset=True))
     return result
 
 @app.delete("/api/campaigns/{campaign_id}")
-def delete_existing_campaign(campaign_id: int):
+async def delete_existing_campaign(campaign_id: int):
     """Delete a campaign (projects will be unlinked)"""
-    result = delete_campaign(campaign_id)
+    result = await run_write(delete_campaign, campaign_id)
     return result
 
+# Change feed
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """
+    Server-Sent Events stream of change notifications
+
+    Each event is a JSON object such as
+    {"type": "checklist.updated", "entity": "checklist", "action": "updated",
+     "entity_id": 12, "project_id": 3}
+    telling the dashboard what to reload instead of polling on a timer.
+    """
+    return StreamingResponse(
+        event_stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Webhook endpoints
+def parse_webhook_payload(body: bytes) -> WebhookPayload:
+    """Decode and validate an authenticated webhook body; errors are reported like FastAPI's 422"""
+    try:
+        data = json_codec.loads(body)
+    except ValueError as e:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body",), "msg": "JSON decode error", "input": {},
+              "ctx": {"error": str(e)}}]
+        )
+    try:
+        return WebhookPayload.parse_obj(data)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors()]
+        )
+
 @app.post("/api/webhooks/project", response_model=WebhookResponse)
-async def receive_project_webhook(
-    payload: WebhookPayload,
-    authenticated: bool = Depends(verify_webhook_signature)
-):
+async def receive_project_webhook(request: Request):
     """
     Receive project data from Laravel applications via webhook
-    Requires Bearer token authentication
+    Requires Bearer token authentication; an X-Webhook-Signature header
+    (HMAC-SHA256 of the raw body) is verified when sent
+
+    The request is authenticated from its headers and raw body before the
+    body (a WebhookPayload) is decoded or validated.
+
+    With WEBHOOK_QUEUE_ENABLED the payload is only spooled and the response is
+    202 Accepted with a receipt id; background workers apply it. Retries of
+    the same event (same payload or Idempotency-Key header) get the original
+    receipt back.
 
     Args:
-        payload: Webhook payload containing project data
-        authenticated: Authentication dependency injection
+        request: Incoming request with the webhook payload as JSON body
 
     Returns:
         WebhookResponse with status and result data
     """
+    payload = parse_webhook_payload(await read_authenticated_webhook(request))
+
+    if webhook_workers.enabled:
+        receipt = await run_write(
+            enqueue_webhook, payload.dict(), request.headers.get('idempotency-key')
+        )
+        accepted = WebhookResponse(
+            status="accepted",
+            message="Webhook already queued" if receipt['duplicate'] else "Webhook queued for processing",
+            data=receipt
+        )
+        return JSONResponse(status_code=202, content=accepted.dict())
+
     try:
-        result = handle_webhook_project(payload.dict())
+        result = await run_write(handle_webhook_project_grouped, payload.dict())
+        if result['action'] == 'skipped':
+            message = "Stale or duplicate event skipped"
+        else:
+            message = f"Project {result['action']} successfully"
         return WebhookResponse(
             status="success",
-            message=f"Project {result['action']} successfully",
+            message=message,
             data=result
         )
     except HTTPException as e:
@@ -473,8 +438,69 @@ async def receive_project_webhook(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/webhooks/projects/batch")
+async def receive_project_webhook_batch(request: Request):
+    """
+    Receive many project webhooks at once (e.g. a replay after an outage)
+    Requires Bearer token authentication; an X-Webhook-Signature header
+    (HMAC-SHA256 of the raw body) is verified when sent
+
+    The body is a JSON array of webhook payloads, or NDJSON (one payload per
+    line, Content-Type: application/x-ndjson). Valid payloads are upserted in
+    a single transaction; invalid ones are reported without blocking the rest.
+
+    Returns:
+        Counts plus one result per payload, in request order
+    """
+    try:
+        items = parse_webhook_batch(await read_authenticated_webhook(request), request.headers.get('content-type'))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+
+    if len(items) > WEBHOOK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(items)} items (max {WEBHOOK_BATCH_MAX_ITEMS})"
+        )
+
+    results: List[Optional[dict]] = [None] * len(items)
+    valid_indexes = []
+    valid_payloads = []
+    for index, item in enumerate(items):
+        try:
+            valid_payloads.append(WebhookPayload.parse_obj(item).dict())
+            valid_indexes.append(index)
+        except ValidationError as e:
+            errors = [{"loc": list(err["loc"]), "msg": err["msg"]} for err in e.errors()]
+            results[index] = {"index": index, "action": "error", "errors": errors}
+
+    upserted = await run_write(handle_webhook_projects_batch, valid_payloads)
+    for index, result in zip(valid_indexes, upserted):
+        results[index] = {"index": index, **result}
+
+    created = sum(1 for r in upserted if r['action'] == 'created')
+    skipped = sum(1 for r in upserted if r['action'] == 'skipped')
+    failed = len(items) - len(upserted)
+    return {
+        "status": "success" if not failed else ("partial" if upserted else "error"),
+        "received": len(items),
+        "created": created,
+        "updated": len(upserted) - created - skipped,
+        "skipped": skipped,
+        "failed": failed,
+        "results": results
+    }
+
+@app.get("/api/webhooks/receipts/{receipt_id}")
+async def get_webhook_receipt(receipt_id: str, authenticated: bool = Depends(verify_webhook_signature)):
+    """Processing state of a queued webhook, by the receipt id from the 202 response"""
+    receipt = await run_read(get_receipt, receipt_id)
+    if not receipt:
+        raise HTTPException(status_code=404, detail="Receipt not found")
+    return receipt
+
 @app.get("/api/webhooks/health")
-def webhook_health():
+async def webhook_health():
     """
     Get webhook integration health statistics
 
@@ -482,11 +508,13 @@ def webhook_health():
         Dictionary with webhook statistics
     """
     try:
-        stats = get_webhook_stats()
+        stats = await run_read(get_webhook_stats)
         return {
             "status": "healthy",
             "webhook_integration": "enabled",
-            "stats": stats
+            "stats": stats,
+            "queue": await run_read(get_queue_stats),
+            "campaign_cache": campaign_cache.stats()
         }
     except Exception as e:
         return {
@@ -496,29 +524,30 @@ def webhook_health():
 
 # Checklist Template endpoints
 @app.get("/api/checklist-templates", response_model=List[ChecklistTemplateWithItems])
-def list_checklist_templates():
-    """Get all checklist templates with item counts"""
-    templates = get_all_templates()
+async def list_checklist_templates(include_items: bool = Query(False, description="Also return each template's items")):
+    """Get all checklist templates with item counts, and optionally their items"""
+    templates = await run_read(get_all_templates, include_items)
     return templates
 
 @app.get("/api/checklist-templates/{template_id}", response_model=ChecklistTemplateWithItems)
-def get_checklist_template(template_id: int):
+async def get_checklist_template(template_id: int):
     """Get a specific checklist template with all its items"""
-    template = get_template_by_id(template_id)
+    template = await run_read(get_template_by_id, template_id)
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     return template
 
 @app.post("/api/checklist-templates", response_model=ChecklistTemplateWithItems)
-def create_checklist_template(template: ChecklistTemplateCreate):
+async def create_checklist_template(template: ChecklistTemplateCreate):
     """Create a new checklist template"""
-    result = create_template(template.name, template.description, template.items)
+    result = await run_write(create_template, template.name, template.description, template.items)
     return result
 
 @app.put("/api/checklist-templates/{template_id}", response_model=ChecklistTemplateWithItems)
-def update_checklist_template(template_id: int, template: ChecklistTemplateUpdate):
+async def update_checklist_template(template_id: int, template: ChecklistTemplateUpdate):
     """Update a checklist template"""
-    result = update_template(
+    result = await run_write(
+        update_template,
         template_id,
         template.name,
         template.description,
@@ -529,17 +558,17 @@ def update_checklist_template(template_id: int, template: ChecklistTemplateUpdat
     return result
 
 @app.delete("/api/checklist-templates/{template_id}")
-def delete_checklist_template(template_id: int):
+async def delete_checklist_template(template_id: int):
     """Delete a checklist template"""
-    success = delete_template(template_id)
+    success = await run_write(delete_template, template_id)
     if not success:
         raise HTTPException(status_code=404, detail="Template not found")
     return {"status": "deleted", "id": template_id}
 
 @app.post("/api/projects/{project_id}/apply-template/{template_id}")
-def apply_template(project_id: int, template_id: int):
+async def apply_template(project_id: int, template_id: int):
     """Apply a checklist template to a project"""
-    items = apply_template_to_project(template_id, project_id)
+    items = await run_write(apply_template_to_project, template_id, project_id)
     if not items:
         raise HTTPException(status_code=404, detail="Template or project not found")
     return {
@@ -550,25 +579,51 @@ def apply_template(project_id: int, template_id: int):
         "items": items
     }
 
+@app.post("/api/checklist-templates/{template_id}/apply")
+async def apply_template_to_many(template_id: int, target: TemplateApplyRequest):
+    """
+    Apply a checklist template to many projects, or to every project of a campaign
+
+    All checklist items are created with one statement in one transaction. With
+    project_ids, nothing is written if any of them does not exist.
+    """
+    result = await run_write(apply_template_to_projects, template_id, target.project_ids, target.campaign_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Template or campaign not found")
+    if result["missing_project_ids"]:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Projects not found: {', '.join(str(pid) for pid in result['missing_project_ids'])}"
+        )
+    return {
+        "status": "success",
+        "template_id": template_id,
+        "campaign_id": target.campaign_id,
+        "projects_updated": len(result["project_ids"]),
+        "items_created": result["items_created"],
+        "project_ids": result["project_ids"]
+    }
+
 # Stakeholder endpoints
 @app.get("/api/projects/{project_id}/stakeholders", response_model=List[Stakeholder])
-def list_project_stakeholders(project_id: int):
+async def list_project_stakeholders(project_id: int):
     """Get all stakeholders for a project"""
-    stakeholders = get_project_stakeholders(project_id)
+    stakeholders = await run_read(get_project_stakeholders, project_id)
     return stakeholders
 
 @app.get("/api/stakeholders/{stakeholder_id}", response_model=Stakeholder)
-def get_stakeholder(stakeholder_id: int):
+async def get_stakeholder(stakeholder_id: int):
     """Get a specific stakeholder"""
-    stakeholder = get_stakeholder_by_id(stakeholder_id)
+    stakeholder = await run_read(get_stakeholder_by_id, stakeholder_id)
     if not stakeholder:
         raise HTTPException(status_code=404, detail="Stakeholder not found")
     return stakeholder
 
 @app.post("/api/stakeholders", response_model=Stakeholder)
-def add_stakeholder(stakeholder: StakeholderCreate):
+async def add_stakeholder(stakeholder: StakeholderCreate):
     """Add a stakeholder to a project"""
-    result = create_stakeholder(
+    result = await run_write(
+        create_stakeholder,
         stakeholder.project_id,
         stakeholder.name,
         stakeholder.email,
@@ -580,9 +635,10 @@ def add_stakeholder(stakeholder: StakeholderCreate):
     return result
 
 @app.put("/api/stakeholders/{stakeholder_id}", response_model=Stakeholder)
-def update_existing_stakeholder(stakeholder_id: int, stakeholder: StakeholderUpdate):
+async def update_existing_stakeholder(stakeholder_id: int, stakeholder: StakeholderUpdate):
     """Update a stakeholder"""
-    result = update_stakeholder(
+    result = await run_write(
+        update_stakeholder,
         stakeholder_id,
         stakeholder.name,
         stakeholder.role,
@@ -593,9 +649,9 @@ def update_existing_stakeholder(stakeholder_id: int, stakeholder: StakeholderUpd
     return result
 
 @app.delete("/api/stakeholders/{stakeholder_id}")
-def remove_stakeholder(stakeholder_id: int):
+async def remove_stakeholder(stakeholder_id: int):
     """Remove a stakeholder from a project"""
-    success = delete_stakeholder(stakeholder_id)
+    success = await run_write(delete_stakeholder, stakeholder_id)
     if not success:
         raise HTTPException(status_code=404, detail="Stakeholder not found")
     return {"status": "deleted", "id": stakeholder_id}
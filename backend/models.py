@@ -22,6 +22,14 @@ class WebhookProjectData(BaseModel):
         return v
 
 
+class WebhookCampaignData(BaseModel):
+    """Optional campaign the project belongs to, matched by name per source system"""
+    name: str = Field(..., min_length=1, max_length=500, description="Campaign name")
+    description: Optional[str] = Field(None, max_length=5000, description="Campaign description")
+    status: str = Field(default="active", description="Campaign status")
+    metadata: Optional[Dict[str, Any]] = Field(default=None, description="Additional metadata as JSON")
+
+
 class WebhookPayload(BaseModel):
     """Complete webhook payload structure"""
     source_system: str = Field(..., description="Source system identifier: laravel11 or laravel9")
@@ -30,6 +38,7 @@ class WebhookPayload(BaseModel):
     event_type: str = Field(..., description="Event type: created, updated, status_changed")
     timestamp: str = Field(..., description="ISO 8601 timestamp of the event")
     project: WebhookProjectData = Field(..., description="Project data")
+    campaign: Optional[WebhookCampaignData] = Field(default=None, description="Campaign data")
     webhook_signature: str = Field(..., description="HMAC-SHA256 signature for verification")
 
     @validator('source_system')
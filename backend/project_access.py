@@ -1,10 +1,40 @@
-from typing import List, Dict, Any
-import sqlite3
-import os
+from typing import List, Dict, Any, Tuple
 from auth_models import User
+from db_pool import read_connection
 
-def get_db_path():
-    return os.path.join(os.path.dirname(__file__), 'demo.db')
+def project_access_clause(user: User, alias: str = 'projects') -> Tuple[str, List[Any]]:
+    """
+    SQL predicate limiting a projects query to what the user can see
+
+    Same rules as filter_projects_by_access, but evaluated by SQLite so that
+    callers never load projects the user cannot access.
+
+    Returns:
+        (sql, params) to splice into a WHERE clause
+    """
+    if user.is_admin:
+        return '1 = 1', []
+
+    return (f'({alias}.created_by_email = ? OR {alias}.id IN '
+            f'(SELECT project_id FROM stakeholders WHERE email = ?))',
+            [user.email, user.email])
+
+def project_id_access_clause(user: User, column: str) -> Tuple[str, List[Any]]:
+    """
+    SQL predicate limiting rows that reference a project to what the user can see
+
+    Same rules as project_access_clause, for tables without a projects join:
+    the accessible ids are computed once per statement, not per row.
+
+    Returns:
+        (sql, params) to splice into a WHERE clause
+    """
+    if user.is_admin:
+        return '1 = 1', []
+
+    return (f'{column} IN (SELECT id FROM projects WHERE created_by_email = ? '
+            f'UNION SELECT project_id FROM stakeholders WHERE email = ?)',
+            [user.email, user.email])
 
 def filter_projects_by_access(user: User, projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
@@ -15,20 +45,18 @@ def filter_projects_by_access(user: User, projects: List[Dict[str, Any]]) -> Lis
     if user.is_admin:
         return projects
 
-    conn = sqlite3.connect(get_db_path())
-    c = conn.cursor()
-
-    accessible_ids = set()
+    with read_connection() as conn:
+        c = conn.cursor()
 
-    # Projects created by user
-    c.execute('SELECT id FROM projects WHERE created_by_email = ?', (user.email,))
-    accessible_ids.update(row[0] for row in c.fetchall())
+        accessible_ids = set()
 
-    # Projects where user is stakeholder
-    c.execute('SELECT project_id FROM stakeholders WHERE email = ?', (user.email,))
-    accessible_ids.update(row[0] for row in c.fetchall())
+        # Projects created by user
+        c.execute('SELECT id FROM projects WHERE created_by_email = ?', (user.email,))
+        accessible_ids.update(row[0] for row in c.fetchall())
 
-    conn.close()
+        # Projects where user is stakeholder
+        c.execute('SELECT project_id FROM stakeholders WHERE email = ?', (user.email,))
+        accessible_ids.update(row[0] for row in c.fetchall())
 
     return [p for p in projects if p.get('id') in accessible_ids]
 
@@ -37,19 +65,16 @@ def can_access_project(user: User, project_id: int) -> bool:
     if user.is_admin:
         return True
 
-    conn = sqlite3.connect(get_db_path())
-    c = conn.cursor()
+    with read_connection() as conn:
+        c = conn.cursor()
 
-    # Check creator
-    c.execute('SELECT id FROM projects WHERE id = ? AND created_by_email = ?',
-              (project_id, user.email))
-    if c.fetchone():
-        conn.close()
-        return True
+        # Check creator
+        c.execute('SELECT id FROM projects WHERE id = ? AND created_by_email = ?',
+                  (project_id, user.email))
+        if c.fetchone():
+            return True
 
-    # Check stakeholder
-    c.execute('SELECT id FROM stakeholders WHERE project_id = ? AND email = ?',
-              (project_id, user.email))
-    result = c.fetchone() is not None
-    conn.close()
-    return result
+        # Check stakeholder
+        c.execute('SELECT id FROM stakeholders WHERE project_id = ? AND email = ?',
+                  (project_id, user.email))
+        return c.fetchone() is not None
@@ -0,0 +1,107 @@
+"""
+Project handler for CRUD operations
+"""
+from fastapi import HTTPException
+from typing import Dict, Any, List, Optional, Tuple
+from auth_models import User
+from db_pool import db_connection, read_connection
+from event_bus import publish_change
+from project_query import ProjectListParams, project_filter_clause, paginate
+
+
+def _project_dict(row) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "name": row[1],
+        "description": row[2],
+        "status": row[3],
+        "campaign_id": row[4],
+        "created_at": row[5]
+    }
+
+
+def get_projects(params: Optional[ProjectListParams] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    List projects, newest first
+
+    Returns:
+        (projects, cursor of the next page or None)
+    """
+    filter_sql, filter_params = project_filter_clause(params)
+    query = f'''SELECT id, name, description, status, campaign_id, created_at FROM projects
+                 WHERE {filter_sql}
+                 ORDER BY created_at DESC, id DESC'''
+    if params is not None and params.limit is not None:
+        query += ' LIMIT ?'
+        filter_params.append(params.limit + 1)
+
+    with read_connection() as conn:
+        c = conn.cursor()
+        c.execute(query, filter_params)
+        projects = [_project_dict(row) for row in c.fetchall()]
+
+    return paginate(projects, params)
+
+
+def create_project(data: Dict[str, Any], user: User) -> Dict[str, Any]:
+    """Create a project owned by user; returns data with the new id"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('''INSERT INTO projects
+                     (name, description, status, campaign_id, created_by_email, created_by_name, created_by_source)
+                     VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                  (data['name'], data.get('description'), data.get('status', 'active'), data.get('campaign_id'),
+                   user.email, user.name, user.source_system))
+        project_id = c.lastrowid
+        conn.commit()
+    publish_change('project', 'created', project_id, project_id=project_id, campaign_id=data.get('campaign_id'))
+    return {**data, "id": project_id}
+
+
+def update_project(project_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a project's name, description, status and campaign"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT campaign_id FROM projects WHERE id = ?', (project_id,))
+        previous = c.fetchone()
+        c.execute('''UPDATE projects
+                     SET name = ?, description = ?, status = ?, campaign_id = ?
+                     WHERE id = ?''',
+                  (data['name'], data.get('description'), data.get('status', 'active'), data.get('campaign_id'),
+                   project_id))
+        conn.commit()
+
+        # Fetch updated project
+        c.execute('SELECT id, name, description, status, campaign_id, created_at FROM projects WHERE id = ?', (project_id,))
+        row = c.fetchone()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    publish_change('project', 'updated', project_id, project_id=project_id, campaign_id=row[4],
+                   previous_campaign_id=previous[0] if previous else None)
+
+    return _project_dict(row)
+
+
+def delete_project(project_id: int) -> Dict[str, Any]:
+    """Delete a project with its checklist items and comments"""
+    with db_connection() as conn:
+        c = conn.cursor()
+
+        # Check if project exists
+        c.execute('SELECT id, campaign_id FROM projects WHERE id = ?', (project_id,))
+        existing = c.fetchone()
+        if not existing:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        # Delete related records first (foreign key constraints)
+        c.execute('DELETE FROM checklist_items WHERE project_id = ?', (project_id,))
+        c.execute('DELETE FROM comments WHERE project_id = ?', (project_id,))
+
+        # Delete the project
+        c.execute('DELETE FROM projects WHERE id = ?', (project_id,))
+        conn.commit()
+
+    publish_change('project', 'deleted', project_id, project_id=project_id, campaign_id=existing[1])
+    return {"status": "deleted", "id": project_id}
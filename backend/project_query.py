@@ -0,0 +1,161 @@
+"""
+Filtering, keyset pagination and sparse fields for the project listings
+
+GET /api/projects, GET /api/projects/stats and GET /api/campaigns/{id}/stats
+accept the same query parameters (the campaign comes from the path in the last):
+
+- limit: page size; without it the whole (filtered) list is returned as before
+- cursor: value of the X-Next-Cursor header of the previous page
+- status, campaign_id, source_system, created_by: server-side filters
+- fields: comma-separated list of the keys to return
+
+Rows are ordered newest first (created_at DESC, id DESC). The cursor encodes
+the sort key of the last row of a page, and the next page is a range read of
+idx_projects_created_at starting right after it, so a page costs the same
+however deep it is.
+"""
+import base64
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, Path, Query
+from pydantic import BaseModel
+
+
+PROJECT_PAGE_MAX_LIMIT = int(os.getenv("PROJECT_PAGE_MAX_LIMIT", "500"))
+
+
+class ProjectListParams(BaseModel):
+    """Query parameters shared by the project listings"""
+    limit: Optional[int] = None
+    cursor: Optional[Tuple[str, int]] = None
+    status: Optional[str] = None
+    campaign_id: Optional[int] = None
+    source_system: Optional[str] = None
+    created_by: Optional[str] = None
+    fields: Optional[List[str]] = None
+
+
+def encode_cursor(created_at: str, project_id: int) -> str:
+    """Opaque cursor pointing just after the given row"""
+    raw = json.dumps([created_at, project_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Inverse of encode_cursor
+
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor
+    """
+    try:
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(project_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, project_id
+
+
+def project_list_params(
+    limit: Optional[int] = Query(None, ge=1, le=PROJECT_PAGE_MAX_LIMIT, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    status: Optional[str] = Query(None, description="Only projects with this status"),
+    campaign_id: Optional[int] = Query(None, description="Only projects in this campaign"),
+    source_system: Optional[str] = Query(None, description="Only projects from this source system"),
+    created_by: Optional[str] = Query(None, description="Only projects created by this email"),
+    fields: Optional[str] = Query(None, description="Comma-separated keys to return, e.g. id,name,progress")
+) -> ProjectListParams:
+    """FastAPI dependency parsing the listing query parameters"""
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ProjectListParams(
+        limit=limit,
+        cursor=position,
+        status=status,
+        campaign_id=campaign_id,
+        source_system=source_system,
+        created_by=created_by,
+        fields=[field.strip() for field in fields.split(',') if field.strip()] if fields else None
+    )
+
+
+def campaign_project_list_params(
+    campaign_id: int = Path(..., description="Campaign whose projects are listed"),
+    limit: Optional[int] = Query(None, ge=1, le=PROJECT_PAGE_MAX_LIMIT, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    status: Optional[str] = Query(None, description="Only projects with this status"),
+    source_system: Optional[str] = Query(None, description="Only projects from this source system"),
+    created_by: Optional[str] = Query(None, description="Only projects created by this email"),
+    fields: Optional[str] = Query(None, description="Comma-separated keys to return, e.g. id,name,progress")
+) -> ProjectListParams:
+    """project_list_params for a listing scoped to the campaign in the path"""
+    return project_list_params(limit, cursor, status, campaign_id, source_system, created_by, fields)
+
+
+def project_filter_clause(params: Optional[ProjectListParams], alias: str = 'projects') -> Tuple[str, List[Any]]:
+    """
+    SQL predicate for the filters and the cursor position
+
+    Returns:
+        (sql, params) to AND into a WHERE clause
+    """
+    if params is None:
+        return '1 = 1', []
+
+    conditions = []
+    values: List[Any] = []
+    for column in ('status', 'campaign_id', 'source_system'):
+        value = getattr(params, column)
+        if value is not None:
+            conditions.append(f'{alias}.{column} = ?')
+            values.append(value)
+    if params.created_by is not None:
+        conditions.append(f'{alias}.created_by_email = ?')
+        values.append(params.created_by)
+
+    if params.cursor is not None:
+        # Rows after the cursor in ORDER BY created_at DESC, id DESC: a range of idx_projects_created_at
+        conditions.append(f'({alias}.created_at, {alias}.id) < (?, ?)')
+        values.extend(params.cursor)
+
+    return (' AND '.join(conditions) or '1 = 1'), values
+
+
+def paginate(rows: List[Dict[str, Any]], params: Optional[ProjectListParams]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Split off the look-ahead row fetched with LIMIT limit + 1
+
+    Returns:
+        (rows of this page, cursor for the next page or None on the last page)
+    """
+    if params is None or params.limit is None or len(rows) <= params.limit:
+        return rows, None
+
+    rows = rows[:params.limit]
+    return rows, encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+
+def select_fields(rows: List[Dict[str, Any]], fields: Optional[List[str]],
+                  available: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Keep only the requested keys of each row
+
+    Raises:
+        HTTPException: 400 for a key the listing does not have
+    """
+    if not fields:
+        return rows
+
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+    return [{field: row[field] for field in fields} for row in rows]
@@ -0,0 +1,171 @@
+"""
+Project statistics for the dashboard
+
+Per-project counters (tasks, completed tasks, comments, stakeholders) are read
+from the trigger-maintained project_counters table (see counters_database.py),
+so one statement serves the whole list without scanning the child tables. The
+user's access predicate is applied inside that query, so only projects the
+user can see are read. Filters and keyset pagination come from project_query.
+
+The campaign view reads the campaign, the same query scoped to it, and a single
+grouped rollup over the campaign's projects: three statements however large
+the campaign is.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from auth_models import User
+from db_pool import read_connection
+from project_access import project_access_clause
+from project_query import ProjectListParams, project_filter_clause, paginate
+
+
+PROJECT_STATS_QUERY = '''
+    SELECT p.id, p.name, p.description, p.status, p.campaign_id, p.created_at,
+           COALESCE(pc.total_tasks, 0),
+           COALESCE(pc.completed_tasks, 0),
+           COALESCE(pc.comment_count, 0),
+           COALESCE(pc.stakeholder_count, 0)
+    FROM projects p
+    LEFT JOIN project_counters pc ON pc.project_id = p.id
+    WHERE {access} AND {filters}
+    ORDER BY p.created_at DESC, p.id DESC
+'''
+
+CAMPAIGN_ROLLUP_QUERY = '''
+    SELECT p.status,
+           COUNT(*),
+           COALESCE(SUM(pc.total_tasks), 0),
+           COALESCE(SUM(pc.completed_tasks), 0),
+           COALESCE(SUM(pc.comment_count), 0),
+           COALESCE(SUM(pc.stakeholder_count), 0)
+    FROM projects p
+    LEFT JOIN project_counters pc ON pc.project_id = p.id
+    WHERE p.campaign_id = ? AND {access}
+    GROUP BY p.status
+'''
+
+# Keys of a row_to_project_stats() dictionary, for sparse field selection
+PROJECT_STATS_FIELDS = ('id', 'name', 'description', 'status', 'campaign_id', 'created_at',
+                        'total_tasks', 'completed_tasks', 'progress', 'comment_count', 'stakeholder_count')
+
+
+def calculate_progress(completed_tasks: int, total_tasks: int) -> int:
+    """Completion percentage, rounded the same way the dashboard always has"""
+    return round((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
+
+
+def row_to_project_stats(row) -> Dict[str, Any]:
+    """Convert a PROJECT_STATS_QUERY row into the /api/projects/stats shape"""
+    total_tasks = row[6]
+    completed_tasks = row[7]
+    return {
+        "id": row[0],
+        "name": row[1],
+        "description": row[2],
+        "status": row[3],
+        "campaign_id": row[4],
+        "created_at": row[5],
+        "total_tasks": total_tasks,
+        "completed_tasks": completed_tasks,
+        "progress": calculate_progress(completed_tasks, total_tasks),
+        "comment_count": row[8],
+        "stakeholder_count": row[9]
+    }
+
+
+def campaign_rollup(rows) -> Dict[str, Any]:
+    """
+    Campaign totals from CAMPAIGN_ROLLUP_QUERY rows (one per project status)
+
+    progress is weighted by tasks: completed tasks over all tasks of the campaign.
+    """
+    status_counts = {row[0]: row[1] for row in rows}
+    total_tasks = sum(row[2] for row in rows)
+    completed_tasks = sum(row[3] for row in rows)
+    return {
+        "project_count": sum(status_counts.values()),
+        "completed_projects": status_counts.get('completed', 0),
+        "status_counts": status_counts,
+        "total_tasks": total_tasks,
+        "completed_tasks": completed_tasks,
+        "progress": calculate_progress(completed_tasks, total_tasks),
+        "comment_count": sum(row[4] for row in rows),
+        "stakeholder_count": sum(row[5] for row in rows)
+    }
+
+
+def build_project_stats_query(user: Optional[User] = None,
+                              params: Optional[ProjectListParams] = None) -> Tuple[str, List[Any]]:
+    """
+    Build the stats query and its parameters
+
+    Args:
+        user: Restrict to projects this user can access; None means all projects
+        params: Filters, cursor and page size; a page fetches one extra row
+            so paginate() can tell whether another page follows
+    """
+    if user is None:
+        access_sql, access_params = '1 = 1', []
+    else:
+        access_sql, access_params = project_access_clause(user, 'p')
+
+    filter_sql, filter_params = project_filter_clause(params, 'p')
+    query = PROJECT_STATS_QUERY.format(access=access_sql, filters=filter_sql)
+    query_params = access_params + filter_params
+    if params is not None and params.limit is not None:
+        query += '    LIMIT ?\n'
+        query_params.append(params.limit + 1)
+    return query, query_params
+
+
+def get_project_stats(user: Optional[User] = None,
+                      params: Optional[ProjectListParams] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get projects with their task, comment and stakeholder counters
+
+    Args:
+        user: Restrict to projects this user can access; None means all projects
+        params: Filters and pagination from the query string
+
+    Returns:
+        (list of project dictionaries newest first, cursor of the next page or None)
+    """
+    query, query_params = build_project_stats_query(user, params)
+
+    with read_connection() as conn:
+        c = conn.cursor()
+        c.execute(query, query_params)
+        return paginate([row_to_project_stats(row) for row in c.fetchall()], params)
+
+
+def get_campaign_stats(campaign_id: int, user: Optional[User] = None,
+                       params: Optional[ProjectListParams] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[str]]:
+    """
+    Get the counters of a campaign's projects and the campaign totals
+
+    The rollup covers every project of the campaign the user can access,
+    whatever the filters and page; the project list is filtered and paged
+    like /api/projects/stats.
+
+    Args:
+        campaign_id: Campaign whose projects are counted
+        user: Restrict to projects this user can access; None means all projects
+        params: Filters and pagination for the project list (campaign_id is overridden)
+
+    Returns:
+        (rollup, page of project dictionaries newest first, cursor of the next page or None)
+    """
+    params = (params or ProjectListParams()).copy(update={'campaign_id': campaign_id})
+    query, query_params = build_project_stats_query(user, params)
+    if user is None:
+        access_sql, access_params = '1 = 1', []
+    else:
+        access_sql, access_params = project_access_clause(user, 'p')
+
+    with read_connection() as conn:
+        c = conn.cursor()
+        c.execute(CAMPAIGN_ROLLUP_QUERY.format(access=access_sql), [campaign_id] + access_params)
+        rollup = campaign_rollup(c.fetchall())
+        c.execute(query, query_params)
+        projects, next_cursor = paginate([row_to_project_stats(row) for row in c.fetchall()], params)
+
+    return rollup, projects, next_cursor
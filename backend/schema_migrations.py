@@ -0,0 +1,156 @@
+"""
+Versioned schema migrations for cfh-project
+
+Every schema change is a numbered entry in MIGRATIONS, and the schema_version
+table records the ones a database has been through. On an up-to-date database
+run_migrations() is a single read and prints nothing, so starting a worker no
+longer re-runs every migration (and its expected-to-fail ALTER TABLEs).
+
+When several uvicorn workers start at once, the first takes an exclusive lock
+on <database>.migrate.lock and applies what is pending; the others wait for the
+lock, find the database up to date and carry on.
+
+A database created before schema_version existed starts at version 0. The
+migrations are idempotent (CREATE ... IF NOT EXISTS, ALTERs that skip existing
+columns), so they all run once on it and are recorded.
+
+To change the schema, append a new entry with the next version number. Do not
+edit a migration that has shipped: databases that recorded it never run it again.
+
+Usage:
+    python schema_migrations.py           # apply pending migrations
+    python schema_migrations.py status    # show applied and pending migrations
+"""
+import argparse
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Tuple
+
+from db_pool import db_connection, get_db_path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from auth_database import migrate_auth_schema
+from campaign_database import migrate_campaigns
+from checklist_template_database import migrate_checklist_templates
+from counters_database import migrate_project_counters
+from data_version import migrate_campaign_version, migrate_data_version
+from database import init_db, migrate_projects_table
+from search_database import migrate_search_index
+from stakeholder_database import migrate_stakeholders
+from webhook_queue_database import migrate_webhook_spool, migrate_webhook_spool_backoff
+from webhook_stats_database import migrate_webhook_stats
+
+
+# (version, name, migration), in the order they are applied
+MIGRATIONS: List[Tuple[int, str, Callable[[], None]]] = [
+    (1, 'base schema and demo data', init_db),
+    (2, 'webhook integration', migrate_projects_table),
+    (3, 'campaigns', migrate_campaigns),
+    (4, 'checklist templates', migrate_checklist_templates),
+    (5, 'stakeholders', migrate_stakeholders),
+    (6, 'authentication', migrate_auth_schema),
+    (7, 'project counters', migrate_project_counters),
+    (8, 'webhook stats', migrate_webhook_stats),
+    (9, 'search index', migrate_search_index),
+    (10, 'data version', migrate_data_version),
+    (11, 'webhook spool', migrate_webhook_spool),
+    (12, 'campaign version', migrate_campaign_version),
+    (13, 'webhook spool backoff', migrate_webhook_spool_backoff),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version() -> int:
+    """Highest migration recorded in schema_version; 0 for a new or pre-versioning database"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+        if c.fetchone() is None:
+            return 0
+        c.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+        return c.fetchone()[0]
+
+
+@contextmanager
+def migration_lock(db_path: str) -> Iterator[None]:
+    """Exclusive lock shared by every process migrating the same database file"""
+    with open(f'{db_path}.migrate.lock', 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    # LK_LOCK gives up after about 10 seconds
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def run_migrations() -> List[int]:
+    """
+    Apply the migrations the database has not been through yet
+
+    Returns:
+        Versions applied by this call (empty when the database was up to date)
+    """
+    if get_schema_version() >= LATEST_VERSION:
+        return []
+
+    applied = []
+    with migration_lock(get_db_path()):
+        # Another worker may have migrated while this one waited for the lock
+        current = get_schema_version()
+        with db_connection() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS schema_version
+                            (version INTEGER PRIMARY KEY,
+                             name TEXT NOT NULL,
+                             applied_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                             duration_ms INTEGER)''')
+            conn.commit()
+
+        for version, name, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            print(f"Applying schema migration {version}: {name}...")
+            started = time.perf_counter()
+            migrate()
+            duration_ms = round((time.perf_counter() - started) * 1000)
+            with db_connection() as conn:
+                conn.execute('INSERT INTO schema_version (version, name, duration_ms) VALUES (?, ?, ?)',
+                             (version, name, duration_ms))
+                conn.commit()
+            applied.append(version)
+
+    if applied:
+        print(f"Schema is at version {LATEST_VERSION} ({len(applied)} migrations applied)")
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    parser.add_argument("command", nargs="?", default="migrate", choices=["migrate", "status"])
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        run_migrations()
+    else:
+        current = get_schema_version()
+        print(f"{os.path.basename(get_db_path())} is at schema version {current} of {LATEST_VERSION}")
+        for version, name, _ in MIGRATIONS:
+            print(f"  {'[OK]' if version <= current else 'pending'} {version}: {name}")
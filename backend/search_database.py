@@ -0,0 +1,198 @@
+"""
+Full-text search index for cfh-project
+
+search_index is an FTS5 table holding one row per project, comment, checklist
+item and campaign. The rowid encodes where the entry comes from:
+
+    project_id << 32 | kind << 30 | source id
+
+so the triggers below update or delete an entry with a rowid lookup, and the
+search can filter on project access and entry type without reading the
+stored text. Entries of a project are a contiguous rowid range, newest project
+last; campaigns use the top project slot so they sort after every project.
+
+Usage:
+    python search_database.py            # create the index and triggers (and backfill)
+    python search_database.py verify     # compare entry counts with the source tables
+    python search_database.py rebuild    # re-index everything from scratch
+"""
+import argparse
+from typing import Dict, Any, List
+from db_pool import get_connection, release_connection
+
+
+# Bits 30-31 of the search_index rowid
+KIND_PROJECT = 0
+KIND_COMMENT = 1
+KIND_CHECKLIST_ITEM = 2
+KIND_CAMPAIGN = 3
+KIND_NAMES = {
+    KIND_PROJECT: 'project',
+    KIND_COMMENT: 'comment',
+    KIND_CHECKLIST_ITEM: 'checklist_item',
+    KIND_CAMPAIGN: 'campaign',
+}
+
+# Project slot of campaign entries (bits 32-62 all set)
+CAMPAIGN_SLOT = (1 << 31) - 1
+
+# SQL expressions decoding a search_index rowid
+ROWID_PROJECT = '({rowid} >> 32)'
+ROWID_KIND = '(({rowid} >> 30) & 3)'
+ROWID_SOURCE_ID = '({rowid} & 1073741823)'
+
+# (kind, table, title, body, project slot) with {row} standing for NEW, OLD or the table
+INDEXED_SOURCES = [
+    (KIND_PROJECT, 'projects', '{row}.name', "COALESCE({row}.description, '')", '{row}.id'),
+    (KIND_COMMENT, 'comments', "''", '{row}.content', 'COALESCE({row}.project_id, 0)'),
+    (KIND_CHECKLIST_ITEM, 'checklist_items', '{row}.title', "''", 'COALESCE({row}.project_id, 0)'),
+    (KIND_CAMPAIGN, 'campaigns', '{row}.name', "COALESCE({row}.description, '')", str(CAMPAIGN_SLOT)),
+]
+
+# Columns whose changes are re-indexed, per table
+WATCHED_COLUMNS = {
+    'projects': ('name', 'description'),
+    'comments': ('content', 'project_id'),
+    'checklist_items': ('title', 'project_id'),
+    'campaigns': ('name', 'description'),
+}
+
+
+def _entry_rowid(row: str, kind: int, project_slot: str) -> str:
+    """search_index rowid of the entry for a source row (SQLite's bit operators share one precedence)"""
+    return f'(({project_slot.format(row=row)} << 32) | ({kind} << 30) | {row}.id)'
+
+
+def _entry_values(row: str, kind: int, title: str, body: str, project_slot: str) -> str:
+    """rowid, title, body of the index entry for a source row"""
+    return ', '.join([_entry_rowid(row, kind, project_slot), title.format(row=row), body.format(row=row)])
+
+
+def _source_triggers(kind: int, table: str, title: str, body: str, project_slot: str) -> List[str]:
+    new_values = _entry_values('NEW', kind, title, body, project_slot)
+    old_rowid = _entry_rowid('OLD', kind, project_slot)
+    watched = WATCHED_COLUMNS[table]
+    changed = ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in watched)
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO search_index (rowid, title, body) VALUES ({new_values});
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update
+            AFTER UPDATE OF {', '.join(watched)} ON {table}
+            WHEN {changed}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {old_rowid};
+                INSERT INTO search_index (rowid, title, body) VALUES ({new_values});
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {old_rowid};
+            END''',
+    ]
+
+
+TRIGGERS = [trigger for source in INDEXED_SOURCES for trigger in _source_triggers(*source)]
+
+
+def migrate_search_index():
+    """Create the FTS5 index and its triggers, backfilling it on first run"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    print("Starting search index migration...")
+
+    c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    needs_backfill = c.fetchone() is None
+
+    # prefix='2 3' keeps short prefix queries ("des*") off a full term scan
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5
+                 (title, body,
+                  tokenize = 'unicode61 remove_diacritics 2',
+                  prefix = '2 3')''')
+    print("  [OK] Created search_index table")
+
+    for trigger_sql in TRIGGERS:
+        c.execute(trigger_sql)
+    print(f"  [OK] Created {len(TRIGGERS)} search index triggers")
+
+    conn.commit()
+    release_connection(conn)
+
+    if needs_backfill:
+        rebuild_search_index()
+
+    print("Search index migration completed successfully!")
+
+
+def rebuild_search_index() -> Dict[str, int]:
+    """
+    Re-index every source table in one transaction, then merge the index segments
+
+    Returns:
+        Number of entries written per kind
+    """
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        c.execute('DELETE FROM search_index')
+        counts = {}
+        for kind, table, title, body, project_slot in INDEXED_SOURCES:
+            c.execute(f'''INSERT INTO search_index (rowid, title, body)
+                          SELECT {_entry_values(table, kind, title, body, project_slot)}
+                          FROM {table}''')
+            counts[KIND_NAMES[kind]] = c.rowcount
+        c.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+        conn.commit()
+    finally:
+        release_connection(conn)
+
+    print(f"  [OK] Rebuilt search index: {', '.join(f'{count} {kind}' for kind, count in counts.items())}")
+    return counts
+
+
+def verify_search_index() -> List[Dict[str, Any]]:
+    """
+    Compare the number of index entries per kind with the source tables
+
+    Returns:
+        One entry per kind whose counts differ
+    """
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        c.execute(f"SELECT {ROWID_KIND.format(rowid='rowid')}, COUNT(*) FROM search_index GROUP BY 1")
+        indexed = dict(c.fetchall())
+
+        drift = []
+        for kind, table, _, _, _ in INDEXED_SOURCES:
+            c.execute(f'SELECT COUNT(*) FROM {table}')
+            expected = c.fetchone()[0]
+            if indexed.get(kind, 0) != expected:
+                drift.append({"kind": KIND_NAMES[kind], "expected": expected, "actual": indexed.get(kind, 0)})
+        return drift
+    finally:
+        release_connection(conn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-text search index maintenance")
+    parser.add_argument("command", nargs="?", default="migrate", choices=["migrate", "verify", "rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate_search_index()
+    elif args.command == "rebuild":
+        rebuild_search_index()
+    else:
+        drift = verify_search_index()
+        for entry in drift:
+            print(f"  ✗ {entry['kind']}: {entry['expected']} rows, {entry['actual']} index entries")
+        if drift:
+            print(f"Found {len(drift)} drifted kinds; run 'python search_database.py rebuild'")
+            raise SystemExit(1)
+        print("Search index is consistent")
@@ -0,0 +1,125 @@
+"""
+Full-text search over projects, comments, checklist items and campaigns
+
+Queries the FTS5 search_index (see search_database.py). Every word of the
+user's query must match, the last one as a prefix, so results show up while
+typing. Every match is ranked with bm25, a match in a name or title counting
+ten times as much as one in a description or comment, so the best result is
+found however old it is. A word found in a large part of the corpus therefore
+costs a scoring pass over all of its matches.
+
+Project-bound entries are filtered with the same access rules as the project
+listings; campaigns are visible to everyone, like GET /api/campaigns. Type and
+access filters only read the rowid, never the stored text.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from auth_models import User
+from db_pool import read_connection
+from project_access import project_id_access_clause
+from search_database import KIND_CAMPAIGN, KIND_NAMES, ROWID_KIND, ROWID_PROJECT, ROWID_SOURCE_ID
+
+
+SEARCH_MAX_LIMIT = 100
+
+# Words as the unicode61 tokenizer sees them
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+SEARCH_QUERY = '''
+    SELECT {source_id}, {kind}, {project}, p.name, s.title,
+           snippet(search_index, -1, '[', ']', '…', 12),
+           bm25(search_index, 10.0, 1.0) AS rank
+    FROM search_index s
+    LEFT JOIN projects p ON p.id = {project}
+    WHERE search_index MATCH ?
+      AND {filters}
+    ORDER BY rank
+    LIMIT ?
+'''
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    FTS5 query for free text: every word must match, the last as a prefix
+
+    Words are quoted, so FTS5 operators in user input are taken literally.
+
+    Returns:
+        The MATCH expression, or None when the text has no words
+    """
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def build_search_query(user: Optional[User], kinds: Optional[List[str]] = None) -> Tuple[str, List[Any]]:
+    """
+    Build the search statement
+
+    Its parameters are [match] + filter_params + [limit], see search().
+
+    Args:
+        user: Restrict project-bound entries to what this user can access; None means all
+        kinds: Entry types to return (project, comment, checklist_item, campaign); None means all
+
+    Returns:
+        (sql, filter_params)
+    """
+    kind = ROWID_KIND.format(rowid='s.rowid')
+    if kinds:
+        codes = [code for code, name in KIND_NAMES.items() if name in kinds]
+        conditions = [f"{kind} IN ({', '.join(str(code) for code in codes) or 'NULL'})"]
+    else:
+        conditions = []
+
+    filter_params: List[Any] = []
+    if user is not None and not user.is_admin:
+        access_sql, filter_params = project_id_access_clause(user, ROWID_PROJECT.format(rowid='s.rowid'))
+        conditions.append(f'({kind} = {KIND_CAMPAIGN} OR {access_sql})')
+
+    query = SEARCH_QUERY.format(
+        source_id=ROWID_SOURCE_ID.format(rowid='s.rowid'),
+        kind=kind,
+        project=ROWID_PROJECT.format(rowid='s.rowid'),
+        filters=' AND '.join(conditions) or '1 = 1'
+    )
+    return query, filter_params
+
+
+def search(text: str, user: Optional[User] = None, limit: int = 20,
+           kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Search the index
+
+    Args:
+        text: Free text typed by the user
+        user: Access filter; None means all entries
+        limit: Maximum number of results
+        kinds: Entry types to return; None means all
+
+    Returns:
+        Results, best first, with type, id, project, title and a highlighted snippet
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    query, filter_params = build_search_query(user, kinds)
+    with read_connection() as conn:
+        c = conn.cursor()
+        c.execute(query, [match] + filter_params + [limit])
+        rows = c.fetchall()
+
+    return [{
+        "type": KIND_NAMES[row[1]],
+        "id": row[0],
+        "project_id": row[2] if row[1] != KIND_CAMPAIGN and row[2] else None,
+        "project_name": row[3],
+        "title": row[4],
+        "snippet": row[5],
+        "rank": round(row[6], 4)
+    } for row in rows]
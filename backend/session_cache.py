@@ -0,0 +1,141 @@
+"""
+Cache of Laravel session validation results
+
+Cookie-based requests used to make an outbound call to Laravel's
+/api/session/validate on every request. Results are now kept in a bounded
+TTL + LRU cache keyed by a SHA-256 of the session cookie (raw cookies are never
+stored), so a session is validated at most once per TTL:
+
+- valid sessions are cached for SESSION_CACHE_TTL_SECONDS (default 60);
+- rejected sessions are cached for SESSION_CACHE_NEGATIVE_TTL_SECONDS (default 5),
+  which absorbs bursts of requests with a stale cookie;
+- concurrent lookups of the same cookie share a single outbound call, which
+  finishes even if the request that started it is cancelled;
+- transport errors are not cached, the next request tries again.
+
+A logout in Laravel therefore takes up to the TTL to be noticed here.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from auth_models import User
+
+
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+
+
+class SessionCache:
+    """TTL + LRU cache of validated sessions with per-key request coalescing"""
+
+    def __init__(self, ttl: float = SESSION_CACHE_TTL_SECONDS,
+                 negative_ttl: float = SESSION_CACHE_NEGATIVE_TTL_SECONDS,
+                 max_entries: int = SESSION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Optional[User]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._metrics = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "errors": 0
+        }
+
+    @staticmethod
+    def make_key(base_url: str, cookie_name: str, cookie: str) -> str:
+        """Hash the cookie together with the system it belongs to"""
+        return hashlib.sha256(f"{base_url}|{cookie_name}|{cookie}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Tuple[bool, Optional[User]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, user
+
+    def _store(self, key: str, user: Optional[User]):
+        ttl = self.ttl if user is not None else self.negative_ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._metrics["evictions"] += 1
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[User]]]) -> Optional[User]:
+        """
+        Return the cached result for key, calling loader at most once per miss
+
+        Args:
+            key: Value from make_key()
+            loader: Coroutine function doing the real validation; exceptions
+                propagate to every waiting caller and nothing is cached.
+                It keeps running when the caller that started it is cancelled.
+
+        Returns:
+            The validated User, or None for a rejected session
+        """
+        found, user = self._lookup(key)
+        if found:
+            self._metrics["hits" if user is not None else "negative_hits"] += 1
+            return user
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._metrics["coalesced"] += 1
+        else:
+            self._metrics["misses"] += 1
+            # The lookup runs as its own task, so a caller that is cancelled
+            # (client went away) does not cancel it for everyone else waiting
+            task = asyncio.get_running_loop().create_task(self._load(key, loader))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Optional[User]]]) -> Optional[User]:
+        try:
+            user = await loader()
+        except Exception:
+            self._metrics["errors"] += 1
+            raise
+        else:
+            self._store(key, user)
+            return user
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, key: Optional[str] = None):
+        """Forget one cached session, or all of them"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self._metrics["hits"] + self._metrics["negative_hits"] + self._metrics["misses"]
+        hit_ratio = (self._metrics["hits"] + self._metrics["negative_hits"]) / lookups if lookups else 0.0
+        return {
+            **self._metrics,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_ratio": round(hit_ratio, 4)
+        }
+
+
+session_cache = SessionCache()
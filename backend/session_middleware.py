@@ -1,13 +1,56 @@
 import httpx
 from fastapi import Request, HTTPException, Depends
-from typing import Optional
+from typing import Dict, Optional
+import asyncio
 import os
 import json
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from auth_models import User
+from session_cache import session_cache
 
 LARAVEL11_URL = os.getenv("LARAVEL11_URL", "http://localhost/v2")
 LARAVEL9_URL = os.getenv("LARAVEL9_URL", "http://localhost")
 
+# Outbound connection settings for session validation
+LARAVEL_TIMEOUT_SECONDS = float(os.getenv("LARAVEL_TIMEOUT_SECONDS", "5"))
+LARAVEL_MAX_CONNECTIONS = int(os.getenv("LARAVEL_MAX_CONNECTIONS", "20"))
+LARAVEL_MAX_KEEPALIVE = int(os.getenv("LARAVEL_MAX_KEEPALIVE", "10"))
+LARAVEL_KEEPALIVE_EXPIRY = float(os.getenv("LARAVEL_KEEPALIVE_EXPIRY", "30"))
+LARAVEL_HTTP2 = os.getenv("LARAVEL_HTTP2", "true").lower() in ("1", "true", "yes")
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# One keep-alive client per Laravel base URL, opened by the app lifespan
+_laravel_clients: Dict[str, httpx.AsyncClient] = {}
+
+async def open_laravel_clients():
+    """Create the application-lifetime HTTP clients (call at startup)"""
+    for base_url in (LARAVEL11_URL, LARAVEL9_URL):
+        if base_url not in _laravel_clients:
+            _laravel_clients[base_url] = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=LARAVEL_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=LARAVEL_MAX_CONNECTIONS,
+                    max_keepalive_connections=LARAVEL_MAX_KEEPALIVE,
+                    keepalive_expiry=LARAVEL_KEEPALIVE_EXPIRY
+                ),
+                http2=LARAVEL_HTTP2 and HTTP2_AVAILABLE,
+                # Shared between users: never keep cookies Laravel sets
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+            )
+
+async def close_laravel_clients():
+    """Close the HTTP clients and their pooled connections (call at shutdown)"""
+    clients = list(_laravel_clients.values())
+    _laravel_clients.clear()
+    for client in clients:
+        await client.aclose()
+
 async def get_current_user(request: Request) -> Optional[User]:
     """Extract user from X-User-Info header (sent by frontend after Laravel validation)"""
 
@@ -31,51 +74,73 @@ async def get_current_user(request: Request) -> Optional[User]:
 
     # Fallback: try cookie-based validation (for backward compatibility)
     cookies = request.cookies
-
-    # Try Laravel 11 first
     l11_cookie = cookies.get('laravel11_session')
+    l9_cookie = cookies.get('digital_operations_session')
+
+    # Both present: ask both systems at once, Laravel 11 still wins
+    if l11_cookie and l9_cookie:
+        l11_user, l9_user = await asyncio.gather(
+            validate_session(LARAVEL11_URL, l11_cookie, 'laravel11_session'),
+            validate_session(LARAVEL9_URL, l9_cookie, 'digital_operations_session')
+        )
+        return l11_user or l9_user
+
     if l11_cookie:
-        user = await validate_session(LARAVEL11_URL, l11_cookie, 'laravel11_session')
-        if user:
-            return user
+        return await validate_session(LARAVEL11_URL, l11_cookie, 'laravel11_session')
 
-    # Try Laravel 9
-    l9_cookie = cookies.get('digital_operations_session')
     if l9_cookie:
-        user = await validate_session(LARAVEL9_URL, l9_cookie, 'digital_operations_session')
-        if user:
-            return user
+        return await validate_session(LARAVEL9_URL, l9_cookie, 'digital_operations_session')
 
     return None
 
 async def validate_session(base_url: str, cookie: str, cookie_name: str) -> Optional[User]:
-    """Call Laravel API to validate session"""
+    """Validate a session cookie, answering from the session cache when possible"""
+    key = session_cache.make_key(base_url, cookie_name, cookie)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{base_url}/api/session/validate",
-                cookies={cookie_name: cookie},
-                timeout=5.0
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('authenticated'):
-                    user_data = data['user']
-                    return User(
-                        id=user_data['id'],
-                        email=user_data['email'],
-                        name=user_data['name'],
-                        source_system=data['source_system'],
-                        is_admin=user_data['is_admin'],
-                        department=user_data.get('department'),
-                        roles=user_data.get('roles', [])
-                    )
+        return await session_cache.get_or_load(
+            key, lambda: fetch_session_user(base_url, cookie, cookie_name)
+        )
     except Exception as e:
         print(f"Session validation error for {base_url}: {e}")
 
     return None
 
+async def fetch_session_user(base_url: str, cookie: str, cookie_name: str) -> Optional[User]:
+    """
+    Call Laravel API to validate session
+
+    Returns None when Laravel rejects the session; raises when Laravel cannot
+    give an answer (network error, 5xx) so that the result is not cached.
+    """
+    client = _laravel_clients.get(base_url)
+    if client is None:
+        # Outside the app lifespan (scripts, bare TestClient): one-off client
+        async with httpx.AsyncClient(timeout=LARAVEL_TIMEOUT_SECONDS) as client:
+            response = await client.get(f"{base_url}/api/session/validate",
+                                        headers={"Cookie": f"{cookie_name}={cookie}"})
+    else:
+        response = await client.get("/api/session/validate",
+                                    headers={"Cookie": f"{cookie_name}={cookie}"})
+
+    if response.status_code in (401, 403, 419):
+        return None
+    response.raise_for_status()
+
+    data = response.json()
+    if not data.get('authenticated'):
+        return None
+
+    user_data = data['user']
+    return User(
+        id=user_data['id'],
+        email=user_data['email'],
+        name=user_data['name'],
+        source_system=data['source_system'],
+        is_admin=user_data['is_admin'],
+        department=user_data.get('department'),
+        roles=user_data.get('roles', [])
+    )
+
 async def require_auth(user: Optional[User] = Depends(get_current_user)) -> User:
     """Require authentication"""
     if not user:
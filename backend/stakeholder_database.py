@@ -1,8 +1,8 @@
-import sqlite3
+from db_pool import get_connection, release_connection
 
 def migrate_stakeholders():
     """Create stakeholders table for project collaboration"""
-    conn = sqlite3.connect('demo.db')
+    conn = get_connection()
     c = conn.cursor()
 
     print("Starting stakeholders migration...")
@@ -29,8 +29,13 @@ def migrate_stakeholders():
                  ON stakeholders(project_id, email)''')
     print("  [OK] Created unique index on (project_id, email)")
 
+    # Create index on email for the stakeholder half of the project access check
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_stakeholders_email
+                 ON stakeholders(email, project_id)''')
+    print("  [OK] Created index on stakeholders(email, project_id)")
+
     conn.commit()
-    conn.close()
+    release_connection(conn)
 
     print("Stakeholders migration completed successfully!")
 
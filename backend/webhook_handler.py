@@ -2,119 +2,190 @@
 Core webhook handling logic for processing project data from Laravel systems
 """
 from fastapi import HTTPException
-from typing import Dict, Any, Optional
-import sqlite3
-from datetime import datetime
-import json
+from typing import Dict, Any, List, Optional, Tuple
+import hashlib
 import os
-
-
-def get_db_path() -> str:
-    """Get the database file path"""
-    return os.path.join(os.path.dirname(__file__), 'demo.db')
+import threading
+from datetime import datetime, timezone
+import json
+from db_pool import get_connection, release_connection, get_read_connection, release_read_connection
+import json_codec
+from event_bus import publish_change
+from campaign_cache import campaign_cache
+from data_version import get_campaign_version
+from webhook_stats_database import activity_cutoff
+
+
+# Maximum number of payloads accepted by one batch request
+WEBHOOK_BATCH_MAX_ITEMS = int(os.getenv("WEBHOOK_BATCH_MAX_ITEMS", "5000"))
+
+# Most single deliveries applied together in one group commit
+WEBHOOK_GROUP_COMMIT_MAX_ITEMS = int(os.getenv("WEBHOOK_GROUP_COMMIT_MAX_ITEMS", "200"))
+
+# Keys looked up per statement by _lookup_projects
+LOOKUP_CHUNK_SIZE = 400
+
+# The WHERE clause leaves the row untouched for an event older than the last
+# applied one, or for a repeat of the last applied event (see _should_apply)
+PROJECT_UPSERT_SQL = '''INSERT INTO projects
+                          (name, description, status, source_system, source_id,
+                           source_reference, metadata, webhook_received_at, last_synced_at,
+                           created_at, campaign_id, created_by_email, created_by_name, created_by_source,
+                           last_event_at, content_hash)
+                          VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                          ON CONFLICT(source_system, source_id) DO UPDATE SET
+                              name = excluded.name,
+                              description = excluded.description,
+                              status = excluded.status,
+                              metadata = excluded.metadata,
+                              last_synced_at = excluded.last_synced_at,
+                              campaign_id = excluded.campaign_id,
+                              created_by_email = COALESCE(excluded.created_by_email, projects.created_by_email),
+                              created_by_name = COALESCE(excluded.created_by_name, projects.created_by_name),
+                              created_by_source = COALESCE(excluded.created_by_source, projects.created_by_source),
+                              last_event_at = excluded.last_event_at,
+                              content_hash = excluded.content_hash
+                          WHERE projects.last_event_at IS NULL
+                             OR excluded.last_event_at > projects.last_event_at
+                             OR (excluded.last_event_at = projects.last_event_at
+                                 AND excluded.content_hash IS NOT projects.content_hash)'''
+
+# Single upsert that also reports the row; webhook_received_at is only set on insert
+PROJECT_UPSERT_RETURNING_SQL = PROJECT_UPSERT_SQL + '''
+                          RETURNING id, webhook_received_at = ?'''
+
+# Webhook campaigns are keyed by name per source system (idx_campaigns_source_reference).
+# An existing campaign is left unwritten (an update, even a no-op one, would fire the
+# data_version triggers), so RETURNING only reports a new row and the caller looks
+# up an existing one with CAMPAIGN_LOOKUP_SQL.
+CAMPAIGN_UPSERT_SQL = '''INSERT INTO campaigns
+                           (name, description, status, source_system, source_reference,
+                            metadata, created_at, updated_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                           ON CONFLICT(source_system, source_reference) WHERE source_id IS NULL
+                           DO NOTHING
+                           RETURNING id'''
+
+CAMPAIGN_LOOKUP_SQL = '''SELECT id FROM campaigns
+                           WHERE source_system = ? AND source_reference = ? AND source_id IS NULL'''
+
+
+def event_time(timestamp: str) -> str:
+    """Normalize a payload timestamp to fixed-width UTC so events compare as strings"""
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def content_hash(payload: Dict[str, Any]) -> str:
+    """SHA-256 of the payload, ignoring the signature"""
+    content = {key: value for key, value in payload.items() if key != 'webhook_signature'}
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _should_apply(event_at: str, event_hash: str,
+                  last_event_at: Optional[str], last_hash: Optional[str]) -> bool:
+    """Python twin of the WHERE clause of PROJECT_UPSERT_SQL"""
+    if last_event_at is None or event_at > last_event_at:
+        return True
+    return event_at == last_event_at and event_hash != last_hash
+
+
+def _project_row(payload: Dict[str, Any], campaign_id: Optional[int], current_time: str) -> Tuple:
+    """Parameters for PROJECT_UPSERT_SQL from a webhook payload"""
+    source_system = payload['source_system']
+    project_data = payload['project']
+
+    # Extract creator info from metadata
+    metadata = project_data.get('metadata') or {}
+
+    return (project_data['name'],
+            project_data.get('description', ''),
+            project_data.get('status', 'active'),
+            source_system,
+            payload['source_id'],
+            payload.get('source_reference', ''),
+            json.dumps(project_data.get('metadata', {})),
+            current_time,
+            current_time,
+            current_time,
+            campaign_id,
+            metadata.get('user_email'),
+            metadata.get('user_name'),
+            source_system,
+            event_time(payload['timestamp']),
+            content_hash(payload))
 
 
 def handle_webhook_project(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process incoming webhook and create/update project
 
+    The campaign and the project are each upserted with a single
+    INSERT ... ON CONFLICT ... RETURNING statement, inside one transaction, so
+    concurrent deliveries of the same source_id cannot race each other.
+    An event older than the last applied one for the project, or a repeat of
+    it, leaves the row untouched and is reported as skipped.
+
     Args:
         payload: Webhook payload dictionary
 
     Returns:
-        Dictionary with project_id, action, source_system, source_id
+        Dictionary with project_id, action (created, updated or skipped),
+        source_system, source_id
 
     Raises:
         HTTPException: If database operation fails
     """
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_connection()
     c = conn.cursor()
 
     try:
         source_system = payload['source_system']
         source_id = payload['source_id']
         source_reference = payload.get('source_reference', '')
-        project_data = payload['project']
         campaign_data = payload.get('campaign')
-
-        # Extract creator info from metadata
-        metadata = project_data.get('metadata', {})
-        creator_email = metadata.get('user_email')
-        creator_name = metadata.get('user_name')
-        creator_source = source_system
+        current_time = datetime.now().isoformat()
 
         # Handle campaign if provided
-        campaign_id = None
+        campaign_version = None
         if campaign_data:
-            campaign_id = find_or_create_campaign_inline(
-                c, source_system, campaign_data, conn
-            )
-
-        # Check if project already exists (idempotency)
-        c.execute('''SELECT id FROM projects
-                     WHERE source_system = ? AND source_id = ?''',
-                  (source_system, source_id))
-        existing = c.fetchone()
-
-        current_time = datetime.now().isoformat()
-
-        if existing:
-            # Update existing project
-            project_id = existing[0]
-
-            c.execute('''UPDATE projects
-                         SET name = ?, description = ?, status = ?,
-                             metadata = ?, last_synced_at = ?, campaign_id = ?,
-                             created_by_email = COALESCE(?, created_by_email),
-                             created_by_name = COALESCE(?, created_by_name),
-                             created_by_source = COALESCE(?, created_by_source)
-                         WHERE source_system = ? AND source_id = ?''',
-                      (project_data['name'],
-                       project_data.get('description', ''),
-                       project_data.get('status', 'active'),
-                       json.dumps(project_data.get('metadata', {})),
-                       current_time,
-                       campaign_id,
-                       creator_email,
-                       creator_name,
-                       creator_source,
-                       source_system,
-                       source_id))
-
-            action = "updated"
-
-            print(f"[OK] Updated project {project_id} from {source_system}/{source_id}")
+            # Take the write lock before reading campaign_version, so no other
+            # worker can delete or rename the campaign before this commits
+            c.execute('BEGIN IMMEDIATE')
+            campaign_version = sync_campaign_cache(c)
+        campaign_id, campaign_created = find_or_create_campaign_inline(
+            c, source_system, campaign_data, current_time
+        )
 
+        c.execute(PROJECT_UPSERT_RETURNING_SQL,
+                  _project_row(payload, campaign_id, current_time) + (current_time,))
+        row = c.fetchone()
+        if row:
+            project_id, created = row
+            action = "created" if created else "updated"
         else:
-            # Create new project
-            c.execute('''INSERT INTO projects
-                         (name, description, status, source_system, source_id,
-                          source_reference, metadata, webhook_received_at, last_synced_at,
-                          created_at, campaign_id, created_by_email, created_by_name, created_by_source)
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                      (project_data['name'],
-                       project_data.get('description', ''),
-                       project_data.get('status', 'active'),
-                       source_system,
-                       source_id,
-                       source_reference,
-                       json.dumps(project_data.get('metadata', {})),
-                       current_time,
-                       current_time,
-                       current_time,
-                       campaign_id,
-                       creator_email,
-                       creator_name,
-                       creator_source))
-
-            project_id = c.lastrowid
-            action = "created"
-
-            print(f"[OK] Created project {project_id} from {source_system}/{source_id}")
+            # The conflict update was filtered out: stale or duplicate event
+            c.execute('SELECT id FROM projects WHERE source_system = ? AND source_id = ?',
+                      (source_system, source_id))
+            project_id = c.fetchone()[0]
+            action = "skipped"
 
         conn.commit()
 
+        if campaign_id is not None:
+            campaign_cache.put(source_system, campaign_data.get('name', 'Unknown'), campaign_id, campaign_version)
+        if campaign_created:
+            print(f"  [OK] Created campaign {campaign_id}: {campaign_data['name']}")
+            publish_change('campaign', 'created', campaign_id, campaign_id=campaign_id)
+        if action == "skipped":
+            print(f"  - Skipped stale or duplicate event for project {project_id} from {source_system}/{source_id}")
+        else:
+            print(f"[OK] {action.capitalize()} project {project_id} from {source_system}/{source_id}")
+            publish_change('project', action, project_id, project_id=project_id, campaign_id=campaign_id)
+
         return {
             "project_id": project_id,
             "action": action,
@@ -123,73 +194,333 @@ def handle_webhook_project(payload: Dict[str, Any]) -> Dict[str, Any]:
             "source_reference": source_reference
         }
 
-    except sqlite3.IntegrityError as e:
+    except Exception as e:
         conn.rollback()
-        error_msg = str(e).lower()
-
-        # Handle duplicate entry (should not happen due to check above, but just in case)
-        if "unique" in error_msg or "duplicate" in error_msg:
-            # Try to get the existing project
-            c.execute('''SELECT id FROM projects
-                         WHERE source_system = ? AND source_id = ?''',
-                      (source_system, source_id))
-            existing = c.fetchone()
-
-            if existing:
-                return {
-                    "project_id": existing[0],
-                    "action": "already_exists",
-                    "source_system": source_system,
-                    "source_id": source_id
-                }
-
+        print(f"✗ Error processing webhook: {str(e)}")
         raise HTTPException(
             status_code=500,
-            detail=f"Database integrity error: {str(e)}"
+            detail=f"Database error: {str(e)}"
         )
 
+    finally:
+        release_connection(conn)
+
+
+class _QueuedWebhook:
+    """A single delivery waiting for a group commit"""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+        # Set when the delivery is written, or when it is handed the lead
+        self.ready = threading.Event()
+
+
+class WebhookGroupCommit:
+    """
+    Group commit for single webhook deliveries
+
+    The first delivery to arrive while nothing is being written leads: it
+    writes everything queued (up to WEBHOOK_GROUP_COMMIT_MAX_ITEMS per
+    transaction, with handle_webhook_projects_batch) and keeps going while
+    more deliveries queue up behind it, then hands the lead to the oldest
+    waiting one once it has written max_items. Waiting deliveries just pick
+    up their results. A lone delivery goes through handle_webhook_project as
+    before, so an idle server behaves exactly as without grouping.
+    """
+
+    def __init__(self, max_items: int = WEBHOOK_GROUP_COMMIT_MAX_ITEMS):
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._queue: List[_QueuedWebhook] = []
+        self._writing = False
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one payload, possibly together with concurrent ones; same result as handle_webhook_project"""
+        entry = _QueuedWebhook(payload)
+        with self._lock:
+            self._queue.append(entry)
+            lead = not self._writing
+            self._writing = True
+
+        if not lead:
+            entry.ready.wait()
+        if not entry.done:
+            # The queue is FIFO and a leader starts with the oldest entry: this one
+            self._lead()
+
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
+
+    def _lead(self):
+        written = 0
+        next_leader = None
+        try:
+            while True:
+                with self._lock:
+                    group = self._queue[:self.max_items]
+                    del self._queue[:self.max_items]
+                try:
+                    self._apply(group)
+                finally:
+                    for member in group:
+                        member.done = True
+                        member.ready.set()
+                written += len(group)
+
+                with self._lock:
+                    if not self._queue:
+                        self._writing = False
+                        return
+                    if written >= self.max_items:
+                        next_leader = self._queue[0]
+                        return
+        except BaseException:
+            with self._lock:
+                if self._queue:
+                    next_leader = self._queue[0]
+                else:
+                    self._writing = False
+            raise
+        finally:
+            if next_leader is not None:
+                next_leader.ready.set()
+
+    def _apply(self, group: List[_QueuedWebhook]):
+        """Write a group in one transaction, one by one if that fails"""
+        if len(group) > 1:
+            try:
+                results = handle_webhook_projects_batch([member.payload for member in group])
+                for member, result in zip(group, results):
+                    member.result = result
+                return
+            except Exception as e:
+                print(f"✗ Webhook group of {len(group)} failed, applying them one by one: "
+                      f"{getattr(e, 'detail', e)}")
+
+        for member in group:
+            try:
+                member.result = handle_webhook_project(member.payload)
+            except Exception as e:
+                member.error = e
+
+
+webhook_group_commit = WebhookGroupCommit()
+
+
+def handle_webhook_project_grouped(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process one incoming webhook, sharing a commit with concurrent deliveries
+
+    See WebhookGroupCommit.
+
+    Args:
+        payload: Webhook payload dictionary
+
+    Returns:
+        Same result as handle_webhook_project
+
+    Raises:
+        HTTPException: If database operation fails
+    """
+    return webhook_group_commit.submit(payload)
+
+
+def parse_webhook_batch(body: bytes, content_type: Optional[str] = None) -> List[Any]:
+    """
+    Decode a batch request body: a JSON array, or NDJSON (one payload per line)
+
+    Raises:
+        ValueError: If the body is neither
+    """
+    text = body.decode('utf-8').strip()
+    if not text:
+        return []
+
+    is_ndjson = 'ndjson' in (content_type or '') or 'jsonlines' in (content_type or '')
+    if not is_ndjson and text.startswith('['):
+        items = json_codec.loads(text)
+        if not isinstance(items, list):
+            raise ValueError("Expected a JSON array of webhook payloads")
+        return items
+
+    items = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            try:
+                items.append(json_codec.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+    return items
+
+
+def build_project_lookup_query(count: int) -> str:
+    """SELECT resolving count (source_system, source_id) pairs through idx_projects_source"""
+    values = ', '.join('(?, ?)' for _ in range(count))
+    return f'''WITH keys(source_system, source_id) AS (VALUES {values})
+              SELECT p.source_system, p.source_id, p.id, p.last_event_at, p.content_hash
+              FROM keys
+              JOIN projects p ON p.source_system = keys.source_system
+                             AND p.source_id = keys.source_id'''
+
+
+def _lookup_projects(cursor, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Map (source_system, source_id) pairs to existing (project id, last_event_at,
+    content_hash), a chunk per statement
+    """
+    found = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+        cursor.execute(build_project_lookup_query(len(chunk)), [part for key in chunk for part in key])
+        for source_system, source_id, project_id, last_event_at, last_hash in cursor.fetchall():
+            found[(source_system, source_id)] = (project_id, last_event_at, last_hash)
+    return found
+
+
+def handle_webhook_projects_batch(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Upsert many webhook payloads in a single transaction
+
+    Args:
+        payloads: Validated webhook payload dictionaries
+
+    Returns:
+        One result per payload, in order, with project_id and action
+        (created, updated or skipped; a source_id repeated in the batch is
+        created once and then updated). Events older than the last applied one
+        for their project, and repeats of it, are skipped without a write.
+
+    Raises:
+        HTTPException: If the database operation fails; nothing is written
+    """
+    if not payloads:
+        return []
+
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        # Take the write lock up front so created/updated is decided consistently
+        c.execute('BEGIN IMMEDIATE')
+
+        keys = list(dict.fromkeys((p['source_system'], p['source_id']) for p in payloads))
+        existing = _lookup_projects(c, keys)
+        campaign_version = sync_campaign_cache(c) if any(payload.get('campaign') for payload in payloads) else None
+
+        current_time = datetime.now().isoformat()
+        campaign_ids: Dict[Tuple[str, str], Optional[int]] = {}
+        created_campaigns = []
+        rows = []
+        actions = []
+        # Last applied (event time, hash) per project, advanced as the batch is walked
+        applied = {key: (last_event_at, last_hash) for key, (_, last_event_at, last_hash) in existing.items()}
+        for payload in payloads:
+            source_system = payload['source_system']
+            key = (source_system, payload['source_id'])
+            event_at = event_time(payload['timestamp'])
+            event_hash = content_hash(payload)
+
+            if key in applied and not _should_apply(event_at, event_hash, *applied[key]):
+                actions.append("skipped")
+                continue
+
+            campaign_id = None
+            campaign_data = payload.get('campaign')
+            if campaign_data:
+                campaign_key = (source_system, campaign_data.get('name', 'Unknown'))
+                if campaign_key not in campaign_ids:
+                    campaign_ids[campaign_key], campaign_created = find_or_create_campaign_inline(
+                        c, source_system, campaign_data, current_time
+                    )
+                    if campaign_created:
+                        created_campaigns.append(campaign_ids[campaign_key])
+                campaign_id = campaign_ids[campaign_key]
+
+            rows.append(_project_row(payload, campaign_id, current_time))
+            actions.append("updated" if key in applied else "created")
+            applied[key] = (event_at, event_hash)
+
+        c.executemany(PROJECT_UPSERT_SQL, rows)
+
+        created_keys = [key for key in keys if key not in existing]
+        project_ids = {key: found[0] for key, found in {**existing, **_lookup_projects(c, created_keys)}.items()}
+
+        conn.commit()
+
+        for (source_system, name), campaign_id in campaign_ids.items():
+            campaign_cache.put(source_system, name, campaign_id, campaign_version)
+
+        results = []
+        for payload, action in zip(payloads, actions):
+            results.append({
+                "project_id": project_ids[(payload['source_system'], payload['source_id'])],
+                "action": action,
+                "source_system": payload['source_system'],
+                "source_id": payload['source_id'],
+                "source_reference": payload.get('source_reference', '')
+            })
+
+        created = actions.count("created")
+        skipped = actions.count("skipped")
+        print(f"[OK] Batch upserted {len(payloads)} projects "
+              f"({created} created, {len(rows) - created} updated, {skipped} skipped)")
+        for campaign_id in created_campaigns:
+            publish_change('campaign', 'created', campaign_id, campaign_id=campaign_id)
+        # One event per action for the whole batch, like applying a template to many projects
+        for action in ("created", "updated"):
+            changed = [result["project_id"] for result in results if result["action"] == action]
+            if changed:
+                publish_change('project', action, None, project_ids=changed)
+        return results
+
     except Exception as e:
         conn.rollback()
-        print(f"✗ Error processing webhook: {str(e)}")
+        print(f"✗ Error processing webhook batch: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Database error: {str(e)}"
         )
 
     finally:
-        conn.close()
+        release_connection(conn)
 
 
 def get_webhook_stats() -> Dict[str, Any]:
     """
     Get statistics about webhook-created projects
 
+    Counts come from webhook_source_counters and the hourly webhook_activity
+    buckets (see webhook_stats_database.py), so the cost does not grow with the
+    number of projects. last_24h_count covers the current hour and the 24
+    before it.
+
     Returns:
         Dictionary with statistics
     """
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    conn = get_read_connection()
     c = conn.cursor()
 
     try:
-        # Total projects from webhooks
-        c.execute('''SELECT COUNT(*) FROM projects
-                     WHERE source_system IS NOT NULL''')
-        total_webhook_projects = c.fetchone()[0]
-
         # Projects by source system
-        c.execute('''SELECT source_system, COUNT(*) as count
-                     FROM projects
-                     WHERE source_system IS NOT NULL
-                     GROUP BY source_system''')
+        c.execute('''SELECT source_system, project_count
+                     FROM webhook_source_counters
+                     WHERE project_count > 0''')
         by_source = dict(c.fetchall())
+        total_webhook_projects = sum(by_source.values())
 
-        # Recent webhook activity (last 24 hours)
-        c.execute('''SELECT COUNT(*) FROM projects
-                     WHERE webhook_received_at > datetime('now', '-1 day')''')
-        recent_count = c.fetchone()[0]
+        # Recent webhook activity (last 24 hours, hourly buckets)
+        c.execute('''SELECT source_system, SUM(received)
+                     FROM webhook_activity
+                     WHERE bucket >= ?
+                     GROUP BY source_system''', (activity_cutoff(24),))
+        recent_by_source = {source_system: count for source_system, count in c.fetchall() if count}
+        recent_count = sum(recent_by_source.values())
 
-        # Last webhook received
+        # Last webhook received (idx_projects_webhook_received_at)
         c.execute('''SELECT source_system, source_reference, webhook_received_at
                      FROM projects
                      WHERE webhook_received_at IS NOT NULL
@@ -201,6 +532,7 @@ def get_webhook_stats() -> Dict[str, Any]:
             "total_webhook_projects": total_webhook_projects,
             "by_source_system": by_source,
             "last_24h_count": recent_count,
+            "last_24h_by_source_system": recent_by_source,
             "last_webhook": {
                 "source_system": last_webhook[0] if last_webhook else None,
                 "source_reference": last_webhook[1] if last_webhook else None,
@@ -209,53 +541,63 @@ def get_webhook_stats() -> Dict[str, Any]:
         }
 
     finally:
-        conn.close()
+        release_read_connection(conn)
 
 
-def find_or_create_campaign_inline(cursor, source_system: str, campaign_data: Dict[str, Any],
-                                   connection) -> Optional[int]:
+def sync_campaign_cache(cursor) -> int:
+    """
+    Bring campaign_cache in line with campaigns changed by any worker
+
+    Returns:
+        The campaign version to store newly resolved ids under
+    """
+    version = get_campaign_version(cursor)
+    campaign_cache.sync(version)
+    return version
+
+
+def find_or_create_campaign_inline(cursor, source_system: str, campaign_data: Optional[Dict[str, Any]],
+                                   current_time: str) -> Tuple[Optional[int], bool]:
     """
     Find existing campaign or create new one inline during webhook processing
 
+    Runs inside the caller's transaction and does not commit. Campaigns
+    resolved before are answered from campaign_cache without a query; the
+    caller runs sync_campaign_cache() first and adds the result to the cache,
+    under the version it got from it, after committing.
+
     Args:
         cursor: Database cursor
         source_system: Source system identifier
-        campaign_data: Campaign data from webhook
-        connection: Database connection for commit
+        campaign_data: Campaign data from webhook, or None
+        current_time: Timestamp for a newly created campaign
 
     Returns:
-        campaign_id or None
+        (campaign_id, created); (None, False) without campaign data
     """
+    if not campaign_data:
+        return None, False
+
     # Generate a campaign source_id based on campaign name and source system
     # This allows campaigns with the same name from different systems
     campaign_source_id = f"{campaign_data.get('name', 'Unknown')}"
 
-    # Try to find existing campaign
-    cursor.execute('''SELECT id FROM campaigns
-                      WHERE source_system = ? AND source_reference = ?''',
-                   (source_system, campaign_source_id))
-    existing = cursor.fetchone()
-
-    if existing:
-        return existing[0]
-
-    # Create new campaign
-    current_time = datetime.now().isoformat()
-    cursor.execute('''INSERT INTO campaigns
-                      (name, description, status, source_system, source_reference,
-                       metadata, created_at, updated_at)
-                      VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+    cached_id = campaign_cache.get(source_system, campaign_source_id)
+    if cached_id is not None:
+        return cached_id, False
+
+    cursor.execute(CAMPAIGN_UPSERT_SQL,
                    (campaign_data['name'],
                     campaign_data.get('description', ''),
                     campaign_data.get('status', 'active'),
                     source_system,
                     campaign_source_id,
-                    json.dumps(campaign_data.get('metadata', {})),
+                    json.dumps(campaign_data.get('metadata') or {}),
                     current_time,
                     current_time))
+    row = cursor.fetchone()
+    if row:
+        return row[0], True
 
-    campaign_id = cursor.lastrowid
-    connection.commit()
-
-    print(f"  [OK] Created campaign {campaign_id}: {campaign_data['name']}")
-    return campaign_id
+    cursor.execute(CAMPAIGN_LOOKUP_SQL, (source_system, campaign_source_id))
+    return cursor.fetchone()[0], False
@@ -0,0 +1,329 @@
+"""
+Asynchronous webhook queue backed by a durable SQLite spool
+
+With WEBHOOK_QUEUE_ENABLED=true, /api/webhooks/project only validates the
+payload, appends it to the webhook_spool table and answers 202 Accepted with a
+receipt id. A pool of background worker threads claims pending rows in batches
+and applies them through handle_webhook_projects_batch, one transaction per
+batch.
+
+- Durable: a spooled webhook survives a crash or restart. Rows left in
+  'processing' by a dead worker are put back after WEBHOOK_QUEUE_CLAIM_TIMEOUT_SECONDS.
+- Idempotent: each payload gets an idempotency key (the Idempotency-Key header,
+  or a hash of the payload), so a Laravel retry returns the original receipt
+  instead of queueing the event twice. A retry of an event that ended up
+  'failed' queues it again.
+- Ordered per project: a worker never claims an event while an earlier event
+  for the same source project is still being processed.
+- Failed batches are retried item by item. A failed item waits
+  WEBHOOK_QUEUE_RETRY_BASE_SECONDS, doubling with every attempt (at most
+  WEBHOOK_QUEUE_RETRY_MAX_SECONDS), before it can be claimed again, so a short
+  "database is locked" spell does not use up its attempts. It is marked
+  'failed' after WEBHOOK_QUEUE_MAX_ATTEMPTS.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from db_pool import db_connection, read_connection, get_read_connection, release_read_connection
+from webhook_handler import handle_webhook_projects_batch
+
+
+WEBHOOK_QUEUE_ENABLED = os.getenv("WEBHOOK_QUEUE_ENABLED", "false").lower() in ("1", "true", "yes")
+WEBHOOK_QUEUE_WORKERS = int(os.getenv("WEBHOOK_QUEUE_WORKERS", "2"))
+WEBHOOK_QUEUE_BATCH_SIZE = int(os.getenv("WEBHOOK_QUEUE_BATCH_SIZE", "200"))
+WEBHOOK_QUEUE_POLL_SECONDS = float(os.getenv("WEBHOOK_QUEUE_POLL_SECONDS", "1"))
+WEBHOOK_QUEUE_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_QUEUE_MAX_ATTEMPTS", "5"))
+WEBHOOK_QUEUE_RETRY_BASE_SECONDS = float(os.getenv("WEBHOOK_QUEUE_RETRY_BASE_SECONDS", "10"))
+WEBHOOK_QUEUE_RETRY_MAX_SECONDS = float(os.getenv("WEBHOOK_QUEUE_RETRY_MAX_SECONDS", "900"))
+WEBHOOK_QUEUE_CLAIM_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_QUEUE_CLAIM_TIMEOUT_SECONDS", "300"))
+WEBHOOK_SPOOL_RETENTION_HOURS = float(os.getenv("WEBHOOK_SPOOL_RETENTION_HOURS", "24"))
+
+# How often a worker recovers stale claims and purges processed rows
+HOUSEKEEPING_SECONDS = 60
+
+
+def make_idempotency_key(payload: Dict[str, Any], header_key: Optional[str] = None) -> str:
+    """Idempotency key from the Idempotency-Key header, or a hash of the payload"""
+    if header_key:
+        return f"header:{payload['source_system']}:{header_key}"
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return f"sha256:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+def enqueue_webhook(payload: Dict[str, Any], header_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Append a validated webhook payload to the spool
+
+    Args:
+        payload: Validated webhook payload dictionary
+        header_key: Idempotency-Key request header, if sent
+
+    Returns:
+        Receipt with receipt_id and status; duplicate is True when the same
+        event was already spooled (the original receipt is returned). A retry
+        of an event that was marked 'failed' queues it again under its
+        original receipt, with its attempts reset.
+    """
+    key = make_idempotency_key(payload, header_key)
+    receipt_id = uuid.uuid4().hex
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('''INSERT INTO webhook_spool
+                     (receipt_id, idempotency_key, source_system, source_id, payload, received_at)
+                     VALUES (?, ?, ?, ?, ?, ?)
+                     ON CONFLICT(idempotency_key) DO UPDATE
+                     SET status = 'pending', attempts = 0, last_error = NULL, next_attempt_at = 0,
+                         claimed_at = NULL, processed_at = NULL, received_at = excluded.received_at
+                     WHERE status = 'failed'
+                     RETURNING receipt_id''',
+                  (receipt_id, key, payload['source_system'], payload['source_id'],
+                   json.dumps(payload), time.time()))
+        row = c.fetchone()
+        queued = row is not None
+        if queued:
+            duplicate = row[0] != receipt_id
+            receipt_id, status = row[0], 'pending'
+        else:
+            duplicate = True
+            c.execute('SELECT receipt_id, status FROM webhook_spool WHERE idempotency_key = ?', (key,))
+            receipt_id, status = c.fetchone()
+        conn.commit()
+
+    if queued:
+        webhook_workers.notify()
+
+    return {
+        "receipt_id": receipt_id,
+        "status": status,
+        "duplicate": duplicate,
+        "source_system": payload['source_system'],
+        "source_id": payload['source_id']
+    }
+
+
+def get_receipt(receipt_id: str) -> Optional[Dict[str, Any]]:
+    """Processing state of a spooled webhook"""
+    with read_connection() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT status, attempts, received_at, processed_at, result, last_error
+                     FROM webhook_spool WHERE receipt_id = ?''', (receipt_id,))
+        row = c.fetchone()
+
+    if not row:
+        return None
+    return {
+        "receipt_id": receipt_id,
+        "status": row[0],
+        "attempts": row[1],
+        "received_at": row[2],
+        "processed_at": row[3],
+        "result": json.loads(row[4]) if row[4] else None,
+        "last_error": row[5]
+    }
+
+
+def claim_batch(limit: int = WEBHOOK_QUEUE_BATCH_SIZE) -> List[Tuple[int, Dict[str, Any], int]]:
+    """
+    Atomically mark the oldest claimable pending rows as processing
+
+    A row waiting out its retry backoff is not claimable yet.
+
+    Returns:
+        (spool id, payload, attempts) tuples in arrival order
+    """
+    now = time.time()
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('''UPDATE webhook_spool
+                     SET status = 'processing', claimed_at = ?, attempts = attempts + 1
+                     WHERE id IN (
+                         SELECT s.id FROM webhook_spool s
+                         WHERE s.status = 'pending'
+                           AND s.next_attempt_at <= ?
+                           AND NOT EXISTS (SELECT 1 FROM webhook_spool p
+                                           WHERE p.source_system = s.source_system
+                                             AND p.source_id = s.source_id
+                                             AND p.status = 'processing')
+                         ORDER BY s.id
+                         LIMIT ?)
+                     RETURNING id, payload, attempts''',
+                  (now, now, limit))
+        rows = c.fetchall()
+        conn.commit()
+
+    return sorted((row[0], json.loads(row[1]), row[2]) for row in rows)
+
+
+def _mark_done(results: List[Tuple[int, Dict[str, Any]]]):
+    with db_connection() as conn:
+        conn.executemany('''UPDATE webhook_spool
+                            SET status = 'done', processed_at = ?, result = ?, last_error = NULL
+                            WHERE id = ?''',
+                         [(time.time(), json.dumps(result), spool_id) for spool_id, result in results])
+        conn.commit()
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt of an item that failed attempts times"""
+    return min(WEBHOOK_QUEUE_RETRY_BASE_SECONDS * 2 ** (attempts - 1), WEBHOOK_QUEUE_RETRY_MAX_SECONDS)
+
+
+def _mark_retry(spool_id: int, attempts: int, error: str):
+    status = 'failed' if attempts >= WEBHOOK_QUEUE_MAX_ATTEMPTS else 'pending'
+    delay = retry_delay(attempts)
+    now = time.time()
+    with db_connection() as conn:
+        conn.execute('''UPDATE webhook_spool
+                        SET status = ?, claimed_at = NULL, last_error = ?, next_attempt_at = ?,
+                            processed_at = CASE WHEN ? = 'failed' THEN ? END
+                        WHERE id = ?''', (status, error, now + delay, status, now, spool_id))
+        conn.commit()
+    retry = f"retry in {delay:.0f}s" if status == 'pending' else status
+    print(f"✗ Webhook spool item {spool_id} attempt {attempts} failed ({retry}): {error}")
+
+
+def process_batch(rows: List[Tuple[int, Dict[str, Any], int]]) -> int:
+    """
+    Apply claimed rows, falling back to one transaction per item if the batch fails
+
+    Returns:
+        Number of rows applied
+    """
+    try:
+        results = handle_webhook_projects_batch([payload for _, payload, _ in rows])
+        _mark_done([(spool_id, result) for (spool_id, _, _), result in zip(rows, results)])
+        return len(rows)
+    except Exception as e:
+        print(f"✗ Webhook spool batch of {len(rows)} failed, retrying items one by one: {e}")
+
+    applied = 0
+    for spool_id, payload, attempts in rows:
+        try:
+            result = handle_webhook_projects_batch([payload])[0]
+            _mark_done([(spool_id, result)])
+            applied += 1
+        except Exception as e:
+            _mark_retry(spool_id, attempts, str(e))
+    return applied
+
+
+def recover_stale_claims() -> int:
+    """Put rows claimed by a worker that died back into the queue"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('''UPDATE webhook_spool SET status = 'pending', claimed_at = NULL
+                     WHERE status = 'processing' AND claimed_at < ?''',
+                  (time.time() - WEBHOOK_QUEUE_CLAIM_TIMEOUT_SECONDS,))
+        recovered = c.rowcount
+        conn.commit()
+    return recovered
+
+
+def purge_processed() -> int:
+    """Delete done and failed rows older than the retention period"""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute('''DELETE FROM webhook_spool
+                     WHERE status IN ('done', 'failed') AND COALESCE(processed_at, received_at) < ?''',
+                  (time.time() - WEBHOOK_SPOOL_RETENTION_HOURS * 3600,))
+        purged = c.rowcount
+        conn.commit()
+    return purged
+
+
+def get_queue_stats() -> Dict[str, Any]:
+    """Queue depth and lag for /api/webhooks/health"""
+    conn = get_read_connection()
+    c = conn.cursor()
+
+    try:
+        c.execute('''SELECT status, COUNT(*), MIN(received_at)
+                     FROM webhook_spool GROUP BY status''')
+        by_status = {row[0]: (row[1], row[2]) for row in c.fetchall()}
+    finally:
+        release_read_connection(conn)
+
+    pending, oldest_pending = by_status.get('pending', (0, None))
+    processing, oldest_processing = by_status.get('processing', (0, None))
+    oldest = min((t for t in (oldest_pending, oldest_processing) if t is not None), default=None)
+
+    return {
+        "enabled": webhook_workers.enabled,
+        "workers": webhook_workers.running,
+        "depth": pending + processing,
+        "pending": pending,
+        "processing": processing,
+        "failed": by_status.get('failed', (0, None))[0],
+        "done": by_status.get('done', (0, None))[0],
+        "lag_seconds": round(time.time() - oldest, 3) if oldest is not None else 0.0
+    }
+
+
+class WebhookWorkerPool:
+    """Background threads draining the webhook spool"""
+
+    def __init__(self, workers: int = WEBHOOK_QUEUE_WORKERS, enabled: bool = WEBHOOK_QUEUE_ENABLED):
+        self.workers = workers
+        self.enabled = enabled
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    @property
+    def running(self) -> int:
+        return sum(1 for thread in self._threads if thread.is_alive())
+
+    def notify(self):
+        """Wake idle workers after an enqueue"""
+        self._wake.set()
+
+    def start(self):
+        if self._threads:
+            return
+        recovered = recover_stale_claims()
+        if recovered:
+            print(f"[OK] Requeued {recovered} webhook spool items left in processing")
+
+        self._stop.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(number,),
+                                      name=f"webhook-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[OK] Started {self.workers} webhook queue workers")
+
+    def stop(self, timeout: float = 10.0):
+        """Let workers finish their current batch and exit; pending rows stay spooled"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self, number: int):
+        next_housekeeping = time.monotonic() + HOUSEKEEPING_SECONDS
+        while not self._stop.is_set():
+            try:
+                rows = claim_batch()
+                if rows:
+                    process_batch(rows)
+                    continue
+
+                if number == 0 and time.monotonic() >= next_housekeeping:
+                    recover_stale_claims()
+                    purge_processed()
+                    next_housekeeping = time.monotonic() + HOUSEKEEPING_SECONDS
+            except Exception as e:
+                print(f"✗ Webhook queue worker {number} error: {e}")
+
+            self._wake.wait(WEBHOOK_QUEUE_POLL_SECONDS)
+            self._wake.clear()
+
+
+webhook_workers = WebhookWorkerPool()
@@ -0,0 +1,68 @@
+"""
+Webhook spool migration for cfh-project
+"""
+from db_pool import get_connection, release_connection
+
+
+def migrate_webhook_spool():
+    """Create the webhook_spool table used by the asynchronous webhook queue"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    print("Starting webhook spool migration...")
+
+    c.execute('''CREATE TABLE IF NOT EXISTS webhook_spool
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  receipt_id TEXT NOT NULL UNIQUE,
+                  idempotency_key TEXT NOT NULL UNIQUE,
+                  source_system TEXT NOT NULL,
+                  source_id TEXT NOT NULL,
+                  payload TEXT NOT NULL,
+                  status TEXT NOT NULL DEFAULT 'pending',
+                  attempts INTEGER NOT NULL DEFAULT 0,
+                  received_at REAL NOT NULL,
+                  claimed_at REAL,
+                  processed_at REAL,
+                  result TEXT,
+                  last_error TEXT)''')
+    print("  [OK] Created webhook_spool table")
+
+    # Workers claim the oldest pending rows
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_webhook_spool_status
+                 ON webhook_spool(status, id)''')
+    print("  [OK] Created index: idx_webhook_spool_status")
+
+    # Events for a project in flight hold back later events for the same project
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_webhook_spool_source
+                 ON webhook_spool(source_system, source_id, status)''')
+    print("  [OK] Created index: idx_webhook_spool_source")
+
+    conn.commit()
+    release_connection(conn)
+
+    print("Webhook spool migration completed successfully!")
+
+
+def migrate_webhook_spool_backoff():
+    """Add next_attempt_at, before which a failed webhook spool item is not retried"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    print("Starting webhook spool backoff migration...")
+
+    c.execute('PRAGMA table_info(webhook_spool)')
+    if 'next_attempt_at' in [row[1] for row in c.fetchall()]:
+        print("  - Column next_attempt_at already exists in webhook_spool")
+    else:
+        c.execute('ALTER TABLE webhook_spool ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0')
+        print("  [OK] Added next_attempt_at column to webhook_spool")
+
+    conn.commit()
+    release_connection(conn)
+
+    print("Webhook spool backoff migration completed successfully!")
+
+
+if __name__ == "__main__":
+    migrate_webhook_spool()
+    migrate_webhook_spool_backoff()
@@ -0,0 +1,206 @@
+"""
+Materialized webhook statistics for cfh-project
+
+webhook_source_counters holds the number of webhook-created projects per source
+system; webhook_activity counts projects received per hour (bucket
+'YYYY-MM-DDTHH' of webhook_received_at) and source system. Triggers on projects
+keep both up to date, so /api/webhooks/health reads a handful of rows instead
+of scanning projects. Buckets older than two days are pruned as new webhooks
+arrive.
+
+Usage:
+    python webhook_stats_database.py            # create tables/triggers (and backfill)
+    python webhook_stats_database.py verify     # report drift without changing anything
+    python webhook_stats_database.py rebuild    # recompute every counter from scratch
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+from db_pool import get_connection, release_connection
+
+
+# Hours of webhook_activity buckets kept (the health endpoint reads the last 24)
+ACTIVITY_RETENTION_HOURS = 48
+
+EXPECTED_SOURCE_COUNTERS = '''
+    SELECT source_system, COUNT(*)
+    FROM projects
+    WHERE source_system IS NOT NULL
+    GROUP BY source_system
+'''
+
+EXPECTED_ACTIVITY = '''
+    SELECT substr(webhook_received_at, 1, 13), source_system, COUNT(*)
+    FROM projects
+    WHERE webhook_received_at >= ? AND source_system IS NOT NULL
+    GROUP BY 1, 2
+'''
+
+TRIGGERS = [
+    f'''CREATE TRIGGER IF NOT EXISTS trg_projects_webhook_stats_insert
+        AFTER INSERT ON projects
+        WHEN NEW.source_system IS NOT NULL
+        BEGIN
+            INSERT INTO webhook_source_counters (source_system, project_count)
+            VALUES (NEW.source_system, 1)
+            ON CONFLICT(source_system) DO UPDATE SET project_count = project_count + 1;
+            INSERT INTO webhook_activity (bucket, source_system, received)
+            SELECT substr(NEW.webhook_received_at, 1, 13), NEW.source_system, 1
+            WHERE NEW.webhook_received_at IS NOT NULL
+            ON CONFLICT(bucket, source_system) DO UPDATE SET received = received + 1;
+            DELETE FROM webhook_activity
+            WHERE bucket < strftime('%Y-%m-%dT%H', NEW.webhook_received_at, '-{ACTIVITY_RETENTION_HOURS} hours');
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_projects_webhook_stats_delete
+       AFTER DELETE ON projects
+       WHEN OLD.source_system IS NOT NULL
+       BEGIN
+           UPDATE webhook_source_counters SET project_count = project_count - 1
+           WHERE source_system = OLD.source_system;
+           UPDATE webhook_activity SET received = received - 1
+           WHERE bucket = substr(OLD.webhook_received_at, 1, 13) AND source_system = OLD.source_system;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_projects_webhook_stats_update
+       AFTER UPDATE OF source_system, webhook_received_at ON projects
+       WHEN OLD.source_system IS NOT NEW.source_system OR OLD.webhook_received_at IS NOT NEW.webhook_received_at
+       BEGIN
+           UPDATE webhook_source_counters SET project_count = project_count - 1
+           WHERE source_system = OLD.source_system;
+           UPDATE webhook_activity SET received = received - 1
+           WHERE bucket = substr(OLD.webhook_received_at, 1, 13) AND source_system = OLD.source_system;
+           INSERT INTO webhook_source_counters (source_system, project_count)
+           SELECT NEW.source_system, 1 WHERE NEW.source_system IS NOT NULL
+           ON CONFLICT(source_system) DO UPDATE SET project_count = project_count + 1;
+           INSERT INTO webhook_activity (bucket, source_system, received)
+           SELECT substr(NEW.webhook_received_at, 1, 13), NEW.source_system, 1
+           WHERE NEW.source_system IS NOT NULL AND NEW.webhook_received_at IS NOT NULL
+           ON CONFLICT(bucket, source_system) DO UPDATE SET received = received + 1;
+       END''',
+]
+
+
+def activity_cutoff(hours: float) -> str:
+    """Oldest hourly bucket inside the last hours (webhook_received_at is local time)"""
+    return (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%dT%H')
+
+
+def migrate_webhook_stats():
+    """Create webhook counter tables and triggers, backfilling them on first run"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    print("Starting webhook stats migration...")
+
+    c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'webhook_source_counters'")
+    needs_backfill = c.fetchone() is None
+
+    c.execute('''CREATE TABLE IF NOT EXISTS webhook_source_counters
+                 (source_system TEXT PRIMARY KEY,
+                  project_count INTEGER NOT NULL DEFAULT 0)''')
+    print("  [OK] Created webhook_source_counters table")
+
+    c.execute('''CREATE TABLE IF NOT EXISTS webhook_activity
+                 (bucket TEXT NOT NULL,
+                  source_system TEXT NOT NULL,
+                  received INTEGER NOT NULL DEFAULT 0,
+                  PRIMARY KEY (bucket, source_system)) WITHOUT ROWID''')
+    print("  [OK] Created webhook_activity table")
+
+    for trigger_sql in TRIGGERS:
+        c.execute(trigger_sql)
+    print(f"  [OK] Created {len(TRIGGERS)} webhook stats triggers")
+
+    conn.commit()
+    release_connection(conn)
+
+    if needs_backfill:
+        rebuild_webhook_stats()
+
+    print("Webhook stats migration completed successfully!")
+
+
+def rebuild_webhook_stats() -> Dict[str, int]:
+    """
+    Recompute the webhook counters from projects in one transaction
+
+    Returns:
+        Number of source system and activity bucket rows written
+    """
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        c.execute('DELETE FROM webhook_source_counters')
+        c.execute(f'''INSERT INTO webhook_source_counters (source_system, project_count)
+                      {EXPECTED_SOURCE_COUNTERS}''')
+        sources = c.rowcount
+
+        c.execute('DELETE FROM webhook_activity')
+        c.execute(f'''INSERT INTO webhook_activity (bucket, source_system, received)
+                      {EXPECTED_ACTIVITY}''', (activity_cutoff(ACTIVITY_RETENTION_HOURS),))
+        buckets = c.rowcount
+
+        conn.commit()
+    finally:
+        release_connection(conn)
+
+    print(f"  [OK] Rebuilt webhook stats for {sources} source systems and {buckets} hourly buckets")
+    return {"sources": sources, "buckets": buckets}
+
+
+def verify_webhook_stats() -> List[Dict[str, Any]]:
+    """
+    Compare the materialized webhook counters against a fresh count
+
+    Only the activity buckets of the last 24 hours are checked.
+
+    Returns:
+        One entry per drifted source system or bucket with expected and actual values
+    """
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        drift = []
+
+        c.execute('SELECT source_system, project_count FROM webhook_source_counters')
+        actual = dict(c.fetchall())
+        c.execute(EXPECTED_SOURCE_COUNTERS)
+        expected = dict(c.fetchall())
+        for source_system in expected.keys() | actual.keys():
+            if expected.get(source_system, 0) != actual.get(source_system, 0):
+                drift.append({"kind": "source", "id": source_system,
+                              "expected": expected.get(source_system, 0), "actual": actual.get(source_system, 0)})
+
+        cutoff = activity_cutoff(24)
+        c.execute('SELECT bucket, source_system, received FROM webhook_activity WHERE bucket >= ?', (cutoff,))
+        actual = {(row[0], row[1]): row[2] for row in c.fetchall()}
+        c.execute(EXPECTED_ACTIVITY, (cutoff,))
+        expected = {(row[0], row[1]): row[2] for row in c.fetchall()}
+        for key in expected.keys() | actual.keys():
+            if expected.get(key, 0) != actual.get(key, 0):
+                drift.append({"kind": "bucket", "id": "/".join(key),
+                              "expected": expected.get(key, 0), "actual": actual.get(key, 0)})
+
+        return drift
+    finally:
+        release_connection(conn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Webhook statistics counter maintenance")
+    parser.add_argument("command", nargs="?", default="migrate", choices=["migrate", "verify", "rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate_webhook_stats()
+    elif args.command == "rebuild":
+        rebuild_webhook_stats()
+    else:
+        drift = verify_webhook_stats()
+        for entry in drift:
+            print(f"  ✗ {entry['kind']} {entry['id']}: expected {entry['expected']}, found {entry['actual']}")
+        if drift:
+            print(f"Found {len(drift)} drifted counter rows; run 'python webhook_stats_database.py rebuild'")
+            raise SystemExit(1)
+        print("All webhook counters are consistent")
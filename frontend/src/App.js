@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { AuthProvider, useAuth } from './AuthContext';
 import LoginPrompt from './LoginPrompt';
@@ -16,6 +16,9 @@ const getApiUrl = () => {
 
 const API_URL = getApiUrl();
 
+// Projects are fetched in pages so the first screen does not wait for the whole list
+const PROJECT_PAGE_SIZE = 100;
+
 // Wrapper component with AuthProvider
 function AppWithAuth() {
   return (
@@ -33,6 +36,7 @@ function App() {
   const [templates, setTemplates] = useState([]);
   const [currentProject, setCurrentProject] = useState(null);
   const [currentCampaign, setCurrentCampaign] = useState(null);
+  const [campaignStats, setCampaignStats] = useState(null);
   const [checklist, setChecklist] = useState([]);
   const [comments, setComments] = useState([]);
   const [stakeholders, setStakeholders] = useState([]);
@@ -56,14 +60,78 @@ function App() {
   const [newStakeholder, setNewStakeholder] = useState({ name: '', email: '', role: '', access_level: 'viewer' });
   const [editedProject, setEditedProject] = useState(null);
 
+  // Latest open project/view for the change feed handler
+  const openProjectRef = useRef(null);
+  const openCampaignRef = useRef(null);
+  const projectLoadRef = useRef(0);
+  useEffect(() => {
+    openProjectRef.current = view === 'project' ? currentProject : null;
+  }, [currentProject, view]);
+  useEffect(() => {
+    openCampaignRef.current = view === 'campaign' ? currentCampaign : null;
+  }, [currentCampaign, view]);
+
   useEffect(() => {
     loadProjects();
     loadCampaigns();
-    const interval = setInterval(() => {
-      loadProjects();
-      loadCampaigns();
-    }, 5000); // Auto-refresh every 5 seconds
-    return () => clearInterval(interval);
+
+    // Fall back to polling where Server-Sent Events are unavailable
+    if (typeof window.EventSource === 'undefined') {
+      const interval = setInterval(() => {
+        loadProjects();
+        loadCampaigns();
+        const openCampaign = openCampaignRef.current;
+        if (openCampaign) loadCampaignDetails(openCampaign.id);
+      }, 5000); // Auto-refresh every 5 seconds
+      return () => clearInterval(interval);
+    }
+
+    // Reload only what the server says changed
+    const events = new EventSource(`${API_URL}/events`, { withCredentials: true });
+    let connectedBefore = false;
+
+    events.onopen = () => {
+      // Events may have been missed while disconnected
+      if (connectedBefore) {
+        loadProjects();
+        loadCampaigns();
+        const openProject = openProjectRef.current;
+        if (openProject) {
+          loadChecklist(openProject.id);
+          loadComments(openProject.id);
+          loadStakeholders(openProject.id);
+        }
+        const openCampaign = openCampaignRef.current;
+        if (openCampaign) loadCampaignDetails(openCampaign.id);
+      }
+      connectedBefore = true;
+    };
+
+    events.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      const openProject = openProjectRef.current;
+      const isOpenProject = openProject && (event.project_id === openProject.id ||
+        (event.project_ids || []).includes(openProject.id));
+
+      if (event.entity !== 'campaign') {
+        loadProjects();
+      }
+      if (event.entity === 'campaign' || event.entity === 'project' || event.entity === null) {
+        loadCampaigns();
+      }
+      // Checklist, comment and stakeholder events do not say which campaign they belong to
+      const openCampaign = openCampaignRef.current;
+      if (openCampaign && (event.entity !== 'campaign' || event.campaign_id === openCampaign.id)) {
+        loadCampaignDetails(openCampaign.id);
+      }
+      if (openProject && (isOpenProject || event.entity === null)) {
+        if (event.entity === 'checklist' || event.entity === null) loadChecklist(openProject.id);
+        if (event.entity === 'comment' || event.entity === null) loadComments(openProject.id);
+        if (event.entity === 'stakeholder' || event.entity === null) loadStakeholders(openProject.id);
+      }
+    };
+
+    return () => events.close();
   }, []);
 
   useEffect(() => {
@@ -81,12 +149,26 @@ function App() {
   }, [currentCampaign, view]);
 
   const loadProjects = async () => {
+    const load = ++projectLoadRef.current;
+    const firstLoad = load === 1;
     try {
-      const response = await axios.get(`${API_URL}/projects/stats`, {
-        withCredentials: true
-      });
-      setProjects(response.data);
-      setLoading(false);
+      let loaded = [];
+      let cursor = null;
+      do {
+        const response = await axios.get(`${API_URL}/projects/stats`, {
+          params: cursor ? { limit: PROJECT_PAGE_SIZE, cursor } : { limit: PROJECT_PAGE_SIZE },
+          withCredentials: true
+        });
+        // A newer reload has started; let it finish instead
+        if (load !== projectLoadRef.current) return;
+        loaded = loaded.concat(response.data);
+        cursor = response.headers['x-next-cursor'];
+        // Show pages as they arrive on the first load; reloads swap the list in once complete
+        if (firstLoad || !cursor) {
+          setProjects(loaded);
+          setLoading(false);
+        }
+      } while (cursor);
     } catch (error) {
       console.error('Error loading projects:', error);
       setLoading(false);
@@ -104,8 +186,19 @@ function App() {
 
   const loadCampaignDetails = async (campaignId) => {
     try {
-      const response = await axios.get(`${API_URL}/campaigns/${campaignId}`);
-      setCurrentCampaign(response.data);
+      let rollup = null;
+      let loaded = [];
+      let cursor = null;
+      do {
+        const response = await axios.get(`${API_URL}/campaigns/${campaignId}/stats`, {
+          params: cursor ? { limit: PROJECT_PAGE_SIZE, cursor } : { limit: PROJECT_PAGE_SIZE },
+          withCredentials: true
+        });
+        rollup = response.data.rollup;
+        loaded = loaded.concat(response.data.projects);
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
+      setCampaignStats({ campaignId, rollup, projects: loaded });
     } catch (error) {
       console.error('Error loading campaign details:', error);
     }
@@ -113,7 +206,9 @@ function App() {
 
   const loadTemplates = async () => {
     try {
-      const response = await axios.get(`${API_URL}/checklist-templates`);
+      const response = await axios.get(`${API_URL}/checklist-templates`, {
+        params: { include_items: true }
+      });
       setTemplates(response.data);
     } catch (error) {
       console.error('Error loading templates:', error);
@@ -326,7 +421,7 @@ function App() {
       id: template.id,
       name: template.name,
       description: template.description || '',
-      items: template.items && template.items.length > 0 ? template.items : ['']
+      items: template.items && template.items.length > 0 ? template.items.map(item => item.title) : ['']
     });
     setShowEditTemplateModal(true);
   };
@@ -799,6 +894,9 @@ function App() {
 
   // Campaign Detail View
   if (view === 'campaign' && currentCampaign) {
+    const stats = campaignStats && campaignStats.campaignId === currentCampaign.id ? campaignStats : null;
+    const rollup = stats ? stats.rollup : {};
+    const campaignProjects = stats ? stats.projects : [];
     return (
       <div className="app">
         <header className="header">
@@ -820,26 +918,26 @@ function App() {
         <div className="container">
           <div className="stats">
             <div className="stat-card">
-              <div className="stat-value">{currentCampaign.project_count || 0}</div>
+              <div className="stat-value">{rollup.project_count || 0}</div>
               <div className="stat-label">Total Projects</div>
             </div>
             <div className="stat-card">
-              <div className="stat-value">{currentCampaign.completed_projects || 0}</div>
+              <div className="stat-value">{rollup.completed_projects || 0}</div>
               <div className="stat-label">Completed</div>
             </div>
             <div className="stat-card">
-              <div className="stat-value">
-                {currentCampaign.project_count > 0
-                  ? Math.round((currentCampaign.completed_projects / currentCampaign.project_count) * 100)
-                  : 0}%
-              </div>
+              <div className="stat-value">{rollup.completed_tasks || 0}/{rollup.total_tasks || 0}</div>
+              <div className="stat-label">Tasks Done</div>
+            </div>
+            <div className="stat-card">
+              <div className="stat-value">{rollup.progress || 0}%</div>
               <div className="stat-label">Progress</div>
             </div>
           </div>
 
           <h2 style={{ marginTop: '30px', marginBottom: '20px' }}>Campaign Projects</h2>
           <div className="project-grid">
-            {currentCampaign.projects && currentCampaign.projects.map((project) => (
+            {campaignProjects.map((project) => (
               <div key={project.id} className="project-card" onClick={() => openProject(project)}>
                 <div className="project-card-header">
                   <h3>{project.name}</h3>
@@ -869,7 +967,7 @@ function App() {
             ))}
           </div>
 
-          {(!currentCampaign.projects || currentCampaign.projects.length === 0) && (
+          {stats && campaignProjects.length === 0 && (
             <div className="empty-state">
               <h3>No projects in this campaign</h3>
               <p>Add projects to this campaign from the project creation form</p>
@@ -926,8 +1024,8 @@ function App() {
                 <div style={{ marginTop: '15px' }}>
                   <strong style={{ fontSize: '0.9em', color: '#666' }}>Checklist Items ({template.item_count}):</strong>
                   <ul style={{ marginTop: '8px', marginLeft: '20px', fontSize: '0.9em', color: '#555' }}>
-                    {template.items && template.items.map((item, idx) => (
-                      <li key={idx} style={{ marginBottom: '4px' }}>{item}</li>
+                    {template.items && template.items.map((item) => (
+                      <li key={item.id} style={{ marginBottom: '4px' }}>{item.title}</li>
                     ))}
                   </ul>
                 </div>